@@ -16,6 +16,7 @@ from docx.shared import Inches, Pt
 from docx import Document
 import io
 import base64
+import hashlib
 import plotly.graph_objects as go
 from streamlit_lottie import st_lottie
 import requests
@@ -23,11 +24,15 @@ from dashboard.dashboard import DashboardManager
 from config.courses import COURSES_BY_CATEGORY, RESUME_VIDEOS, INTERVIEW_VIDEOS, get_courses_for_role, get_category_for_role
 from config.job_roles import JOB_ROLES
 from config.database import (
-    get_database_connection, save_resume_data, save_analysis_data,
+    get_database_connection, save_resume_data, save_analysis_data, save_resume_bundle,
     init_database, verify_admin, log_admin_action, save_ai_analysis_data,
-    get_ai_analysis_stats, reset_ai_analysis_stats, get_detailed_ai_analysis_stats
+    get_ai_analysis_stats, reset_ai_analysis_stats, get_detailed_ai_analysis_stats,
+    get_stage_result, save_stage_result, find_similar_resumes, DUPLICATE_SIMILARITY
 )
 from utils.ai_resume_analyzer import AIResumeAnalyzer
+from utils.llm_providers import MODEL_CHOICES
+from utils.job_queue import JobQueue, submit_job, make_dedupe_key
+from utils.rate_limiter import RateLimitExceeded, admit_session
 from utils.resume_builder import ResumeBuilder
 from utils.resume_analyzer import ResumeAnalyzer
 from utils.ats_scorer import ATSScorer
@@ -507,39 +512,6 @@ class ResumeApp:
             print(f"Error loading image {image_name}: {e}")
             return None
 
-    def export_to_excel(self):
-        """Export resume data to Excel"""
-        conn = get_database_connection()
-
-        # Get resume data with analysis
-        query = """
-            SELECT
-                rd.name, rd.email, rd.phone, rd.linkedin, rd.github, rd.portfolio,
-                rd.summary, rd.target_role, rd.target_category,
-                rd.education, rd.experience, rd.projects, rd.skills,
-                ra.ats_score, ra.keyword_match_score, ra.format_score, ra.section_score,
-                ra.missing_skills, ra.recommendations,
-                rd.created_at
-            FROM resume_data rd
-            LEFT JOIN resume_analysis ra ON rd.id = ra.resume_id
-        """
-
-        try:
-            # Read data into DataFrame
-            df = pd.read_sql_query(query, conn)
-
-            # Create Excel writer object
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='Resume Data')
-
-            return output.getvalue()
-        except Exception as e:
-            print(f"Error exporting to Excel: {str(e)}")
-            return None
-        finally:
-            conn.close()
-
     def render_dashboard(self):
         """Render the dashboard page"""
         self.dashboard_manager.render_dashboard()
@@ -1341,9 +1313,20 @@ class ResumeApp:
             if uploaded_file:
                 # Extract text from uploaded file
                 try:
-                    resume_text = self.ai_analyzer.extract_text_from_pdf(uploaded_file)
-
-                    if not resume_text or len(resume_text.strip()) < 50:
+                    # OCR/extraction runs on the worker pool; identical uploads reuse the finished job
+                    extract_job_id = submit_job(
+                        "extract_text",
+                        {"file_bytes": uploaded_file.getvalue(), "file_type": "pdf"},
+                        dedupe=True
+                    )
+                    extraction = self.render_job_status(
+                        extract_job_id, "📄 Extracting text from resume", "❌ Could not extract text from the resume")
+                    resume_text = extraction["result"] if extraction else None
+
+                    if extraction is None:
+                        # Still running, or failed with its error shown by render_job_status
+                        pass
+                    elif not resume_text or len(resume_text.strip()) < 50:
                         st.error("❌ Could not extract enough text from the resume. Please check the file.")
                     else:
                         st.success(f"✅ Extracted {len(resume_text)} characters from resume")
@@ -1672,49 +1655,80 @@ class ResumeApp:
 
                 if analyze_standard:
                     with st.spinner("Analyzing your document..."):
+                        # Repeat uploads of the same file reuse stored stage results
+                        file_bytes = uploaded_file.getvalue()
+                        content_hash = hashlib.sha256(file_bytes).hexdigest()
+                        text = get_stage_result(content_hash, 'extract', ResumeAnalyzer.EXTRACTION_VERSION)
+
                         # Get file content
-                        text = ""
-                        try:
-                            if uploaded_file.type == "application/pdf":
-                                try:
-                                    text = self.analyzer.extract_text_from_pdf(uploaded_file)
-                                except Exception as pdf_error:
-                                    st.error(f"PDF extraction failed: {str(pdf_error)}")
-                                    st.info("Trying alternative PDF extraction method...")
-                                    # Try AI analyzer as backup
+                        if text is None:
+                            text = ""
+                            try:
+                                if uploaded_file.type == "application/pdf":
                                     try:
-                                        text = self.ai_analyzer.extract_text_from_pdf(uploaded_file)
-                                    except Exception as backup_error:
-                                        st.error(f"All PDF extraction methods failed: {str(backup_error)}")
-                                        return
-                            elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                                try:
-                                    text = self.analyzer.extract_text_from_docx(uploaded_file)
-                                except Exception as docx_error:
-                                    st.error(f"DOCX extraction failed: {str(docx_error)}")
-                                    # Try AI analyzer as backup
+                                        text = self.analyzer.extract_text_from_pdf(uploaded_file)
+                                    except Exception as pdf_error:
+                                        st.error(f"PDF extraction failed: {str(pdf_error)}")
+                                        st.info("Trying alternative PDF extraction method...")
+                                        # Try AI analyzer as backup
+                                        try:
+                                            text = self.ai_analyzer.extract_text_from_pdf(uploaded_file)
+                                        except Exception as backup_error:
+                                            st.error(f"All PDF extraction methods failed: {str(backup_error)}")
+                                            return
+                                elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
                                     try:
-                                        text = self.ai_analyzer.extract_text_from_docx(uploaded_file)
-                                    except Exception as backup_error:
-                                        st.error(f"All DOCX extraction methods failed: {str(backup_error)}")
-                                        return
-                            else:
-                                text = uploaded_file.getvalue().decode()
+                                        text = self.analyzer.extract_text_from_docx(uploaded_file)
+                                    except Exception as docx_error:
+                                        st.error(f"DOCX extraction failed: {str(docx_error)}")
+                                        # Try AI analyzer as backup
+                                        try:
+                                            text = self.ai_analyzer.extract_text_from_docx(uploaded_file)
+                                        except Exception as backup_error:
+                                            st.error(f"All DOCX extraction methods failed: {str(backup_error)}")
+                                            return
+                                else:
+                                    text = file_bytes.decode()
                                 
-                            if not text or text.strip() == "":
-                                st.error("Could not extract any text from the uploaded file. Please try a different file.")
+                                if not text or text.strip() == "":
+                                    st.error("Could not extract any text from the uploaded file. Please try a different file.")
+                                    return
+                            except Exception as e:
+                                st.error(f"Error reading file: {str(e)}")
                                 return
-                        except Exception as e:
-                            st.error(f"Error reading file: {str(e)}")
-                            return
+                            save_stage_result(content_hash, 'extract', ResumeAnalyzer.EXTRACTION_VERSION, text)
+
+                        # Flag near-duplicates of resumes submitted before (the same file is handled above)
+                        duplicates = find_similar_resumes(
+                            resume={'resume_text': text}, limit=5,
+                            min_similarity=DUPLICATE_SIMILARITY, exclude_hash=content_hash
+                        )
+                        if duplicates['rows']:
+                            st.warning(
+                                f"⚠️ This resume is {duplicates['rows'][0][-1]:.0%} similar to "
+                                f"{len(duplicates['rows'])} resume(s) already submitted. "
+                                "It may be a near-duplicate or built from a shared template."
+                            )
 
-                        # Analyze the document
-                        analysis = self.analyzer.analyze_resume({'raw_text': text}, role_info)
+                        # Analyze the document, unless this file was already scored for these requirements
+                        requirements_key = hashlib.sha256(
+                            json.dumps(role_info, sort_keys=True, default=str).encode()
+                        ).hexdigest()
+                        analysis = get_stage_result(
+                            content_hash, 'analyze', ResumeAnalyzer.ANALYSIS_VERSION, requirements_key
+                        )
+                        analysis_cached = analysis is not None
+                        if not analysis_cached:
+                            analysis = self.analyzer.analyze_resume({'raw_text': text}, role_info)
                         
                         # Check if analysis returned an error
                         if 'error' in analysis:
                             st.error(analysis['error'])
                             return
+                        if not analysis_cached:
+                            save_stage_result(
+                                content_hash, 'analyze', ResumeAnalyzer.ANALYSIS_VERSION, analysis, requirements_key
+                            )
 
                         # Show snowflake effect
                         st.snow()
@@ -1736,16 +1750,17 @@ class ResumeApp:
                             'experience': analysis.get('experience', []),
                             'projects': analysis.get('projects', []),
                             'skills': analysis.get('skills', []),
-                            'template': ''
+                            'template': '',
+                            'resume_text': text,
+                            'content_hash': content_hash
                         }
 
-                        # Save to database
+                        # Save to database; a reused analysis is still recorded as a submission
+                        if analysis_cached:
+                            st.info("This resume was analyzed before for this role; showing the saved results.")
                         try:
-                            resume_id = save_resume_data(resume_data)
-
-                            # Save analysis data
+                            # Resume, skills and analysis are saved in one transaction
                             analysis_data = {
-                                'resume_id': resume_id,
                                 'ats_score': analysis['ats_score'],
                                 'keyword_match_score': analysis['keyword_match']['score'],
                                 'format_score': analysis['format_score'],
@@ -1753,8 +1768,11 @@ class ResumeApp:
                                 'missing_skills': ','.join(analysis['keyword_match']['missing_skills']),
                                 'recommendations': ','.join(analysis['suggestions'])
                             }
-                            save_analysis_data(resume_id, analysis_data)
-                            st.success("Resume data saved successfully!")
+                            resume_id = save_resume_bundle(resume_data, analysis_data)
+                            if resume_id:
+                                st.success("Resume data saved successfully!")
+                            else:
+                                st.error("Error saving to database. Please try again.")
                         except Exception as e:
                             st.error(f"Error saving to database: {str(e)}")
                             print(f"Database error: {e}")
@@ -2029,7 +2047,7 @@ class ResumeApp:
             # AI Model Selection
             ai_model = st.selectbox(
                 "Select AI Model",
-                ["Google Gemini"],
+                list(MODEL_CHOICES.keys()),
                 help="Choose the AI model to analyze your resume"
             )
              
@@ -2659,6 +2677,14 @@ class ResumeApp:
             </div>
             """, unsafe_allow_html=True)
 
+            # Optional side-by-side comparison against other roles
+            all_roles = {role: info for category in self.job_roles.values() for role, info in category.items()}
+            compare_roles = st.multiselect(
+                "Compare with other roles (optional)",
+                [role for role in all_roles if role != selected_role],
+                key="ai_compare_roles",
+                help="Analyze your resume for several roles at once and compare the results side by side")
+
             # File Upload for AI Analysis
             uploaded_file = st.file_uploader(
     "Upload your resume", type=[
@@ -2680,470 +2706,526 @@ class ResumeApp:
                                 use_container_width=True,
                                 key="analyze_ai_button")
 
+                compare_ai = False
+                if compare_roles:
+                    compare_ai = st.button(f"⚖️ Compare {len(compare_roles) + 1} Roles",
+                                           use_container_width=True,
+                                           key="compare_ai_roles_button")
+
+                if compare_ai:
+                    try:
+                        admit_session(MODEL_CHOICES[ai_model][0])
+                        file_bytes = uploaded_file.getvalue()
+                        file_type = "docx" if uploaded_file.name.lower().endswith(".docx") else "pdf"
+                        roles = {role: all_roles[role] for role in [selected_role, *compare_roles]}
+                        # Extraction and the per-role analyses run on the worker pool
+                        st.session_state['ai_compare_job'] = submit_job("multi_role_analysis", {
+                            "file_bytes": file_bytes,
+                            "file_type": file_type,
+                            "roles": roles,
+                            "provider": ai_model
+                        }, dedupe_key=make_dedupe_key("multi_role_analysis", file_bytes, roles, ai_model))
+                    except RateLimitExceeded as limit_error:
+                        st.warning(f"⏳ {str(limit_error)}")
+                    except Exception as compare_error:
+                        st.error(f"Error starting role comparison: {str(compare_error)}")
+
                 if analyze_ai:
-                    with st.spinner(f"Analyzing your resume with {ai_model}..."):
-                        # Get file content
-                        text = ""
-                        try:
-                            if uploaded_file.type == "application/pdf":
-                                text = self.analyzer.extract_text_from_pdf(
-                                    uploaded_file)
-                            elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                                text = self.analyzer.extract_text_from_docx(
-                                    uploaded_file)
-                            else:
-                                text = uploaded_file.getvalue().decode()
-                        except Exception as e:
-                            st.error(f"Error reading file: {str(e)}")
-                            st.stop()
+                    try:
+                        # Per-session admission; the provider call itself draws on the global bucket
+                        admit_session(MODEL_CHOICES[ai_model][0])
+                        file_bytes = uploaded_file.getvalue()
+                        file_type = "docx" if uploaded_file.name.lower().endswith(".docx") else "pdf"
+                        job_role = selected_role if selected_role else "Not specified"
+                        job_description = custom_job_description if use_custom_job_desc and custom_job_description else None
+                        # Text extraction and analysis both run on the worker pool; identical
+                        # requests (a double click, a second tab) share one job
+                        job_id = submit_job("ai_analysis", {
+                            "file_bytes": file_bytes,
+                            "file_type": file_type,
+                            "job_description": job_description,
+                            "job_role": job_role,
+                            "provider": ai_model,
+                            "structured": True,
+                            "save": True
+                        }, dedupe_key=make_dedupe_key(
+                            "ai_analysis", file_bytes, job_description or "", job_role, ai_model, True))
+                        st.session_state['ai_analysis_job'] = job_id
+                        # Keep the job ID in the URL so a refresh or another tab picks the result up
+                        st.query_params["analysis_job"] = job_id
+                    except RateLimitExceeded as limit_error:
+                        st.warning(f"⏳ {str(limit_error)}")
+                    except Exception as ai_error:
+                        st.error(f"Error starting AI analysis: {str(ai_error)}")
+
+            compare_job_id = st.session_state.get('ai_compare_job')
+            if compare_job_id:
+                self.render_role_comparison_job(compare_job_id)
+
+            # The latest analysis is rendered on every rerun: progress while it runs, then the report
+            analysis_job_id = st.session_state.get('ai_analysis_job') or st.query_params.get("analysis_job")
+            if analysis_job_id:
+                self.render_ai_analysis_job(analysis_job_id)
+
+
+
+    def render_job_status(self, job_id, label, error_label):
+        """
+        Return the job once it is done. A queued or running job is shown with label and reruns
+        the page when it finishes, without blocking this run; a failed job shows its error.
+        """
+        job = JobQueue().get(job_id)
+        if job is None:
+            return None
+        if job["status"] == "done":
+            return job
+        if job["status"] == "failed":
+            st.error(f"{error_label}: {job['error']}")
+            return None
 
-                        # Analyze with AI
-                        try:
-                            # Show a loading animation
-                            with st.spinner("🧠 AI is analyzing your resume..."):
-                                progress_bar = st.progress(0)
-                                
-                                # Get the selected model
-                                selected_model = "Google Gemini"
-                                
-                                # Update progress
-                                progress_bar.progress(10)
-                                
-                                # Extract text from the resume
-                                analyzer = AIResumeAnalyzer()
-                                if uploaded_file.type == "application/pdf":
-                                    resume_text = analyzer.extract_text_from_pdf(
-                                        uploaded_file)
-                                elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                                    resume_text = analyzer.extract_text_from_docx(
-                                        uploaded_file)
-                                else:
-                                    # For text files or other formats
-                                    resume_text = uploaded_file.getvalue().decode('utf-8')
-                                
-                                # Initialize the AI analyzer (moved after text extraction)
-                                progress_bar.progress(30)
-                                
-                                # Get the job role
-                                job_role = selected_role if selected_role else "Not specified"
-                                
-                                # Update progress
-                                progress_bar.progress(50)
-                                
-                                # Analyze the resume with Google Gemini
-                                if use_custom_job_desc and custom_job_description:
-                                    # Use custom job description for analysis
-                                    analysis_result = analyzer.analyze_resume_with_gemini(
-                                        resume_text, job_role=job_role, job_description=custom_job_description)
-                                    # Show that custom job description was used
-                                    st.session_state['used_custom_job_desc'] = True
-                                else:
-                                    # Use standard role-based analysis
-                                    analysis_result = analyzer.analyze_resume_with_gemini(
-                                        resume_text, job_role=job_role)
-                                    st.session_state['used_custom_job_desc'] = False
+        @st.fragment(run_every=2)
+        def watch():
+            current = JobQueue().get(job_id)
+            if current is None or current["status"] in ("done", "failed"):
+                st.rerun()
+            st.info(f"⏳ {label}... ({current['status']})")
+        watch()
+        return None
+
+    def render_ai_analysis_job(self, job_id):
+        """Render an AI analysis job: its progress while it runs, the report once it is done"""
+        if JobQueue().get(job_id) is None:
+            st.session_state.pop('ai_analysis_job', None)
+            return
+        job = self.render_job_status(job_id, "🧠 AI is analyzing your resume", "Analysis failed")
+        if job is None:
+            return
+        analysis_result = job["result"]
+        if not analysis_result or "error" in analysis_result:
+            st.error(f"Analysis failed: {(analysis_result or {}).get('error', 'Unknown error')}")
+            return
+        self.render_ai_analysis_result(job_id, analysis_result)
+
+    def render_ai_analysis_result(self, job_id, analysis_result):
+        """Render a finished AI analysis report with score gauges and a PDF download"""
+        job_role = analysis_result.get("job_role") or "Not specified"
+        custom_job_description = analysis_result.get("job_description") or ""
+        used_custom_job_desc = bool(custom_job_description)
+
+        # Celebrate once per analysis, not on every rerun
+        if st.session_state.get('ai_analysis_shown') != job_id:
+            st.session_state['ai_analysis_shown'] = job_id
+            st.snow()
+        st.success("✅ Analysis complete!")
+
+        # Extract data from the analysis
+        full_response = analysis_result.get("analysis", "")
+        resume_score = analysis_result.get("resume_score", 0)
+        ats_score = analysis_result.get("ats_score", 0)
+        model_used = analysis_result.get("model_used", "AI")
+
+        # Store the full response in session state for download
+        st.session_state['full_analysis'] = full_response
+
+
+        # Display the analysis in a nice format
+        st.markdown("## Full Analysis Report")
+
+        # Get current date
+        from datetime import datetime
+        current_date = datetime.now().strftime("%B %d, %Y")
+
+        # Create a modern styled header for the report
+        st.markdown(f"""
+        <div style="background-color: #262730; padding: 20px; border-radius: 10px; margin-bottom: 20px;">
+            <h2 style="color: #ffffff; margin-bottom: 10px;">AI Resume Analysis Report</h2>
+            <div style="display: flex; flex-wrap: wrap; gap: 20px;">
+                <div style="flex: 1; min-width: 200px;">
+                    <p style="color: #ffffff;"><strong>Job Role:</strong> {job_role}</p>
+                    <p style="color: #ffffff;"><strong>Analysis Date:</strong> {current_date}</p>                                                                                                                                        </div>
+                <div style="flex: 1; min-width: 200px;">
+                    <p style="color: #ffffff;"><strong>AI Model:</strong> {model_used}</p>
+                    <p style="color: #ffffff;"><strong>Overall Score:</strong> {resume_score}/100 - {"Excellent" if resume_score >= 80 else "Good" if resume_score >= 60 else "Needs Improvement"}</p>
+                    {f'<p style="color: #4CAF50;"><strong>✓ Custom Job Description Used</strong></p>' if used_custom_job_desc else ''}
+        </div>
+        """, unsafe_allow_html=True)
 
-                                
-                                # Update progress
-                                progress_bar.progress(80)
-                                
-                                # Save the analysis to the database
-                                if analysis_result and "error" not in analysis_result:
-                                    # Extract the resume score
-                                    resume_score = analysis_result.get(
-                                        "resume_score", 0)
-                                    
-                                    # Save to database
-                                    save_ai_analysis_data(
-                                        None,  # No user_id needed
-                                        {
-                                            "model_used": selected_model,
-                                            "resume_score": resume_score,
-                                            "job_role": job_role
-                                        }
-                                    )
-                                # show snowflake effect
-                                st.snow()
+        # Add gauge charts for scores
+        import plotly.graph_objects as go
 
-                                # Complete the progress
-                                progress_bar.progress(100)
-                                
-                                # Display the analysis result
-                                if analysis_result and "error" not in analysis_result:
-                                    st.success("✅ Analysis complete!")
-                                    
-                                    # Extract data from the analysis
-                                    full_response = analysis_result.get(
-                                        "analysis", "")
-                                    resume_score = analysis_result.get(
-                                        "resume_score", 0)
-                                    ats_score = analysis_result.get(
-                                        "ats_score", 0)
-                                    model_used = analysis_result.get(
-                                        "model_used", selected_model)
-                                    
-                                    # Store the full response in session state for download
-                                    st.session_state['full_analysis'] = full_response
-                                    
-                                    # Display the analysis in a nice format
-                                    st.markdown("## Full Analysis Report")
-                                    
-                                    # Get current date
-                                    from datetime import datetime
-                                    current_date = datetime.now().strftime("%B %d, %Y")
-                                    
-                                    # Create a modern styled header for the report
-                                    st.markdown(f"""
-                                    <div style="background-color: #262730; padding: 20px; border-radius: 10px; margin-bottom: 20px;">
-                                        <h2 style="color: #ffffff; margin-bottom: 10px;">AI Resume Analysis Report</h2>
-                                        <div style="display: flex; flex-wrap: wrap; gap: 20px;">
-                                            <div style="flex: 1; min-width: 200px;">
-                                                <p style="color: #ffffff;"><strong>Job Role:</strong> {job_role if job_role else "Not specified"}</p>
-                                                <p style="color: #ffffff;"><strong>Analysis Date:</strong> {current_date}</p>                                                                                                                                        </div>
-                                            <div style="flex: 1; min-width: 200px;">
-                                                <p style="color: #ffffff;"><strong>AI Model:</strong> {model_used}</p>
-                                                <p style="color: #ffffff;"><strong>Overall Score:</strong> {resume_score}/100 - {"Excellent" if resume_score >= 80 else "Good" if resume_score >= 60 else "Needs Improvement"}</p>
-                                                {f'<p style="color: #4CAF50;"><strong>✓ Custom Job Description Used</strong></p>' if st.session_state.get('used_custom_job_desc', False) else ''}
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                                    
-                                    # Add gauge charts for scores
-                                    import plotly.graph_objects as go
-                                    
-                                    col1, col2 = st.columns(2)
-                                    
-                                    with col1:
-                                        # Resume Score Gauge
-                                        fig1 = go.Figure(go.Indicator(
-                                            mode="gauge+number",
-                                            value=resume_score,
-                                            domain={'x': [0, 1], 'y': [0, 1]},
-                                            title={'text': "Resume Score", 'font': {'size': 16}},
-                                            gauge={
-                                                'axis': {'range': [0, 100], 'tickwidth': 1},
-                                                'bar': {'color': "#4CAF50" if resume_score >= 80 else "#FFA500" if resume_score >= 60 else "#FF4444"},
-                                                'bgcolor': "white",
-                                                'borderwidth': 2,
-                                                'bordercolor': "gray",
-                                                'steps': [
-                                                    {'range': [0, 40], 'color': 'rgba(255, 68, 68, 0.2)'},
-                                                    {'range': [40, 60], 'color': 'rgba(255, 165, 0, 0.2)'},
-                                                    {'range': [60, 80], 'color': 'rgba(255, 214, 0, 0.2)'},
-                                                    {'range': [80, 100], 'color': 'rgba(76, 175, 80, 0.2)'}
-                                                ],
-                                                'threshold': {
-                                                    'line': {'color': "red", 'width': 4},
-                                                    'thickness': 0.75,
-                                                    'value': 60
-                                                }
-                                            }
-                                        ))
-                                        
-                                        fig1.update_layout(
-                                            height=250,
-                                            margin=dict(l=20, r=20, t=50, b=20),
-                                        )
-                                        
-                                        st.plotly_chart(fig1, use_container_width=True)
-                                        
-                                        status = "Excellent" if resume_score >= 80 else "Good" if resume_score >= 60 else "Needs Improvement"
-                                        st.markdown(f"<div style='text-align: center; font-weight: bold;'>{status}</div>", unsafe_allow_html=True)
-                                    
-                                    with col2:
-                                        # ATS Score Gauge
-                                        fig2 = go.Figure(go.Indicator(
-                                            mode="gauge+number",
-                                            value=ats_score,
-                                            domain={'x': [0, 1], 'y': [0, 1]},
-                                            title={'text': "ATS Optimization Score", 'font': {'size': 16}},
-                                            gauge={
-                                                'axis': {'range': [0, 100], 'tickwidth': 1},
-                                                'bar': {'color': "#4CAF50" if ats_score >= 80 else "#FFA500" if ats_score >= 60 else "#FF4444"},
-                                                'bgcolor': "white",
-                                                'borderwidth': 2,
-                                                'bordercolor': "gray",
-                                                'steps': [
-                                                    {'range': [0, 40], 'color': 'rgba(255, 68, 68, 0.2)'},
-                                                    {'range': [40, 60], 'color': 'rgba(255, 165, 0, 0.2)'},
-                                                    {'range': [60, 80], 'color': 'rgba(255, 214, 0, 0.2)'},
-                                                    {'range': [80, 100], 'color': 'rgba(76, 175, 80, 0.2)'}
-                                                ],
-                                                'threshold': {
-                                                    'line': {'color': "red", 'width': 4},
-                                                    'thickness': 0.75,
-                                                    'value': 60
-                                                }
-                                            }
-                                        ))
-                                        
-                                        fig2.update_layout(
-                                            height=250,
-                                            margin=dict(l=20, r=20, t=50, b=20),
-                                        )
-                                        
-                                        st.plotly_chart(fig2, use_container_width=True)
-                                        
-                                        status = "Excellent" if ats_score >= 80 else "Good" if ats_score >= 60 else "Needs Improvement"
-                                        st.markdown(f"<div style='text-align: center; font-weight: bold;'>{status}</div>", unsafe_allow_html=True)
-
-                                    # Add Job Description Match Score if custom job description was used
-                                    if st.session_state.get('used_custom_job_desc', False) and custom_job_description:
-                                        # Extract job match score from analysis result or calculate it
-                                        job_match_score = analysis_result.get("job_match_score", 0)
-                                        if not job_match_score and "job_match" in analysis_result:
-                                            job_match_score = analysis_result["job_match"].get("score", 0)
-                                        
-                                        # If we have a job match score, display it
-                                        if job_match_score:
-                                            st.markdown("""
-                                            <h3 style="background: linear-gradient(90deg, #4d7c0f, #84cc16); color: white; padding: 10px; border-radius: 5px; margin-top: 20px;">
-                                                <i class="fas fa-handshake"></i> Job Description Match Analysis
-                                            </h3>
-                                            """, unsafe_allow_html=True)
-                                            
-                                            col1, col2 = st.columns(2)
-                                            
-                                            with col1:
-                                                # Job Match Score Gauge
-                                                fig3 = go.Figure(go.Indicator(
-                                                    mode="gauge+number",
-                                                    value=job_match_score,
-                                                    domain={'x': [0, 1], 'y': [0, 1]},
-                                                    title={'text': "Job Match Score", 'font': {'size': 16}},
-                                                    gauge={
-                                                        'axis': {'range': [0, 100], 'tickwidth': 1},
-                                                        'bar': {'color': "#4CAF50" if job_match_score >= 80 else "#FFA500" if job_match_score >= 60 else "#FF4444"},
-                                                        'bgcolor': "white",
-                                                        'borderwidth': 2,
-                                                        'bordercolor': "gray",
-                                                        'steps': [
-                                                            {'range': [0, 40], 'color': 'rgba(255, 68, 68, 0.2)'},
-                                                            {'range': [40, 60], 'color': 'rgba(255, 165, 0, 0.2)'},
-                                                            {'range': [60, 80], 'color': 'rgba(255, 214, 0, 0.2)'},
-                                                            {'range': [80, 100], 'color': 'rgba(76, 175, 80, 0.2)'}
-                                                        ],
-                                                        'threshold': {
-                                                            'line': {'color': "red", 'width': 4},
-                                                            'thickness': 0.75,
-                                                            'value': 60
-                                                        }
-                                                    }
-                                                ))
-                                                
-                                                fig3.update_layout(
-                                                    height=250,
-                                                    margin=dict(l=20, r=20, t=50, b=20),
-                                                )
-                                                
-                                                st.plotly_chart(fig3, use_container_width=True)
-                                                
-                                                match_status = "Excellent Match" if job_match_score >= 80 else "Good Match" if job_match_score >= 60 else "Low Match"
-                                                st.markdown(f"<div style='text-align: center; font-weight: bold;'>{match_status}</div>", unsafe_allow_html=True)
-                                            
-                                            with col2:
-                                                st.markdown("""
-                                                <div style="background-color: #262730; padding: 20px; border-radius: 10px; height: 100%;">
-                                                    <h4 style="color: #ffffff; margin-bottom: 15px;">What This Means</h4>
-                                                    <p style="color: #ffffff;">This score represents how well your resume matches the specific job description you provided.</p>
-                                                    <ul style="color: #ffffff; padding-left: 20px;">
-                                                        <li><strong>80-100:</strong> Excellent match - your resume is highly aligned with this job</li>
-                                                        <li><strong>60-79:</strong> Good match - your resume matches many requirements</li>
-                                                        <li><strong>Below 60:</strong> Consider tailoring your resume more specifically to this job</li>
-                                                    </ul>
-                                                </div>
-                                                """, unsafe_allow_html=True)
-                                    
-
-                                    # Format the full response with better styling
-                                    formatted_analysis = full_response
-                                    
-                                    # Replace section headers with styled headers
-                                    section_styles = {
-                                        "## Overall Assessment": """<div class="report-section">
-                                            <h3 style="background: linear-gradient(90deg, #1e3a8a, #3b82f6); color: white; padding: 10px; border-radius: 5px;">
-                                                <i class="fas fa-chart-line"></i> Overall Assessment
-                                            </h3>
-                                            <div class="section-content">""",
-                                            
-                                        "## Professional Profile Analysis": """<div class="report-section">
-                                            <h3 style="background: linear-gradient(90deg, #047857, #10b981); color: white; padding: 10px; border-radius: 5px;">
-                                                <i class="fas fa-user-tie"></i> Professional Profile Analysis
-                                            </h3>
-                                            <div class="section-content">""",
-                                            
-                                        "## Skills Analysis": """<div class="report-section">
-                                            <h3 style="background: linear-gradient(90deg, #4f46e5, #818cf8); color: white; padding: 10px; border-radius: 5px;">
-                                                <i class="fas fa-tools"></i> Skills Analysis
-                                            </h3>
-                                            <div class="section-content">""",
-                                            
-                                        "## Experience Analysis": """<div class="report-section">
-                                            <h3 style="background: linear-gradient(90deg, #9f1239, #e11d48); color: white; padding: 10px; border-radius: 5px;">
-                                                <i class="fas fa-briefcase"></i> Experience Analysis
-                                            </h3>
-                                            <div class="section-content">""",
-                                            
-                                        "## Education Analysis": """<div class="report-section">
-                                            <h3 style="background: linear-gradient(90deg, #854d0e, #eab308); color: white; padding: 10px; border-radius: 5px;">
-                                                <i class="fas fa-graduation-cap"></i> Education Analysis
-                                            </h3>
-                                            <div class="section-content">""",
-                                            
-                                        "## Key Strengths": """<div class="report-section">
-                                            <h3 style="background: linear-gradient(90deg, #166534, #22c55e); color: white; padding: 10px; border-radius: 5px;">
-                                                <i class="fas fa-check-circle"></i> Key Strengths
-                                            </h3>
-                                            <div class="section-content">""",
-                                            
-                                        "## Areas for Improvement": """<div class="report-section">
-                                            <h3 style="background: linear-gradient(90deg, #9f1239, #fb7185); color: white; padding: 10px; border-radius: 5px;">
-                                                <i class="fas fa-exclamation-circle"></i> Areas for Improvement
-                                            </h3>
-                                            <div class="section-content">""",
-                                            
-                                        "## ATS Optimization Assessment": """<div class="report-section">
-                                            <h3 style="background: linear-gradient(90deg, #0e7490, #06b6d4); color: white; padding: 10px; border-radius: 5px;">
-                                                <i class="fas fa-robot"></i> ATS Optimization Assessment
-                                            </h3>
-                                            <div class="section-content">""",
-                                            
-                                        "## Recommended Courses": """<div class="report-section">
-                                            <h3 style="background: linear-gradient(90deg, #5b21b6, #8b5cf6); color: white; padding: 10px; border-radius: 5px;">
-                                                <i class="fas fa-book"></i> Recommended Courses
-                                            </h3>
-                                            <div class="section-content">""",
-                                            
-                                        "## Resume Score": """<div class="report-section">
-                                            <h3 style="background: linear-gradient(90deg, #0369a1, #0ea5e9); color: white; padding: 10px; border-radius: 5px;">
-                                                <i class="fas fa-star"></i> Resume Score
-                                            </h3>
-                                            <div class="section-content">""",
-                                            
-                                        "## Role Alignment Analysis": """<div class="report-section">
-                                            <h3 style="background: linear-gradient(90deg, #7c2d12, #ea580c); color: white; padding: 10px; border-radius: 5px;">
-                                                <i class="fas fa-bullseye"></i> Role Alignment Analysis
-                                            </h3>
-                                            <div class="section-content">""",
-                                            
-                                        "## Job Match Analysis": """<div class="report-section">
-                                            <h3 style="background: linear-gradient(90deg, #4d7c0f, #84cc16); color: white; padding: 10px; border-radius: 5px;">
-                                                <i class="fas fa-handshake"></i> Job Match Analysis
-                                            </h3>
-                                            <div class="section-content">""",
-                                    }
-                                    
-                                    # Apply the styling to each section
-                                    for section, style in section_styles.items():
-                                        if section in formatted_analysis:
-                                            formatted_analysis = formatted_analysis.replace(
-                                                section, style)
-                                            # Add closing div tags
-                                            next_section = False
-                                            for next_sec in section_styles.keys():
-                                                if next_sec != section and next_sec in formatted_analysis.split(style)[1]:
-                                                    split_text = formatted_analysis.split(style)[1].split(next_sec)
-                                                    formatted_analysis = formatted_analysis.split(style)[0] + style + split_text[0] + "</div></div>" + next_sec + "".join(split_text[1:])
-                                                    next_section = True
-                                                    break
-                                            if not next_section:
-                                                formatted_analysis = formatted_analysis + "</div></div>"
-                                    
-                                    # Remove any extra closing div tags that might have been added
-                                    formatted_analysis = formatted_analysis.replace("</div></div></div></div>", "</div></div>")
-                                    
-                                    # Ensure we don't have any orphaned closing tags at the end
-                                    if formatted_analysis.endswith("</div>"):
-                                        # Count opening and closing div tags
-                                        open_tags = formatted_analysis.count("<div")
-                                        close_tags = formatted_analysis.count("</div>")
-                                        
-                                        # If we have more closing than opening tags, remove the extras
-                                        if close_tags > open_tags:
-                                            excess = close_tags - open_tags
-                                            formatted_analysis = formatted_analysis[:-6 * excess]
-                                    
-                                    # Clean up any visible HTML tags that might appear in the text
-                                    formatted_analysis = formatted_analysis.replace("&lt;/div&gt;", "")
-                                    formatted_analysis = formatted_analysis.replace("&lt;div&gt;", "")
-                                    formatted_analysis = formatted_analysis.replace("<div>", "<div>")  # Ensure proper opening
-                                    formatted_analysis = formatted_analysis.replace("</div>", "</div>")  # Ensure proper closing
-                                    
-                                    # Add CSS for the report
-                                    st.markdown("""
-                                    <style>
-                                        .report-section {
-                                            margin-bottom: 25px;
-                                            border: 1px solid #4B4B4B;
-                                            border-radius: 8px;
-                                            overflow: hidden;
-                                        }
-                                        .section-content {
-                                            padding: 15px;
-                                            background-color: #262730;
-                                            color: #ffffff;
-                                        }
-                                        .report-section h3 {
-                                            margin-top: 0;
-                                            font-weight: 600;
-                                        }
-                                        .report-section ul {
-                                            padding-left: 20px;
-                                        }
-                                        .report-section p {
-                                            color: #ffffff;
-                                            margin-bottom: 10px;
-                                        }
-                                        .report-section li {
-                                            color: #ffffff;
-                                            margin-bottom: 5px;
-                                        }
-                                    </style>
-                                    """, unsafe_allow_html=True)
-
-                                    # Display the formatted analysis
-                                    st.markdown(f"""
-                                    <div style="background-color: #262730; padding: 20px; border-radius: 10px; border: 1px solid #4B4B4B; color: #ffffff;">
-                                        {formatted_analysis}
-                                    </div>
-                                    """, unsafe_allow_html=True)
-
-                                    # Create a PDF report
-                                    pdf_buffer = self.ai_analyzer.generate_pdf_report(
-                                        analysis_result={
-                                            "score": resume_score,
-                                            "ats_score": ats_score,
-                                            "model_used": model_used,
-                                            "full_response": full_response,
-                                            "strengths": analysis_result.get("strengths", []),
-                                            "weaknesses": analysis_result.get("weaknesses", []),
-                                            "used_custom_job_desc": st.session_state.get('used_custom_job_desc', False),
-                                            "custom_job_description": custom_job_description if st.session_state.get('used_custom_job_desc', False) else ""
-                                        },
-                                        candidate_name=st.session_state.get(
-                                            'candidate_name', 'Candidate'),
-                                        job_role=selected_role
-                                    )
+        col1, col2 = st.columns(2)
 
-                                    # PDF download button
-                                    if pdf_buffer:
-                                        st.download_button(
-                                            label="📊 Download PDF Report",
-                                            data=pdf_buffer,
-                                            file_name=f"resume_analysis_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                                            mime="application/pdf",
-                                            use_container_width=True,
-                                            on_click=lambda: st.balloons()
-                                        )
-                                    else:
-                                        st.error("PDF generation failed. Please try again later.")
-                                else:
-                                    st.error(f"Analysis failed: {analysis_result.get('error', 'Unknown error')}")
-                        except Exception as ai_error:
-                            st.error(f"Error during AI analysis: {str(ai_error)}")
-                            import traceback as tb
-                            st.code(tb.format_exc())
+        with col1:
+            # Resume Score Gauge
+            fig1 = go.Figure(go.Indicator(
+                mode="gauge+number",
+                value=resume_score,
+                domain={'x': [0, 1], 'y': [0, 1]},
+                title={'text': "Resume Score", 'font': {'size': 16}},
+                gauge={
+                    'axis': {'range': [0, 100], 'tickwidth': 1},
+                    'bar': {'color': "#4CAF50" if resume_score >= 80 else "#FFA500" if resume_score >= 60 else "#FF4444"},
+                    'bgcolor': "white",
+                    'borderwidth': 2,
+                    'bordercolor': "gray",
+                    'steps': [
+                        {'range': [0, 40], 'color': 'rgba(255, 68, 68, 0.2)'},
+                        {'range': [40, 60], 'color': 'rgba(255, 165, 0, 0.2)'},
+                        {'range': [60, 80], 'color': 'rgba(255, 214, 0, 0.2)'},
+                        {'range': [80, 100], 'color': 'rgba(76, 175, 80, 0.2)'}
+                    ],
+                    'threshold': {
+                        'line': {'color': "red", 'width': 4},
+                        'thickness': 0.75,
+                        'value': 60
+                    }
+                }
+            ))
+
+            fig1.update_layout(
+                height=250,
+                margin=dict(l=20, r=20, t=50, b=20),
+            )
+
+            st.plotly_chart(fig1, use_container_width=True)
+
+            status = "Excellent" if resume_score >= 80 else "Good" if resume_score >= 60 else "Needs Improvement"
+            st.markdown(f"<div style='text-align: center; font-weight: bold;'>{status}</div>", unsafe_allow_html=True)
+
+        with col2:
+            # ATS Score Gauge
+            fig2 = go.Figure(go.Indicator(
+                mode="gauge+number",
+                value=ats_score,
+                domain={'x': [0, 1], 'y': [0, 1]},
+                title={'text': "ATS Optimization Score", 'font': {'size': 16}},
+                gauge={
+                    'axis': {'range': [0, 100], 'tickwidth': 1},
+                    'bar': {'color': "#4CAF50" if ats_score >= 80 else "#FFA500" if ats_score >= 60 else "#FF4444"},
+                    'bgcolor': "white",
+                    'borderwidth': 2,
+                    'bordercolor': "gray",
+                    'steps': [
+                        {'range': [0, 40], 'color': 'rgba(255, 68, 68, 0.2)'},
+                        {'range': [40, 60], 'color': 'rgba(255, 165, 0, 0.2)'},
+                        {'range': [60, 80], 'color': 'rgba(255, 214, 0, 0.2)'},
+                        {'range': [80, 100], 'color': 'rgba(76, 175, 80, 0.2)'}
+                    ],
+                    'threshold': {
+                        'line': {'color': "red", 'width': 4},
+                        'thickness': 0.75,
+                        'value': 60
+                    }
+                }
+            ))
+
+            fig2.update_layout(
+                height=250,
+                margin=dict(l=20, r=20, t=50, b=20),
+            )
+
+            st.plotly_chart(fig2, use_container_width=True)
+
+            status = "Excellent" if ats_score >= 80 else "Good" if ats_score >= 60 else "Needs Improvement"
+            st.markdown(f"<div style='text-align: center; font-weight: bold;'>{status}</div>", unsafe_allow_html=True)
+
+        # Add Job Description Match Score if custom job description was used
+        if used_custom_job_desc:
+            # Extract job match score from analysis result or calculate it
+            job_match_score = analysis_result.get("job_match_score", 0)
+            if not job_match_score and "job_match" in analysis_result:
+                job_match_score = analysis_result["job_match"].get("score", 0)
+
+            # If we have a job match score, display it
+            if job_match_score:
+                st.markdown("""
+                <h3 style="background: linear-gradient(90deg, #4d7c0f, #84cc16); color: white; padding: 10px; border-radius: 5px; margin-top: 20px;">
+                    <i class="fas fa-handshake"></i> Job Description Match Analysis
+                </h3>
+                """, unsafe_allow_html=True)
+
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    # Job Match Score Gauge
+                    fig3 = go.Figure(go.Indicator(
+                        mode="gauge+number",
+                        value=job_match_score,
+                        domain={'x': [0, 1], 'y': [0, 1]},
+                        title={'text': "Job Match Score", 'font': {'size': 16}},
+                        gauge={
+                            'axis': {'range': [0, 100], 'tickwidth': 1},
+                            'bar': {'color': "#4CAF50" if job_match_score >= 80 else "#FFA500" if job_match_score >= 60 else "#FF4444"},
+                            'bgcolor': "white",
+                            'borderwidth': 2,
+                            'bordercolor': "gray",
+                            'steps': [
+                                {'range': [0, 40], 'color': 'rgba(255, 68, 68, 0.2)'},
+                                {'range': [40, 60], 'color': 'rgba(255, 165, 0, 0.2)'},
+                                {'range': [60, 80], 'color': 'rgba(255, 214, 0, 0.2)'},
+                                {'range': [80, 100], 'color': 'rgba(76, 175, 80, 0.2)'}
+                            ],
+                            'threshold': {
+                                'line': {'color': "red", 'width': 4},
+                                'thickness': 0.75,
+                                'value': 60
+                            }
+                        }
+                    ))
+
+                    fig3.update_layout(
+                        height=250,
+                        margin=dict(l=20, r=20, t=50, b=20),
+                    )
+
+                    st.plotly_chart(fig3, use_container_width=True)
+
+                    match_status = "Excellent Match" if job_match_score >= 80 else "Good Match" if job_match_score >= 60 else "Low Match"
+                    st.markdown(f"<div style='text-align: center; font-weight: bold;'>{match_status}</div>", unsafe_allow_html=True)
+
+                with col2:
+                    st.markdown("""
+                    <div style="background-color: #262730; padding: 20px; border-radius: 10px; height: 100%;">
+                        <h4 style="color: #ffffff; margin-bottom: 15px;">What This Means</h4>
+                        <p style="color: #ffffff;">This score represents how well your resume matches the specific job description you provided.</p>
+                        <ul style="color: #ffffff; padding-left: 20px;">
+                            <li><strong>80-100:</strong> Excellent match - your resume is highly aligned with this job</li>
+                            <li><strong>60-79:</strong> Good match - your resume matches many requirements</li>
+                            <li><strong>Below 60:</strong> Consider tailoring your resume more specifically to this job</li>
+                        </ul>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+
+        # Format the full response with better styling
+        formatted_analysis = full_response
+
+        # Replace section headers with styled headers
+        section_styles = {
+            "## Overall Assessment": """<div class="report-section">
+                <h3 style="background: linear-gradient(90deg, #1e3a8a, #3b82f6); color: white; padding: 10px; border-radius: 5px;">
+                    <i class="fas fa-chart-line"></i> Overall Assessment
+                </h3>
+                <div class="section-content">""",
+
+            "## Professional Profile Analysis": """<div class="report-section">
+                <h3 style="background: linear-gradient(90deg, #047857, #10b981); color: white; padding: 10px; border-radius: 5px;">
+                    <i class="fas fa-user-tie"></i> Professional Profile Analysis
+                </h3>
+                <div class="section-content">""",
+
+            "## Skills Analysis": """<div class="report-section">
+                <h3 style="background: linear-gradient(90deg, #4f46e5, #818cf8); color: white; padding: 10px; border-radius: 5px;">
+                    <i class="fas fa-tools"></i> Skills Analysis
+                </h3>
+                <div class="section-content">""",
+
+            "## Experience Analysis": """<div class="report-section">
+                <h3 style="background: linear-gradient(90deg, #9f1239, #e11d48); color: white; padding: 10px; border-radius: 5px;">
+                    <i class="fas fa-briefcase"></i> Experience Analysis
+                </h3>
+                <div class="section-content">""",
+
+            "## Education Analysis": """<div class="report-section">
+                <h3 style="background: linear-gradient(90deg, #854d0e, #eab308); color: white; padding: 10px; border-radius: 5px;">
+                    <i class="fas fa-graduation-cap"></i> Education Analysis
+                </h3>
+                <div class="section-content">""",
+
+            "## Key Strengths": """<div class="report-section">
+                <h3 style="background: linear-gradient(90deg, #166534, #22c55e); color: white; padding: 10px; border-radius: 5px;">
+                    <i class="fas fa-check-circle"></i> Key Strengths
+                </h3>
+                <div class="section-content">""",
+
+            "## Areas for Improvement": """<div class="report-section">
+                <h3 style="background: linear-gradient(90deg, #9f1239, #fb7185); color: white; padding: 10px; border-radius: 5px;">
+                    <i class="fas fa-exclamation-circle"></i> Areas for Improvement
+                </h3>
+                <div class="section-content">""",
+
+            "## ATS Optimization Assessment": """<div class="report-section">
+                <h3 style="background: linear-gradient(90deg, #0e7490, #06b6d4); color: white; padding: 10px; border-radius: 5px;">
+                    <i class="fas fa-robot"></i> ATS Optimization Assessment
+                </h3>
+                <div class="section-content">""",
+
+            "## Recommended Courses": """<div class="report-section">
+                <h3 style="background: linear-gradient(90deg, #5b21b6, #8b5cf6); color: white; padding: 10px; border-radius: 5px;">
+                    <i class="fas fa-book"></i> Recommended Courses
+                </h3>
+                <div class="section-content">""",
+
+            "## Resume Score": """<div class="report-section">
+                <h3 style="background: linear-gradient(90deg, #0369a1, #0ea5e9); color: white; padding: 10px; border-radius: 5px;">
+                    <i class="fas fa-star"></i> Resume Score
+                </h3>
+                <div class="section-content">""",
+
+            "## Role Alignment Analysis": """<div class="report-section">
+                <h3 style="background: linear-gradient(90deg, #7c2d12, #ea580c); color: white; padding: 10px; border-radius: 5px;">
+                    <i class="fas fa-bullseye"></i> Role Alignment Analysis
+                </h3>
+                <div class="section-content">""",
+
+            "## Job Match Analysis": """<div class="report-section">
+                <h3 style="background: linear-gradient(90deg, #4d7c0f, #84cc16); color: white; padding: 10px; border-radius: 5px;">
+                    <i class="fas fa-handshake"></i> Job Match Analysis
+                </h3>
+                <div class="section-content">""",
+        }
+
+        # Apply the styling to each section
+        for section, style in section_styles.items():
+            if section in formatted_analysis:
+                formatted_analysis = formatted_analysis.replace(
+                    section, style)
+                # Add closing div tags
+                next_section = False
+                for next_sec in section_styles.keys():
+                    if next_sec != section and next_sec in formatted_analysis.split(style)[1]:
+                        split_text = formatted_analysis.split(style)[1].split(next_sec)
+                        formatted_analysis = formatted_analysis.split(style)[0] + style + split_text[0] + "</div></div>" + next_sec + "".join(split_text[1:])
+                        next_section = True
+                        break
+                if not next_section:
+                    formatted_analysis = formatted_analysis + "</div></div>"
+
+        # Remove any extra closing div tags that might have been added
+        formatted_analysis = formatted_analysis.replace("</div></div></div></div>", "</div></div>")
+
+        # Ensure we don't have any orphaned closing tags at the end
+        if formatted_analysis.endswith("</div>"):
+            # Count opening and closing div tags
+            open_tags = formatted_analysis.count("<div")
+            close_tags = formatted_analysis.count("</div>")
+
+            # If we have more closing than opening tags, remove the extras
+            if close_tags > open_tags:
+                excess = close_tags - open_tags
+                formatted_analysis = formatted_analysis[:-6 * excess]
+
+        # Clean up any visible HTML tags that might appear in the text
+        formatted_analysis = formatted_analysis.replace("&lt;/div&gt;", "")
+        formatted_analysis = formatted_analysis.replace("&lt;div&gt;", "")
+        formatted_analysis = formatted_analysis.replace("<div>", "<div>")  # Ensure proper opening
+        formatted_analysis = formatted_analysis.replace("</div>", "</div>")  # Ensure proper closing
+
+        # Add CSS for the report
+        st.markdown("""
+        <style>
+            .report-section {
+                margin-bottom: 25px;
+                border: 1px solid #4B4B4B;
+                border-radius: 8px;
+                overflow: hidden;
+            }
+            .section-content {
+                padding: 15px;
+                background-color: #262730;
+                color: #ffffff;
+            }
+            .report-section h3 {
+                margin-top: 0;
+                font-weight: 600;
+            }
+            .report-section ul {
+                padding-left: 20px;
+            }
+            .report-section p {
+                color: #ffffff;
+                margin-bottom: 10px;
+            }
+            .report-section li {
+                color: #ffffff;
+                margin-bottom: 5px;
+            }
+        </style>
+        """, unsafe_allow_html=True)
+
+        # Display the formatted analysis
+        st.markdown(f"""
+        <div style="background-color: #262730; padding: 20px; border-radius: 10px; border: 1px solid #4B4B4B; color: #ffffff;">
+            {formatted_analysis}
+        </div>
+        """, unsafe_allow_html=True)
+
+        # Create a PDF report on the worker pool; identical reports reuse the finished job
+        pdf_job_id = submit_job("pdf_report", dict(
+            analysis_result={
+                "score": resume_score,
+                "ats_score": ats_score,
+                "model_used": model_used,
+                "full_response": full_response,
+                "strengths": analysis_result.get("strengths", []),
+                "weaknesses": analysis_result.get("weaknesses", []),
+                "used_custom_job_desc": used_custom_job_desc,
+                "custom_job_description": custom_job_description
+            },
+            candidate_name=st.session_state.get('candidate_name', 'Candidate'),
+            job_role=job_role
+        ), dedupe=True)
+        pdf_job = self.render_job_status(pdf_job_id, "📊 Preparing your PDF report", "PDF generation failed")
+
+        # PDF download button
+        if pdf_job is not None:
+            st.download_button(
+                label="📊 Download PDF Report",
+                data=pdf_job["result"],
+                file_name=f"resume_analysis_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
+                mime="application/pdf",
+                use_container_width=True,
+                on_click=lambda: st.balloons()
+            )
 
 
+    def render_role_comparison_job(self, job_id):
+        """Render a multi-role comparison job: its progress while it runs, the comparison once it is done"""
+        if JobQueue().get(job_id) is None:
+            st.session_state.pop('ai_compare_job', None)
+            return
+        job = self.render_job_status(job_id, "⚖️ Comparing roles", "Error during role comparison")
+        if job is not None:
+            self.render_role_comparison(job["result"])
+
+    def render_role_comparison(self, comparison_result):
+        """Render a multi-role analysis side by side"""
+        if not comparison_result or "error" in comparison_result:
+            st.error(f"Role comparison failed: {(comparison_result or {}).get('error', 'Unknown error')}")
+            return
+
+        rows = comparison_result["comparison"]
+        if comparison_result.get("best_role"):
+            st.success(f"✅ Best fit: **{comparison_result['best_role']}** "
+                       f"(analyzed with {comparison_result.get('model_used', 'AI')})")
+
+        columns = st.columns(len(rows))
+        for column, row in zip(columns, rows):
+            with column:
+                st.markdown(f"#### {row['role']}")
+                if row["error"]:
+                    st.error(row["error"])
+                    continue
+                st.metric("Resume Score", f"{row['resume_score']}/100")
+                st.metric("ATS Score", f"{row['ats_score']}/100")
+                st.markdown("**Top strengths**")
+                for strength in row["top_strengths"]:
+                    st.markdown(f"- {strength}")
+                st.markdown("**Missing skills**")
+                st.markdown(", ".join(row["missing_skills"]) or "None identified")
+
+        st.dataframe(pd.DataFrame([{
+            "Role": row["role"],
+            "Resume Score": row["resume_score"],
+            "ATS Score": row["ats_score"],
+            "Missing Skills": len(row["missing_skills"])
+        } for row in rows]), use_container_width=True, hide_index=True)
+
+        for row in rows:
+            result = comparison_result["roles"].get(row["role"], {})
+            if result.get("analysis"):
+                with st.expander(f"Full analysis: {row['role']}"):
+                    st.markdown(result["analysis"])
 
     def render_home(self):
         apply_modern_styles()
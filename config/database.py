@@ -1,89 +1,266 @@
+import os
+import ast
+import json
 import sqlite3
+import threading
 from datetime import datetime
 
+from config.migrations import ensure_schema
+from config.similarity import (
+    minhash, pack_signature, unpack_signature, signature_text, estimate_similarity, get_lsh_index
+)
+from config.write_behind import WRITE_MODE, get_write_queue
+
+DB_PATH = os.getenv("RESUME_DB_PATH", "resume_data.db")
+
+# Connection tuning; busy_timeout makes writers queue on the lock instead of failing with
+# "database is locked", and WAL lets readers proceed while a write is in progress
+BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000"))
+CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+CACHED_STATEMENTS = 256
+
+_local = threading.local()
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Connection owned by the per-thread pool. close() hands it back instead of closing it,
+    rolling back anything the caller left uncommitted.
+    """
+
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+    def really_close(self):
+        super().close()
+
+
+def get_connection(db_path=DB_PATH):
+    """Return this thread's pooled connection to db_path, opening it on first use"""
+    pool = getattr(_local, "connections", None)
+    if pool is None:
+        pool = _local.connections = {}
+    conn = pool.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(
+            db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            factory=PooledConnection,
+            cached_statements=CACHED_STATEMENTS
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        pool[db_path] = conn
+    return conn
+
+
+def close_connections():
+    """Close every pooled connection opened by the calling thread"""
+    pool = getattr(_local, "connections", None) or {}
+    for conn in pool.values():
+        conn.really_close()
+    pool.clear()
+
+
 def get_database_connection():
-    """Create and return a database connection"""
-    conn = sqlite3.connect('resume_data.db')
+    """Return the pooled connection to the resume database, migrating it on first use"""
+    conn = get_connection(DB_PATH)
+    ensure_schema(conn, DB_PATH)
     return conn
 
 def init_database():
-    """Initialize database tables"""
-    conn = get_database_connection()
-    cursor = conn.cursor()
-    
-    # Create resume_data table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS resume_data (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        email TEXT NOT NULL,
-        phone TEXT NOT NULL,
-        linkedin TEXT,
-        github TEXT,
-        portfolio TEXT,
-        summary TEXT,
-        target_role TEXT,
-        target_category TEXT,
-        education TEXT,
-        experience TEXT,
-        projects TEXT,
-        skills TEXT,
-        template TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    """Bring the database schema up to date (no-op after the first call in a process)"""
+    get_database_connection()
+
+def queue_write(sql, params, label, db_path=DB_PATH):
+    """Hand an insert nobody reads back immediately to the write-behind queue"""
+    if db_path == DB_PATH:
+        # The writer thread relies on the schema being migrated already
+        init_database()
+    get_write_queue().submit(db_path, sql, params, label)
+
+# Keyword rules for skill categories, checked in order (same buckets the dashboard always used)
+SKILL_CATEGORIES = [
+    ('Programming', ('python', 'java', 'javascript', 'c++', 'programming')),
+    ('Database', ('sql', 'database', 'mongodb')),
+    ('Cloud', ('aws', 'cloud', 'azure')),
+    ('Management', ('agile', 'scrum', 'management')),
+]
+
+def categorize_skill(skill_name):
+    """Return the dashboard category for a skill name"""
+    name = skill_name.lower()
+    for category, keywords in SKILL_CATEGORIES:
+        if any(keyword in name for keyword in keywords):
+            return category
+    return 'Other'
+
+def normalize_skills(skills):
+    """
+    Flatten skills as stored by the builder (dict of lists), the analyzer (list) or an
+    old str(...) column value into unique, trimmed skill names
+    """
+    if isinstance(skills, str):
+        try:
+            skills = ast.literal_eval(skills)
+        except (ValueError, SyntaxError):
+            pass
+    if isinstance(skills, dict):
+        skills = [item for values in skills.values() for item in (values if isinstance(values, (list, tuple)) else [values])]
+    if isinstance(skills, str):
+        skills = [skills]
+
+    names, seen = [], set()
+    for item in skills or []:
+        for part in str(item).split(','):
+            name = part.strip(' \t\n[]"\'')
+            if not name or name.lower() in seen:
+                continue
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+def save_resume_skills(cursor, resume_id, skills):
+    """Insert the normalized skills of one resume using the caller's transaction"""
+    rows = [(resume_id, name, categorize_skill(name)) for name in normalize_skills(skills)]
+    cursor.executemany(
+        'INSERT INTO resume_skills (resume_id, skill_name, skill_category) VALUES (?, ?, ?)',
+        rows
     )
-    ''')
-    
-    # Create resume_skills table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS resume_skills (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        resume_id INTEGER,
-        skill_name TEXT NOT NULL,
-        skill_category TEXT NOT NULL,
-        proficiency_score REAL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (resume_id) REFERENCES resume_data (id)
+    return len(rows)
+
+def _resume_row(data):
+    personal_info = data.get('personal_info', {})
+    return (
+        personal_info.get('full_name', ''),
+        personal_info.get('email', ''),
+        personal_info.get('phone', ''),
+        personal_info.get('linkedin', ''),
+        personal_info.get('github', ''),
+        personal_info.get('portfolio', ''),
+        data.get('summary', ''),
+        data.get('target_role', ''),
+        data.get('target_category', ''),
+        str(data.get('education', [])),
+        str(data.get('experience', [])),
+        str(data.get('projects', [])),
+        str(data.get('skills', [])),
+        data.get('template', ''),
+        data.get('resume_text'),
+        data.get('content_hash')
     )
-    ''')
-    
-    # Create resume_analysis table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS resume_analysis (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        resume_id INTEGER,
-        ats_score REAL,
-        keyword_match_score REAL,
-        format_score REAL,
-        section_score REAL,
-        missing_skills TEXT,
-        recommendations TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (resume_id) REFERENCES resume_data (id)
+
+def _analysis_row(resume_id, analysis):
+    return (
+        resume_id,
+        float(analysis.get('ats_score', 0)),
+        float(analysis.get('keyword_match_score', 0)),
+        float(analysis.get('format_score', 0)),
+        float(analysis.get('section_score', 0)),
+        analysis.get('missing_skills', ''),
+        analysis.get('recommendations', '')
     )
-    ''')
-    
-    # Create admin_logs table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS admin_logs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        admin_email TEXT NOT NULL,
-        action TEXT NOT NULL,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+
+def _ai_analysis_row(resume_id, analysis_data):
+    return (
+        resume_id,
+        analysis_data.get('model_used', ''),
+        analysis_data.get('resume_score', 0),
+        analysis_data.get('job_role', '')
     )
-    ''')
-    
-    # Create admin table
+
+INSERT_RESUME_SQL = '''
+INSERT INTO resume_data (
+    name, email, phone, linkedin, github, portfolio,
+    summary, target_role, target_category, education, 
+    experience, projects, skills, template, resume_text, content_hash
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_ANALYSIS_SQL = '''
+INSERT INTO resume_analysis (
+    resume_id, ats_score, keyword_match_score,
+    format_score, section_score, missing_skills,
+    recommendations
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_AI_ANALYSIS_SQL = '''
+INSERT INTO ai_analysis (
+    resume_id, model_used, resume_score, job_role
+) VALUES (?, ?, ?, ?)
+'''
+
+def insert_resume(cursor, data):
+    """
+    Insert one resume with its skills and similarity signature on the caller's cursor;
+    the caller commits. Every submission gets its own row, so its role and analyses stay
+    its own; repeat uploads of a file share content_hash, and through it the stored
+    extraction and analysis results, but are still recorded.
+    """
+    cursor.execute(INSERT_RESUME_SQL, _resume_row(data))
+    resume_id = cursor.lastrowid
+    save_resume_skills(cursor, resume_id, data.get('skills', []))
+    _save_resume_signature(cursor, resume_id, data)
+    return resume_id
+
+def _resume_signature(data):
+    """MinHash of a resume dict, fingerprinted on the same fields the stored row keeps"""
+    personal_info = data.get('personal_info', {})
+    return minhash(signature_text(
+        data.get('resume_text'),
+        data.get('summary', ''),
+        str(data.get('skills', [])),
+        str(data.get('experience', [])),
+        str(data.get('projects', [])),
+        name=personal_info.get('full_name', ''),
+        email=personal_info.get('email', ''),
+        education=str(data.get('education', []))
+    ))
+
+def _stored_resume_signature(cursor, resume_id):
+    """
+    (signature, computed) for a stored resume. A resume saved without a signature gets
+    one computed from its row and saved; signature is None for an unknown id or an empty row.
+    """
+    cursor.execute('SELECT signature FROM resume_signatures WHERE resume_id = ?', (resume_id,))
+    row = cursor.fetchone()
+    if row is not None:
+        return unpack_signature(row[0]), False
     cursor.execute('''
-    CREATE TABLE IF NOT EXISTS admin (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        email TEXT NOT NULL UNIQUE,
-        password TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    SELECT resume_text, summary, skills, experience, projects, name, email, education
+    FROM resume_data WHERE id = ?
+    ''', (resume_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None, False
+    resume_text, summary, skills, experience, projects, name, email, education = row
+    data = {
+        'resume_text': resume_text,
+        'personal_info': {'full_name': name or '', 'email': email or ''},
+        'summary': summary or '',
+        'skills': skills or '',
+        'experience': experience or '',
+        'projects': projects or '',
+        'education': education or ''
+    }
+    signature = _resume_signature(data)
+    if signature is not None:
+        _save_resume_signature(cursor, resume_id, data)
+    return signature, signature is not None
+
+def _save_resume_signature(cursor, resume_id, data):
+    signature = _resume_signature(data)
+    if signature is not None:
+        cursor.execute(
+            'INSERT OR REPLACE INTO resume_signatures (resume_id, signature) VALUES (?, ?)',
+            (resume_id, pack_signature(signature))
+        )
 
 def save_resume_data(data):
     """Save resume data to database"""
@@ -91,33 +268,9 @@ def save_resume_data(data):
     cursor = conn.cursor()
     
     try:
-        personal_info = data.get('personal_info', {})
-        
-        cursor.execute('''
-        INSERT INTO resume_data (
-            name, email, phone, linkedin, github, portfolio,
-            summary, target_role, target_category, education, 
-            experience, projects, skills, template
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            personal_info.get('full_name', ''),
-            personal_info.get('email', ''),
-            personal_info.get('phone', ''),
-            personal_info.get('linkedin', ''),
-            personal_info.get('github', ''),
-            personal_info.get('portfolio', ''),
-            data.get('summary', ''),
-            data.get('target_role', ''),
-            data.get('target_category', ''),
-            str(data.get('education', [])),
-            str(data.get('experience', [])),
-            str(data.get('projects', [])),
-            str(data.get('skills', [])),
-            data.get('template', '')
-        ))
-        
+        resume_id = insert_resume(cursor, data)
         conn.commit()
-        return cursor.lastrowid
+        return resume_id
     except Exception as e:
         print(f"Error saving resume data: {str(e)}")
         conn.rollback()
@@ -126,31 +279,98 @@ def save_resume_data(data):
         conn.close()
 
 def save_analysis_data(resume_id, analysis):
-    """Save resume analysis data"""
+    """Save resume analysis data (write-behind)"""
+    try:
+        queue_write(INSERT_ANALYSIS_SQL, _analysis_row(resume_id, analysis), "analysis data")
+    except Exception as e:
+        print(f"Error saving analysis data: {str(e)}")
+
+def save_resume_bundle(resume, analysis=None, ai_analysis=None):
+    """
+    Save a resume with its skills, analysis and AI analysis in a single transaction.
+    Returns the new resume id, or None if nothing was saved.
+    """
     conn = get_database_connection()
     cursor = conn.cursor()
     
     try:
-        cursor.execute('''
-        INSERT INTO resume_analysis (
-            resume_id, ats_score, keyword_match_score,
-            format_score, section_score, missing_skills,
-            recommendations
-        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            resume_id,
-            float(analysis.get('ats_score', 0)),
-            float(analysis.get('keyword_match_score', 0)),
-            float(analysis.get('format_score', 0)),
-            float(analysis.get('section_score', 0)),
-            analysis.get('missing_skills', ''),
-            analysis.get('recommendations', '')
-        ))
-        
+        resume_id = insert_resume(cursor, resume)
+        if analysis:
+            cursor.execute(INSERT_ANALYSIS_SQL, _analysis_row(resume_id, analysis))
+        if ai_analysis:
+            cursor.execute(INSERT_AI_ANALYSIS_SQL, _ai_analysis_row(resume_id, ai_analysis))
         conn.commit()
+        return resume_id
     except Exception as e:
-        print(f"Error saving analysis data: {str(e)}")
+        print(f"Error saving resume bundle: {str(e)}")
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
+
+def get_stage_result(content_hash, stage, version, input_key=''):
+    """
+    Stored output of a pipeline stage ('extract', 'analyze', ...) for an uploaded file,
+    or None if it was never run on this file and input, or ran under another version.
+    """
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute('''
+        SELECT version, result FROM resume_stage_results
+        WHERE content_hash = ? AND stage = ? AND input_key = ?
+        ''', (content_hash, stage, input_key))
+        row = cursor.fetchone()
+        if row is None or row[0] != version:
+            return None
+        return json.loads(row[1])
+    except Exception as e:
+        print(f"Error reading {stage} result: {str(e)}")
+        return None
+    finally:
+        conn.close()
+
+def save_stage_result(content_hash, stage, version, result, input_key=''):
+    """Store the output of a pipeline stage, replacing any result from an older version"""
+    queue_write('''
+    INSERT INTO resume_stage_results (content_hash, stage, input_key, version, result)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (content_hash, stage, input_key) DO UPDATE SET
+        version = excluded.version,
+        result = excluded.result,
+        created_at = CURRENT_TIMESTAMP
+    ''', (content_hash, stage, input_key, version, json.dumps(result, default=str)), f"{stage} result")
+
+def save_resume_bundles(bundles, batch_size=500):
+    """
+    Bulk mode for imports: save many {'resume', 'analysis', 'ai_analysis'} bundles,
+    committing once per batch_size bundles. Returns the ids of the resumes saved;
+    on error the failing batch is rolled back and the ids saved before it are returned.
+    """
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    saved_ids = []
+    
+    try:
+        for start in range(0, len(bundles), batch_size):
+            batch_ids, analysis_rows, ai_rows = [], [], []
+            for bundle in bundles[start:start + batch_size]:
+                resume_id = insert_resume(cursor, bundle['resume'])
+                batch_ids.append(resume_id)
+                if bundle.get('analysis'):
+                    analysis_rows.append(_analysis_row(resume_id, bundle['analysis']))
+                if bundle.get('ai_analysis'):
+                    ai_rows.append(_ai_analysis_row(resume_id, bundle['ai_analysis']))
+            cursor.executemany(INSERT_ANALYSIS_SQL, analysis_rows)
+            cursor.executemany(INSERT_AI_ANALYSIS_SQL, ai_rows)
+            conn.commit()
+            saved_ids.extend(batch_ids)
+        return saved_ids
+    except Exception as e:
+        print(f"Error bulk saving resumes: {str(e)}")
         conn.rollback()
+        return saved_ids
     finally:
         conn.close()
 
@@ -189,20 +409,15 @@ def get_resume_stats():
         conn.close()
 
 def log_admin_action(admin_email, action):
-    """Log admin login/logout actions"""
-    conn = get_database_connection()
-    cursor = conn.cursor()
-    
+    """Log admin login/logout actions (write-behind)"""
     try:
-        cursor.execute('''
-        INSERT INTO admin_logs (admin_email, action)
-        VALUES (?, ?)
-        ''', (admin_email, action))
-        conn.commit()
+        queue_write(
+            'INSERT INTO admin_logs (admin_email, action) VALUES (?, ?)',
+            (admin_email, action),
+            "admin action"
+        )
     except Exception as e:
         print(f"Error logging admin action: {str(e)}")
-    finally:
-        conn.close()
 
 def get_admin_logs():
     """Get all admin login/logout logs"""
@@ -222,6 +437,346 @@ def get_admin_logs():
     finally:
         conn.close()
 
+# Columns of the admin data browser, one row per resume with its latest analysis
+RESUME_BROWSER_COLUMNS = [
+    'id', 'name', 'email', 'phone', 'linkedin', 'github', 'portfolio',
+    'target_role', 'target_category', 'created_at',
+    'ats_score', 'keyword_match_score', 'format_score', 'section_score'
+]
+
+# Filtered counts stop here; the pager shows "N+" beyond it
+COUNT_ESTIMATE_CAP = 10000
+
+def _resume_filter_sql(filters):
+    """Build the WHERE clause (over r = resume_data, a = latest analysis) for browser filters"""
+    filters = filters or {}
+    clauses, params = [], []
+    if filters.get('role'):
+        clauses.append('r.target_role = ?')
+        params.append(filters['role'])
+    if filters.get('category'):
+        clauses.append('r.target_category = ?')
+        params.append(filters['category'])
+    if filters.get('min_score') is not None:
+        clauses.append('a.ats_score >= ?')
+        params.append(filters['min_score'])
+    if filters.get('max_score') is not None:
+        clauses.append('a.ats_score <= ?')
+        params.append(filters['max_score'])
+    if filters.get('date_from'):
+        clauses.append('r.created_at >= ?')
+        params.append(str(filters['date_from']))
+    if filters.get('date_to'):
+        clauses.append("r.created_at < date(?, '+1 day')")
+        params.append(str(filters['date_to']))
+    return clauses, params
+
+RESUME_BROWSER_FROM = '''
+    FROM resume_data r
+    LEFT JOIN resume_analysis a
+        ON a.id = (SELECT MAX(id) FROM resume_analysis WHERE resume_id = r.id)
+'''
+
+def get_resume_page(filters=None, after=None, page_size=50):
+    """
+    Get one page of resumes, newest first, using keyset pagination on (created_at, id).
+    Pass the returned 'next_cursor' as `after` to fetch the following page.
+    """
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    
+    try:
+        clauses, params = _resume_filter_sql(filters)
+        if after:
+            clauses.append('(r.created_at < ? OR (r.created_at = ? AND r.id < ?))')
+            params.extend([after[0], after[0], after[1]])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        cursor.execute(f'''
+        SELECT
+            r.id, r.name, r.email, r.phone, r.linkedin, r.github, r.portfolio,
+            r.target_role, r.target_category, r.created_at,
+            a.ats_score, a.keyword_match_score, a.format_score, a.section_score
+        {RESUME_BROWSER_FROM}
+        {where}
+        ORDER BY r.created_at DESC, r.id DESC
+        LIMIT ?
+        ''', params + [page_size + 1])
+        rows = cursor.fetchall()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        return {
+            'rows': rows,
+            'has_more': has_more,
+            'next_cursor': (rows[-1][9], rows[-1][0]) if has_more else None
+        }
+    except Exception as e:
+        print(f"Error getting resume page: {str(e)}")
+        return {'rows': [], 'has_more': False, 'next_cursor': None}
+    finally:
+        conn.close()
+
+def count_resumes(filters=None):
+    """
+    Count resumes matching the browser filters. Unfiltered counts come from the daily
+    rollup; filtered counts stop at COUNT_ESTIMATE_CAP ('exact' is False past it).
+    """
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    
+    try:
+        clauses, params = _resume_filter_sql(filters)
+        if not clauses:
+            cursor.execute('SELECT COALESCE(SUM(submissions), 0) FROM daily_resume_stats')
+            return {'count': cursor.fetchone()[0], 'exact': True}
+        # Only join the analysis when a score filter needs it
+        needs_analysis = any(clause.startswith('a.') for clause in clauses)
+        cursor.execute(f'''
+        SELECT COUNT(*) FROM (
+            SELECT 1
+            {RESUME_BROWSER_FROM if needs_analysis else 'FROM resume_data r'}
+            WHERE {' AND '.join(clauses)}
+            LIMIT ?
+        )
+        ''', params + [COUNT_ESTIMATE_CAP + 1])
+        count = cursor.fetchone()[0]
+        return {'count': min(count, COUNT_ESTIMATE_CAP), 'exact': count <= COUNT_ESTIMATE_CAP}
+    except Exception as e:
+        print(f"Error counting resumes: {str(e)}")
+        return {'count': 0, 'exact': False}
+    finally:
+        conn.close()
+
+# Columns written by the streaming exports
+EXPORT_COLUMNS = [
+    'name', 'email', 'phone', 'linkedin', 'github', 'portfolio',
+    'summary', 'target_role', 'target_category',
+    'education', 'experience', 'projects', 'skills',
+    'ats_score', 'keyword_match_score', 'format_score', 'section_score',
+    'missing_skills', 'recommendations', 'created_at'
+]
+
+def iter_resume_export(filters=None, chunk_size=1000):
+    """
+    Yield lists of up to chunk_size export rows (EXPORT_COLUMNS order), newest first.
+    Rows are read from a single snapshot without loading the table into memory.
+    """
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    
+    try:
+        clauses, params = _resume_filter_sql(filters)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        cursor.execute(f'''
+        SELECT
+            r.name, r.email, r.phone, r.linkedin, r.github, r.portfolio,
+            r.summary, r.target_role, r.target_category,
+            r.education, r.experience, r.projects, r.skills,
+            a.ats_score, a.keyword_match_score, a.format_score, a.section_score,
+            a.missing_skills, a.recommendations, r.created_at
+        {RESUME_BROWSER_FROM}
+        {where}
+        ORDER BY r.created_at DESC, r.id DESC
+        ''', params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+        conn.close()
+
+# bm25 weights per resume_fts column (name, target_role, summary, skills, experience,
+# projects, resume_text): skill and role hits outrank mentions in the raw text
+SEARCH_WEIGHTS = (2.0, 3.0, 1.5, 4.0, 1.0, 1.0, 0.5)
+
+def _quote_search_terms(query):
+    """Turn free text into an FTS5 query of quoted terms, all of which must match"""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+def search_resumes(query, limit=20, filters=None):
+    """
+    Full-text search over resume summary, skills, experience, projects and extracted text,
+    best matches first. Supports FTS5 syntax (kubernetes AND fintech, "machine learning",
+    pyth*, NOT java); anything that does not parse is searched as plain terms.
+
+    Returns {'rows': [(id, name, email, target_role, target_category, created_at,
+    ats_score, snippet), ...]} or {'rows': [], 'error': ...}.
+    """
+    query = (query or '').strip()
+    if not query:
+        return {'rows': []}
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    
+    try:
+        clauses, params = _resume_filter_sql(filters)
+        where = ''.join(f' AND {clause}' for clause in clauses)
+        sql = f'''
+        SELECT
+            r.id, r.name, r.email, r.target_role, r.target_category, r.created_at,
+            a.ats_score, snippet(resume_fts, -1, '**', '**', '…', 16)
+        FROM resume_fts
+        JOIN resume_data r ON r.id = resume_fts.rowid
+        LEFT JOIN resume_analysis a
+            ON a.id = (SELECT MAX(id) FROM resume_analysis WHERE resume_id = r.id)
+        WHERE resume_fts MATCH ?{where}
+        ORDER BY bm25(resume_fts, {', '.join(str(w) for w in SEARCH_WEIGHTS)})
+        LIMIT ?
+        '''
+        try:
+            cursor.execute(sql, [query] + params + [limit])
+        except sqlite3.OperationalError as e:
+            if 'no such table' in str(e):
+                return _search_resumes_like(cursor, query, limit, clauses, params)
+            # Not valid FTS5 syntax (e.g. "c++" or an unbalanced quote)
+            cursor.execute(sql, [_quote_search_terms(query)] + params + [limit])
+        return {'rows': cursor.fetchall()}
+    except Exception as e:
+        print(f"Error searching resumes: {str(e)}")
+        return {'rows': [], 'error': f"Search failed: {str(e)}"}
+    finally:
+        conn.close()
+
+def _search_resumes_like(cursor, query, limit, clauses, params):
+    """Unranked substring search, used when SQLite was built without FTS5"""
+    searchable = "r.summary || ' ' || r.skills || ' ' || r.experience || ' ' || r.projects || ' ' || COALESCE(r.resume_text, '')"
+    terms = query.split()
+    clauses = clauses + [f"{searchable} LIKE ?" for _ in terms]
+    params = params + [f"%{term}%" for term in terms]
+    cursor.execute(f'''
+    SELECT
+        r.id, r.name, r.email, r.target_role, r.target_category, r.created_at,
+        a.ats_score, substr(r.summary, 1, 200)
+    {RESUME_BROWSER_FROM}
+    WHERE {' AND '.join(clauses)}
+    ORDER BY r.created_at DESC, r.id DESC
+    LIMIT ?
+    ''', params + [limit])
+    return {'rows': cursor.fetchall()}
+
+# Estimated Jaccard similarity above which an upload is flagged as a likely duplicate
+DUPLICATE_SIMILARITY = 0.8
+
+def find_similar_resumes(resume_id=None, resume=None, limit=10, min_similarity=0.3, exclude_hash=None):
+    """
+    Resumes most similar to a stored resume (resume_id) or to an unsaved resume dict
+    (resume, e.g. {'resume_text': ...}), by MinHash estimate of shingle overlap.
+    Candidates come from the LSH index, so the cost does not grow with the table.
+    exclude_hash leaves out the stored copy of the same file.
+
+    Returns {'rows': [(id, name, email, target_role, target_category, created_at,
+    ats_score, similarity), ...]} with similarity in 0-1, most similar first,
+    or {'rows': [], 'error': ...}.
+    """
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    
+    try:
+        computed = False
+        if resume_id is not None:
+            signature, computed = _stored_resume_signature(cursor, resume_id)
+            if computed:
+                conn.commit()
+        else:
+            signature = _resume_signature(resume or {})
+        if signature is None:
+            # Unknown id, or a resume with no text or fields to compare
+            return {'rows': []}
+        
+        index = get_lsh_index(DB_PATH)
+        index.refresh(conn)
+        if computed and resume_id <= index.watermark:
+            index.add(resume_id, signature)
+        candidate_ids = [cid for cid in index.candidates(signature) if cid != resume_id]
+        if not candidate_ids:
+            return {'rows': []}
+        
+        ids, signatures = [], []
+        for start in range(0, len(candidate_ids), 500):
+            chunk = candidate_ids[start:start + 500]
+            cursor.execute(f'''
+            SELECT resume_id, signature FROM resume_signatures
+            WHERE resume_id IN ({', '.join('?' * len(chunk))})
+            ''', chunk)
+            for cid, blob in cursor.fetchall():
+                ids.append(cid)
+                signatures.append(unpack_signature(blob))
+        if not ids:
+            return {'rows': []}
+        similarities = estimate_similarity(signature, signatures)
+        ranked = sorted(
+            ((float(sim), cid) for sim, cid in zip(similarities, ids) if sim >= min_similarity),
+            reverse=True
+        )[:limit]
+        if not ranked:
+            return {'rows': []}
+        
+        by_id = {cid: sim for sim, cid in ranked}
+        hash_clause = 'AND (r.content_hash IS NULL OR r.content_hash <> ?)' if exclude_hash else ''
+        cursor.execute(f'''
+        SELECT
+            r.id, r.name, r.email, r.target_role, r.target_category, r.created_at, a.ats_score
+        {RESUME_BROWSER_FROM}
+        WHERE r.id IN ({', '.join('?' * len(by_id))}) {hash_clause}
+        ''', list(by_id) + ([exclude_hash] if exclude_hash else []))
+        rows = [tuple(row) + (by_id[row[0]],) for row in cursor.fetchall()]
+        rows.sort(key=lambda row: row[-1], reverse=True)
+        return {'rows': rows}
+    except Exception as e:
+        print(f"Error finding similar resumes: {str(e)}")
+        return {'rows': [], 'error': f"Similarity search failed: {str(e)}"}
+    finally:
+        conn.close()
+
+def get_resume_filter_options():
+    """Distinct target roles and categories for the browser filters"""
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("SELECT DISTINCT target_role FROM resume_data WHERE target_role <> '' ORDER BY target_role")
+        roles = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT DISTINCT category FROM daily_category_stats WHERE category <> '' ORDER BY category")
+        categories = [row[0] for row in cursor.fetchall()]
+        return {'roles': roles, 'categories': categories}
+    except Exception as e:
+        print(f"Error getting resume filter options: {str(e)}")
+        return {'roles': [], 'categories': []}
+    finally:
+        conn.close()
+
+def get_admin_logs_page(after=None, page_size=50):
+    """Get one page of admin logs, newest first, keyset-paginated on (timestamp, id)"""
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    
+    try:
+        where, params = '', []
+        if after:
+            where = 'WHERE timestamp < ? OR (timestamp = ? AND id < ?)'
+            params = [after[0], after[0], after[1]]
+        cursor.execute(f'''
+        SELECT id, admin_email, action, timestamp
+        FROM admin_logs
+        {where}
+        ORDER BY timestamp DESC, id DESC
+        LIMIT ?
+        ''', params + [page_size + 1])
+        rows = cursor.fetchall()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        return {
+            'rows': [row[1:] for row in rows],
+            'has_more': has_more,
+            'next_cursor': (rows[-1][3], rows[-1][0]) if has_more else None
+        }
+    except Exception as e:
+        print(f"Error getting admin logs page: {str(e)}")
+        return {'rows': [], 'has_more': False, 'next_cursor': None}
+    finally:
+        conn.close()
+
 def get_all_resume_data():
     """Get all resume data for admin dashboard"""
     conn = get_database_connection()
@@ -287,35 +842,20 @@ def add_admin(email, password):
         conn.close()
 
 def save_ai_analysis_data(resume_id, analysis_data):
-    """Save AI analysis data to the database"""
+    """
+    Save AI analysis data to the database. With the write-behind queue enabled the row
+    is committed in the background and None is returned instead of its id.
+    """
+    if WRITE_MODE != "sync":
+        queue_write(INSERT_AI_ANALYSIS_SQL, _ai_analysis_row(resume_id, analysis_data), "AI analysis data")
+        return None
+    
     conn = get_database_connection()
     cursor = conn.cursor()
     
     try:
-        # Check if the ai_analysis table exists
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS ai_analysis (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                resume_id INTEGER,
-                model_used TEXT,
-                resume_score INTEGER,
-                job_role TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (resume_id) REFERENCES resume_data (id)
-            )
-        """)
-        
         # Insert the analysis data
-        cursor.execute("""
-            INSERT INTO ai_analysis (
-                resume_id, model_used, resume_score, job_role
-            ) VALUES (?, ?, ?, ?)
-        """, (
-            resume_id,
-            analysis_data.get('model_used', ''),
-            analysis_data.get('resume_score', 0),
-            analysis_data.get('job_role', '')
-        ))
+        cursor.execute(INSERT_AI_ANALYSIS_SQL, _ai_analysis_row(resume_id, analysis_data))
         
         conn.commit()
         return cursor.lastrowid
@@ -345,27 +885,24 @@ def get_ai_analysis_stats():
                 "top_job_roles": []
             }
         
-        # Get total number of analyses
-        cursor.execute("SELECT COUNT(*) FROM ai_analysis")
-        total_analyses = cursor.fetchone()[0]
+        # Totals, model usage and top roles come from the daily rollup
+        cursor.execute("SELECT COALESCE(SUM(analyses), 0), SUM(score_sum) / SUM(analyses) FROM daily_ai_stats")
+        total_analyses, average_score = cursor.fetchone()
+        average_score = average_score or 0
         
         # Get model usage statistics
         cursor.execute("""
-            SELECT model_used, COUNT(*) as count
-            FROM ai_analysis
+            SELECT model_used, SUM(analyses) as count
+            FROM daily_ai_stats
             GROUP BY model_used
             ORDER BY count DESC
         """)
         model_usage = [{"model": row[0], "count": row[1]} for row in cursor.fetchall()]
         
-        # Get average resume score
-        cursor.execute("SELECT AVG(resume_score) FROM ai_analysis")
-        average_score = cursor.fetchone()[0] or 0
-        
         # Get top job roles
         cursor.execute("""
-            SELECT job_role, COUNT(*) as count
-            FROM ai_analysis
+            SELECT job_role, SUM(analyses) as count
+            FROM daily_ai_stats
             GROUP BY job_role
             ORDER BY count DESC
             LIMIT 5
@@ -411,27 +948,24 @@ def get_detailed_ai_analysis_stats():
                 "recent_analyses": []
             }
         
-        # Get total number of analyses
-        cursor.execute("SELECT COUNT(*) FROM ai_analysis")
-        total_analyses = cursor.fetchone()[0]
+        # Totals, model usage and top roles come from the daily rollup
+        cursor.execute("SELECT COALESCE(SUM(analyses), 0), SUM(score_sum) / SUM(analyses) FROM daily_ai_stats")
+        total_analyses, average_score = cursor.fetchone()
+        average_score = average_score or 0
         
         # Get model usage statistics
         cursor.execute("""
-            SELECT model_used, COUNT(*) as count
-            FROM ai_analysis
+            SELECT model_used, SUM(analyses) as count
+            FROM daily_ai_stats
             GROUP BY model_used
             ORDER BY count DESC
         """)
         model_usage = [{"model": row[0], "count": row[1]} for row in cursor.fetchall()]
         
-        # Get average resume score
-        cursor.execute("SELECT AVG(resume_score) FROM ai_analysis")
-        average_score = cursor.fetchone()[0] or 0
-        
         # Get top job roles
         cursor.execute("""
-            SELECT job_role, COUNT(*) as count
-            FROM ai_analysis
+            SELECT job_role, SUM(analyses) as count
+            FROM daily_ai_stats
             GROUP BY job_role
             ORDER BY count DESC
             LIMIT 5
@@ -440,32 +974,26 @@ def get_detailed_ai_analysis_stats():
         
         # Get daily trend for the last 7 days
         cursor.execute("""
-            SELECT DATE(created_at) as date, COUNT(*) as count
-            FROM ai_analysis
-            WHERE created_at >= date('now', '-7 days')
-            GROUP BY DATE(created_at)
-            ORDER BY date
+            SELECT day as date, SUM(analyses) as count
+            FROM daily_ai_stats
+            WHERE day >= date('now', '-7 days')
+            GROUP BY day
+            ORDER BY day
         """)
         daily_trend = [{"date": row[0], "count": row[1]} for row in cursor.fetchall()]
         
         # Get score distribution
-        score_ranges = [
-            {"min": 0, "max": 20, "range": "0-20"},
-            {"min": 21, "max": 40, "range": "21-40"},
-            {"min": 41, "max": 60, "range": "41-60"},
-            {"min": 61, "max": 80, "range": "61-80"},
-            {"min": 81, "max": 100, "range": "81-100"}
+        cursor.execute("""
+            SELECT score_bucket, SUM(analyses)
+            FROM daily_ai_stats
+            GROUP BY score_bucket
+        """)
+        bucket_counts = dict(cursor.fetchall())
+        score_distribution = [
+            {"range": score_range, "count": bucket_counts.get(score_range, 0)}
+            for score_range in ["0-20", "21-40", "41-60", "61-80", "81-100"]
         ]
         
-        score_distribution = []
-        for range_info in score_ranges:
-            cursor.execute("""
-                SELECT COUNT(*) FROM ai_analysis 
-                WHERE resume_score >= ? AND resume_score <= ?
-            """, (range_info["min"], range_info["max"]))
-            count = cursor.fetchone()[0]
-            score_distribution.append({"range": range_info["range"], "count": count})
-        
         # Get recent analyses
         cursor.execute("""
             SELECT model_used, resume_score, job_role, datetime(created_at) as date
@@ -529,4 +1057,50 @@ def reset_ai_analysis_stats():
         print(f"Error resetting AI analysis stats: {e}")
         return {"success": False, "message": f"Error resetting AI analysis statistics: {str(e)}"}
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+def save_llm_calls(records):
+    """Insert a batch of LLM call telemetry records in a single transaction"""
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.executemany("""
+            INSERT INTO llm_calls (
+                provider, model, operation, latency_ms, prompt_tokens, completion_tokens,
+                cost_usd, retries, cache_hit, fallback, success, error, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            r['provider'], r['model'], r['operation'], r['latency_ms'], r['prompt_tokens'],
+            r['completion_tokens'], r['cost_usd'], r['retries'], r['cache_hit'], r['fallback'],
+            r['success'], r['error'], r['created_at']
+        ) for r in records])
+        
+        conn.commit()
+        return True
+    except Exception as e:
+        print(f"Error saving LLM call telemetry: {e}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+def get_llm_calls(days=30):
+    """Get LLM call telemetry records from the last `days` days"""
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("""
+            SELECT provider, model, operation, latency_ms, prompt_tokens, completion_tokens,
+                   cost_usd, retries, cache_hit, fallback, success, created_at
+            FROM llm_calls
+            WHERE created_at >= datetime('now', 'localtime', ?)
+            ORDER BY created_at
+        """, (f"-{int(days)} days",))
+        return cursor.fetchall()
+    except Exception as e:
+        print(f"Error getting LLM call telemetry: {e}")
+        return []
+    finally:
+        conn.close()
@@ -0,0 +1,557 @@
+"""
+Schema Migrations
+Versioned changes to resume_data.db, tracked with PRAGMA user_version. Pending
+migrations are applied in order, each in its own transaction, the first time a
+process opens the database.
+"""
+import json
+import sqlite3
+import threading
+
+
+def _base_schema(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resume_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        phone TEXT NOT NULL,
+        linkedin TEXT,
+        github TEXT,
+        portfolio TEXT,
+        summary TEXT,
+        target_role TEXT,
+        target_category TEXT,
+        education TEXT,
+        experience TEXT,
+        projects TEXT,
+        skills TEXT,
+        template TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resume_skills (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        resume_id INTEGER,
+        skill_name TEXT NOT NULL,
+        skill_category TEXT NOT NULL,
+        proficiency_score REAL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (resume_id) REFERENCES resume_data (id)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resume_analysis (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        resume_id INTEGER,
+        ats_score REAL,
+        keyword_match_score REAL,
+        format_score REAL,
+        section_score REAL,
+        missing_skills TEXT,
+        recommendations TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (resume_id) REFERENCES resume_data (id)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS admin_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        admin_email TEXT NOT NULL,
+        action TEXT NOT NULL,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS admin (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT NOT NULL UNIQUE,
+        password TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+
+def _ai_and_telemetry_tables(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ai_analysis (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        resume_id INTEGER,
+        model_used TEXT,
+        resume_score INTEGER,
+        job_role TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (resume_id) REFERENCES resume_data (id)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS llm_calls (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        provider TEXT NOT NULL,
+        model TEXT,
+        operation TEXT,
+        latency_ms REAL,
+        prompt_tokens INTEGER DEFAULT 0,
+        completion_tokens INTEGER DEFAULT 0,
+        cost_usd REAL DEFAULT 0,
+        retries INTEGER DEFAULT 0,
+        cache_hit INTEGER DEFAULT 0,
+        fallback TEXT,
+        success INTEGER DEFAULT 1,
+        error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+
+def _dashboard_indexes(cursor):
+    # Joins from resume_data, and the per-category / per-row averages read through them
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resume_analysis_resume ON resume_analysis (resume_id, ats_score)")
+    # Recent-vs-older score trends and the high-performer count
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resume_analysis_created ON resume_analysis (created_at, ats_score)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resume_analysis_score ON resume_analysis (ats_score)")
+    # Date filters, newest-first listings and exports
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resume_data_created ON resume_data (created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resume_data_category ON resume_data (target_category, created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resume_skills_resume ON resume_skills (resume_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_admin_logs_timestamp ON admin_logs (timestamp)")
+    # AI analyzer statistics
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ai_analysis_created ON ai_analysis (created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ai_analysis_model ON ai_analysis (model_used)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ai_analysis_role ON ai_analysis (job_role)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ai_analysis_score ON ai_analysis (resume_score)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_llm_calls_created ON llm_calls (created_at)")
+
+
+def _backfill_resume_skills(cursor):
+    from config.database import save_resume_skills
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resume_skills_category ON resume_skills (skill_category)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resume_skills_name ON resume_skills (skill_name COLLATE NOCASE)")
+    rows = cursor.execute(
+        "SELECT id, skills FROM resume_data WHERE id NOT IN (SELECT DISTINCT resume_id FROM resume_skills WHERE resume_id IS NOT NULL)"
+    ).fetchall()
+    for resume_id, skills in rows:
+        save_resume_skills(cursor, resume_id, skills or '')
+
+
+def _daily_rollups(cursor):
+    # Per-day counters read by the dashboard instead of aggregating the base tables
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS daily_resume_stats (
+        day TEXT PRIMARY KEY,
+        submissions INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS daily_analysis_stats (
+        day TEXT PRIMARY KEY,
+        analyses INTEGER NOT NULL DEFAULT 0,
+        ats_sum REAL NOT NULL DEFAULT 0,
+        keyword_sum REAL NOT NULL DEFAULT 0,
+        high_scoring INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS daily_category_stats (
+        day TEXT NOT NULL,
+        category TEXT NOT NULL,
+        submissions INTEGER NOT NULL DEFAULT 0,
+        analyses INTEGER NOT NULL DEFAULT 0,
+        ats_sum REAL NOT NULL DEFAULT 0,
+        high_scoring INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, category)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS daily_ai_stats (
+        day TEXT NOT NULL,
+        model_used TEXT NOT NULL,
+        job_role TEXT NOT NULL,
+        score_bucket TEXT NOT NULL,
+        analyses INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, model_used, job_role, score_bucket)
+    )
+    ''')
+
+    category_of = "COALESCE((SELECT target_category FROM resume_data WHERE id = {row}.resume_id), 'Other')"
+    score_bucket = ("CASE WHEN {score} <= 20 THEN '0-20' WHEN {score} <= 40 THEN '21-40' "
+                    "WHEN {score} <= 60 THEN '41-60' WHEN {score} <= 80 THEN '61-80' ELSE '81-100' END")
+
+    triggers = [
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_resume_data_rollup_insert AFTER INSERT ON resume_data
+        BEGIN
+            INSERT INTO daily_resume_stats (day, submissions) VALUES (date(NEW.created_at), 1)
+            ON CONFLICT(day) DO UPDATE SET submissions = submissions + 1;
+            INSERT INTO daily_category_stats (day, category, submissions)
+            VALUES (date(NEW.created_at), COALESCE(NEW.target_category, 'Other'), 1)
+            ON CONFLICT(day, category) DO UPDATE SET submissions = submissions + 1;
+        END;
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_resume_data_rollup_delete AFTER DELETE ON resume_data
+        BEGIN
+            UPDATE daily_resume_stats SET submissions = submissions - 1 WHERE day = date(OLD.created_at);
+            UPDATE daily_category_stats SET submissions = submissions - 1
+            WHERE day = date(OLD.created_at) AND category = COALESCE(OLD.target_category, 'Other');
+        END;
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_resume_analysis_rollup_insert AFTER INSERT ON resume_analysis
+        BEGIN
+            INSERT INTO daily_analysis_stats (day, analyses, ats_sum, keyword_sum, high_scoring)
+            VALUES (date(NEW.created_at), 1, COALESCE(NEW.ats_score, 0), COALESCE(NEW.keyword_match_score, 0),
+                    COALESCE(NEW.ats_score, 0) >= 70)
+            ON CONFLICT(day) DO UPDATE SET
+                analyses = analyses + 1,
+                ats_sum = ats_sum + excluded.ats_sum,
+                keyword_sum = keyword_sum + excluded.keyword_sum,
+                high_scoring = high_scoring + excluded.high_scoring;
+            INSERT INTO daily_category_stats (day, category, analyses, ats_sum, high_scoring)
+            VALUES (date(NEW.created_at), {category_of.format(row="NEW")}, 1, COALESCE(NEW.ats_score, 0),
+                    COALESCE(NEW.ats_score, 0) >= 70)
+            ON CONFLICT(day, category) DO UPDATE SET
+                analyses = analyses + 1,
+                ats_sum = ats_sum + excluded.ats_sum,
+                high_scoring = high_scoring + excluded.high_scoring;
+        END;
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_resume_analysis_rollup_delete AFTER DELETE ON resume_analysis
+        BEGIN
+            UPDATE daily_analysis_stats SET
+                analyses = analyses - 1,
+                ats_sum = ats_sum - COALESCE(OLD.ats_score, 0),
+                keyword_sum = keyword_sum - COALESCE(OLD.keyword_match_score, 0),
+                high_scoring = high_scoring - (COALESCE(OLD.ats_score, 0) >= 70)
+            WHERE day = date(OLD.created_at);
+            UPDATE daily_category_stats SET
+                analyses = analyses - 1,
+                ats_sum = ats_sum - COALESCE(OLD.ats_score, 0),
+                high_scoring = high_scoring - (COALESCE(OLD.ats_score, 0) >= 70)
+            WHERE day = date(OLD.created_at) AND category = {category_of.format(row="OLD")};
+        END;
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_ai_analysis_rollup_insert AFTER INSERT ON ai_analysis
+        BEGIN
+            INSERT INTO daily_ai_stats (day, model_used, job_role, score_bucket, analyses, score_sum)
+            VALUES (date(NEW.created_at), COALESCE(NEW.model_used, ''), COALESCE(NEW.job_role, ''),
+                    {score_bucket.format(score="COALESCE(NEW.resume_score, 0)")}, 1, COALESCE(NEW.resume_score, 0))
+            ON CONFLICT(day, model_used, job_role, score_bucket) DO UPDATE SET
+                analyses = analyses + 1,
+                score_sum = score_sum + excluded.score_sum;
+        END;
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_ai_analysis_rollup_delete AFTER DELETE ON ai_analysis
+        BEGIN
+            UPDATE daily_ai_stats SET
+                analyses = analyses - 1,
+                score_sum = score_sum - COALESCE(OLD.resume_score, 0)
+            WHERE day = date(OLD.created_at)
+              AND model_used = COALESCE(OLD.model_used, '')
+              AND job_role = COALESCE(OLD.job_role, '')
+              AND score_bucket = {score_bucket.format(score="COALESCE(OLD.resume_score, 0)")};
+            DELETE FROM daily_ai_stats WHERE analyses <= 0;
+        END;
+        ''',
+    ]
+    for trigger in triggers:
+        cursor.execute(trigger)
+
+    # Backfill from existing rows
+    cursor.execute("DELETE FROM daily_resume_stats")
+    cursor.execute("DELETE FROM daily_analysis_stats")
+    cursor.execute("DELETE FROM daily_category_stats")
+    cursor.execute("DELETE FROM daily_ai_stats")
+    cursor.execute('''
+    INSERT INTO daily_resume_stats (day, submissions)
+    SELECT date(created_at), COUNT(*) FROM resume_data GROUP BY date(created_at)
+    ''')
+    cursor.execute('''
+    INSERT INTO daily_analysis_stats (day, analyses, ats_sum, keyword_sum, high_scoring)
+    SELECT date(created_at), COUNT(*), COALESCE(SUM(ats_score), 0), COALESCE(SUM(keyword_match_score), 0),
+           COALESCE(SUM(ats_score >= 70), 0)
+    FROM resume_analysis GROUP BY date(created_at)
+    ''')
+    cursor.execute('''
+    INSERT INTO daily_category_stats (day, category, submissions)
+    SELECT date(created_at), COALESCE(target_category, 'Other'), COUNT(*)
+    FROM resume_data GROUP BY 1, 2
+    ''')
+    cursor.execute(f'''
+    INSERT INTO daily_category_stats (day, category, analyses, ats_sum, high_scoring)
+    SELECT date(ra.created_at), {category_of.format(row="ra")}, COUNT(*), COALESCE(SUM(ra.ats_score), 0),
+           COALESCE(SUM(ra.ats_score >= 70), 0)
+    FROM resume_analysis ra GROUP BY 1, 2
+    ON CONFLICT(day, category) DO UPDATE SET
+        analyses = excluded.analyses,
+        ats_sum = excluded.ats_sum,
+        high_scoring = excluded.high_scoring
+    ''')
+    cursor.execute(f'''
+    INSERT INTO daily_ai_stats (day, model_used, job_role, score_bucket, analyses, score_sum)
+    SELECT date(created_at), COALESCE(model_used, ''), COALESCE(job_role, ''),
+           {score_bucket.format(score="COALESCE(resume_score, 0)")}, COUNT(*), COALESCE(SUM(resume_score), 0)
+    FROM ai_analysis GROUP BY 1, 2, 3, 4
+    ''')
+
+
+def _merge_orm_tables(cursor):
+    # The SQLAlchemy layer used to keep its own resumes / analyses / ai_analyses tables
+    from config.database import save_resume_skills
+
+    # Guarded so the step also applies to databases that already have some of these columns
+    for table, column in (("resume_data", "user_id"), ("resume_data", "content"), ("resume_analysis", "analysis_data")):
+        columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()}
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+    tables = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+
+    resume_ids = {}
+    if 'resumes' in tables:
+        rows = cursor.execute("SELECT id, user_id, job_role, content, created_at FROM resumes ORDER BY id").fetchall()
+        for old_id, user_id, job_role, content, created_at in rows:
+            data = _load_json(content)
+            personal_info = data.get('personal_info') or {}
+            cursor.execute('''
+                INSERT INTO resume_data (
+                    name, email, phone, summary, target_role, target_category, skills,
+                    user_id, content, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            ''', (
+                personal_info.get('full_name', ''),
+                personal_info.get('email', ''),
+                personal_info.get('phone', ''),
+                data.get('summary', ''),
+                job_role or data.get('target_role', ''),
+                data.get('target_category', ''),
+                str(data.get('skills', [])),
+                user_id,
+                content,
+                created_at
+            ))
+            resume_ids[old_id] = cursor.lastrowid
+            save_resume_skills(cursor, cursor.lastrowid, data.get('skills', []))
+        cursor.execute("DROP TABLE resumes")
+
+    if 'analyses' in tables:
+        rows = cursor.execute("SELECT resume_id, analysis_data, created_at FROM analyses ORDER BY id").fetchall()
+        for resume_id, analysis_data, created_at in rows:
+            data = _load_json(analysis_data)
+            cursor.execute('''
+                INSERT INTO resume_analysis (
+                    resume_id, ats_score, keyword_match_score, format_score, section_score,
+                    analysis_data, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            ''', (
+                resume_ids.get(resume_id),
+                data.get('ats_score'),
+                data.get('keyword_match_score'),
+                data.get('format_score'),
+                data.get('section_score'),
+                analysis_data,
+                created_at
+            ))
+        cursor.execute("DROP TABLE analyses")
+
+    if 'ai_analyses' in tables:
+        rows = cursor.execute(
+            "SELECT resume_id, model_used, resume_score, job_role, created_at FROM ai_analyses ORDER BY id"
+        ).fetchall()
+        cursor.executemany('''
+            INSERT INTO ai_analysis (resume_id, model_used, resume_score, job_role, created_at)
+            VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+        ''', [(resume_ids.get(row[0]),) + tuple(row[1:]) for row in rows])
+        cursor.execute("DROP TABLE ai_analyses")
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resume_data_user ON resume_data (user_id)")
+
+
+def _load_json(value):
+    try:
+        data = json.loads(value) if value else {}
+    except (TypeError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _browser_indexes(cursor):
+    # Keyset pagination walks (created_at, rowid); role filters seek on the role first
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resume_data_role ON resume_data (target_role, created_at)")
+
+
+# Columns indexed by resume_fts, in the order search ranking weights refer to them
+FTS_COLUMNS = ['name', 'target_role', 'summary', 'skills', 'experience', 'projects', 'resume_text']
+
+FTS_TRIGGERS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_resume_fts_insert AFTER INSERT ON resume_data BEGIN
+        INSERT INTO resume_fts (rowid, {', '.join(FTS_COLUMNS)})
+        VALUES (new.id, {', '.join('new.' + c for c in FTS_COLUMNS)});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_resume_fts_delete AFTER DELETE ON resume_data BEGIN
+        INSERT INTO resume_fts (resume_fts, rowid, {', '.join(FTS_COLUMNS)})
+        VALUES ('delete', old.id, {', '.join('old.' + c for c in FTS_COLUMNS)});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_resume_fts_update
+    AFTER UPDATE OF {', '.join(FTS_COLUMNS)} ON resume_data BEGIN
+        INSERT INTO resume_fts (resume_fts, rowid, {', '.join(FTS_COLUMNS)})
+        VALUES ('delete', old.id, {', '.join('old.' + c for c in FTS_COLUMNS)});
+        INSERT INTO resume_fts (rowid, {', '.join(FTS_COLUMNS)})
+        VALUES (new.id, {', '.join('new.' + c for c in FTS_COLUMNS)});
+    END
+    ''',
+]
+
+
+def _resume_search_index(cursor):
+    # Extracted resume text, so search covers what the structured fields miss
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(resume_data)").fetchall()}
+    if 'resume_text' not in columns:
+        cursor.execute("ALTER TABLE resume_data ADD COLUMN resume_text TEXT")
+    try:
+        # External-content index: the text lives once, in resume_data
+        cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5(
+            {', '.join(FTS_COLUMNS)},
+            content='resume_data', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+        ''')
+    except sqlite3.OperationalError as e:
+        # SQLite built without FTS5: search_resumes() falls back to LIKE scans
+        print(f"Full-text search index not created: {e}")
+        return
+    for trigger in FTS_TRIGGERS:
+        cursor.execute(trigger)
+    cursor.execute("INSERT INTO resume_fts (resume_fts) VALUES ('rebuild')")
+
+
+def _content_hash_dedupe(cursor):
+    # SHA-256 of the uploaded file; NULL for resumes that did not come from an upload
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(resume_data)").fetchall()}
+    if 'content_hash' not in columns:
+        cursor.execute("ALTER TABLE resume_data ADD COLUMN content_hash TEXT")
+    # Every submission keeps its own row (with its own role and analyses); repeat uploads
+    # of a file share its content_hash and only deduplicate stage results
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resume_data_content_hash ON resume_data (content_hash)")
+    # Output of each pipeline stage per file (and per stage input, e.g. the job role),
+    # tagged with the algorithm version that produced it
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resume_stage_results (
+        content_hash TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        input_key TEXT NOT NULL DEFAULT '',
+        version INTEGER NOT NULL,
+        result TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (content_hash, stage, input_key)
+    ) WITHOUT ROWID
+    ''')
+
+
+def _resume_signatures(cursor):
+    from config.similarity import minhash, pack_signature, signature_text
+
+    # One packed uint32 MinHash signature per resume, read by the LSH index in id order
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resume_signatures (
+        resume_id INTEGER PRIMARY KEY,
+        signature BLOB NOT NULL
+    )
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_resume_signatures_delete AFTER DELETE ON resume_data BEGIN
+        DELETE FROM resume_signatures WHERE resume_id = old.id;
+    END
+    ''')
+    # Same fields as config.database._resume_signature, so rows without extracted text
+    # are fingerprinted on their structured fields, name included
+    rows = cursor.execute(
+        'SELECT id, resume_text, summary, skills, experience, projects, name, email, education FROM resume_data'
+    ).fetchall()
+    for resume_id, resume_text, summary, skills, experience, projects, name, email, education in rows:
+        signature = minhash(signature_text(
+            resume_text, summary, skills, experience, projects, name=name, email=email, education=education
+        ))
+        if signature is not None:
+            cursor.execute(
+                'INSERT OR REPLACE INTO resume_signatures (resume_id, signature) VALUES (?, ?)',
+                (resume_id, pack_signature(signature))
+            )
+
+
+# (version, description, function applying it); versions must be consecutive
+MIGRATIONS = [
+    (1, "base schema", _base_schema),
+    (2, "ai_analysis and llm_calls tables", _ai_and_telemetry_tables),
+    (3, "indexes for dashboard and export queries", _dashboard_indexes),
+    (4, "normalized resume_skills backfill", _backfill_resume_skills),
+    (5, "daily rollup tables and triggers", _daily_rollups),
+    (6, "merge SQLAlchemy tables into the main schema", _merge_orm_tables),
+    (7, "indexes for the admin data browser", _browser_indexes),
+    (8, "full-text search index over resume content", _resume_search_index),
+    (9, "content-hash deduplication and stage result cache", _content_hash_dedupe),
+    (10, "MinHash signatures for similar-resume search", _resume_signatures),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+_migrated = set()
+_lock = threading.Lock()
+
+
+def get_schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn) -> int:
+    """Apply pending migrations to the database behind conn; returns the resulting version"""
+    cursor = conn.cursor()
+    version = get_schema_version(conn)
+    for target, description, apply in MIGRATIONS:
+        if target <= version:
+            continue
+        if conn.in_transaction:
+            conn.commit()
+        # Takes the write lock first so concurrent processes apply each migration once
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= target:
+                conn.rollback()
+                version = target
+                continue
+            apply(cursor)
+            cursor.execute(f"PRAGMA user_version = {int(target)}")
+            conn.commit()
+            version = target
+            print(f"Applied database migration {target}: {description}")
+        except Exception:
+            conn.rollback()
+            raise
+    return version
+
+
+def ensure_schema(conn, db_path: str):
+    """Run migrate() once per process and database file"""
+    if db_path in _migrated:
+        return
+    with _lock:
+        if db_path in _migrated:
+            return
+        migrate(conn)
+        _migrated.add(db_path)
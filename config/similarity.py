@@ -0,0 +1,210 @@
+"""
+Resume Similarity Index
+MinHash signatures over word shingles of each resume, stored as packed uint32 arrays in
+resume_signatures, and a banded LSH index that finds likely-similar resumes without
+scanning every signature.
+
+The LSH index lives in one memory-mapped file next to the database. Resumes saved since
+the file was written are held in an in-memory delta, which is merged into a new file
+once it grows past LSH_MERGE_ROWS (or a tenth of the index), so the file is never
+rebuilt from scratch on a hot path.
+"""
+import os
+import re
+import zlib
+import threading
+
+import numpy as np
+
+
+NUM_PERM = 128
+# 32 bands of 4 rows: pairs with Jaccard similarity around 0.4 and above become candidates
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_WORDS = 3
+LSH_MERGE_ROWS = int(os.getenv("LSH_MERGE_ROWS", "2000"))
+
+SIGNATURE_DTYPE = np.dtype('<u4')
+# Index file: uint64 array of shape (2, LSH_BANDS, n); plane 0 holds each band's sorted
+# bucket keys, plane 1 the resume ids in the same order
+INDEX_DTYPE = np.dtype('<u8')
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+# Fixed seeds: signatures stored in the database must stay comparable across processes
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+_BAND_MULT = np.random.RandomState(2).randint(1, 1 << 62, LSH_ROWS, dtype=np.uint64) | np.uint64(1)
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def signature_text(resume_text=None, summary='', skills='', experience='', projects='',
+                   name='', email='', education=''):
+    """Text a resume is fingerprinted on: the extracted text, else its structured fields"""
+    if resume_text and resume_text.strip():
+        return resume_text
+    return ' '.join(part for part in (name, email, summary, skills, experience, projects, education) if part)
+
+
+def shingles(text):
+    """Set of 32-bit hashes of the overlapping SHINGLE_WORDS-word sequences in text"""
+    words = _WORD_RE.findall((text or '').lower())
+    if not words:
+        return set()
+    if len(words) < SHINGLE_WORDS:
+        return {zlib.crc32(' '.join(words).encode())}
+    return {
+        zlib.crc32(' '.join(words[i:i + SHINGLE_WORDS]).encode())
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash(text):
+    """NUM_PERM-value MinHash signature of text as a uint32 array, or None for empty text"""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+    # Both factors are below 2**32, so the products cannot overflow uint64
+    permuted = ((np.outer(values, _PERM_A) + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+    return permuted.min(axis=0).astype(SIGNATURE_DTYPE)
+
+
+def pack_signature(signature):
+    return signature.astype(SIGNATURE_DTYPE).tobytes()
+
+
+def unpack_signature(blob):
+    return np.frombuffer(blob, dtype=SIGNATURE_DTYPE)
+
+
+def estimate_similarity(signature, others):
+    """Estimated Jaccard similarity of signature with each row of others"""
+    return (np.asarray(others) == signature).mean(axis=1)
+
+
+def band_keys(signatures):
+    """One 64-bit bucket key per LSH band for each signature; shape (LSH_BANDS, n)"""
+    bands = np.atleast_2d(signatures).astype(np.uint64).reshape(-1, LSH_BANDS, LSH_ROWS)
+    # uint64 arithmetic wraps, which is fine for a hash
+    return (bands * _BAND_MULT).sum(axis=2, dtype=np.uint64).T
+
+
+class LSHIndex:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._main = np.zeros((2, LSH_BANDS, 0), dtype=INDEX_DTYPE)
+        self._main_mtime = None
+        self._delta_ids = []
+        self._delta_keys = []
+        # Highest resume id in the index; signatures are read back in id order from here
+        self.watermark = 0
+
+    def __len__(self):
+        return self._main.shape[2] + len(self._delta_ids)
+
+    def _load(self):
+        """(Re)open the index file if it was written since it was last mapped"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._main_mtime:
+            return
+        try:
+            main = np.load(self.path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            print(f"Error loading similarity index {self.path}: {e}")
+            return
+        if main.dtype != INDEX_DTYPE or main.shape[:2] != (2, LSH_BANDS):
+            print(f"Ignoring similarity index {self.path}: unexpected layout")
+            return
+        self._main, self._main_mtime = main, mtime
+        main_watermark = int(main[1, 0].max()) if main.shape[2] else 0
+        # Keep only the delta rows the new file does not already cover
+        keep = [i for i, resume_id in enumerate(self._delta_ids) if resume_id > main_watermark]
+        self._delta_ids = [self._delta_ids[i] for i in keep]
+        self._delta_keys = [self._delta_keys[i] for i in keep]
+        self.watermark = max([main_watermark] + self._delta_ids)
+
+    def refresh(self, conn):
+        """Add signatures saved since the last refresh, merging the delta into the file when large"""
+        with self._lock:
+            self._load()
+            rows = conn.execute(
+                'SELECT resume_id, signature FROM resume_signatures WHERE resume_id > ? ORDER BY resume_id',
+                (self.watermark,)
+            ).fetchall()
+            if rows:
+                keys = band_keys(np.stack([unpack_signature(blob) for _, blob in rows]))
+                self._delta_ids.extend(resume_id for resume_id, _ in rows)
+                self._delta_keys.extend(keys.T)
+                self.watermark = rows[-1][0]
+            if len(self._delta_ids) >= max(LSH_MERGE_ROWS, self._main.shape[2] // 10):
+                self._merge()
+
+    def _merge(self):
+        delta = np.empty((2, LSH_BANDS, len(self._delta_ids)), dtype=INDEX_DTYPE)
+        delta[0] = np.stack(self._delta_keys, axis=1)
+        delta[1] = self._delta_ids
+        merged = np.concatenate([np.asarray(self._main), delta], axis=2)
+        order = np.argsort(merged[0], axis=1, kind='stable')
+        merged = np.take_along_axis(merged, order[None, :, :], axis=2)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, merged)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            # e.g. the file is mapped by another process on Windows: keep serving from memory
+            print(f"Error writing similarity index {self.path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._main_mtime = None
+        self._load()
+
+    def add(self, resume_id, signature):
+        """Index a signature stored below the watermark (e.g. computed on demand for an old row)"""
+        with self._lock:
+            self._delta_ids.append(resume_id)
+            self._delta_keys.append(band_keys(signature)[:, 0])
+
+    def candidates(self, signature, limit=500):
+        """Ids sharing at least one band bucket with signature, most shared bands first"""
+        keys = band_keys(signature)[:, 0]
+        with self._lock:
+            main, delta_ids, delta_keys = self._main, list(self._delta_ids), list(self._delta_keys)
+        found = []
+        for band in range(LSH_BANDS):
+            start, end = (
+                np.searchsorted(main[0, band], keys[band], side='left'),
+                np.searchsorted(main[0, band], keys[band], side='right')
+            )
+            found.append(np.asarray(main[1, band, start:end]))
+        if delta_ids:
+            delta = np.stack(delta_keys, axis=1)
+            hits = delta == keys[:, None]
+            found.append(np.asarray(delta_ids, dtype=np.uint64)[np.nonzero(hits)[1]])
+        ids, shared = np.unique(np.concatenate(found), return_counts=True)
+        order = np.argsort(-shared, kind='stable')[:limit]
+        return [int(resume_id) for resume_id in ids[order]]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def index_path(db_path):
+    return os.path.splitext(db_path)[0] + "_lsh.npy"
+
+
+def get_lsh_index(db_path):
+    """Process-wide LSH index for the database at db_path"""
+    with _indexes_lock:
+        if db_path not in _indexes:
+            _indexes[db_path] = LSHIndex(index_path(db_path))
+        return _indexes[db_path]
@@ -0,0 +1,142 @@
+"""
+Write-Behind Queue
+Analytics and audit inserts that nobody waits on are queued and committed by a
+background writer in grouped transactions, so the UI thread never pays for the fsync.
+
+DB_WRITE_MODE=async (default) queues writes; DB_WRITE_MODE=sync commits each write
+before returning, as before. The queue is bounded: when it is full the caller writes
+synchronously instead of dropping data. Pending writes are flushed at interpreter exit.
+"""
+import os
+import queue
+import atexit
+import threading
+import time
+from typing import Callable
+
+
+WRITE_MODE = os.getenv("DB_WRITE_MODE", "async")
+MAX_QUEUED_WRITES = int(os.getenv("DB_WRITE_QUEUE_SIZE", "10000"))
+WRITE_BATCH_SIZE = 200
+# How long the writer waits for more writes to join a transaction
+WRITE_LINGER_SECONDS = float(os.getenv("DB_WRITE_LINGER_MS", "20")) / 1000
+
+
+class WriteBehindQueue:
+    def __init__(self, connect: Callable, mode: str = WRITE_MODE, max_size: int = MAX_QUEUED_WRITES,
+                 batch_size: int = WRITE_BATCH_SIZE, linger: float = WRITE_LINGER_SECONDS):
+        # connect(db_path) returns a connection usable from the calling thread
+        self.connect = connect
+        self.mode = mode
+        self.batch_size = batch_size
+        self.linger = linger
+        self._queue = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.written = 0
+        self.failed = 0
+        self.overflowed = 0
+
+    def submit(self, db_path: str, sql: str, params=(), label: str = "write"):
+        """Queue one INSERT/UPDATE; in sync mode, or when the queue is full, write it now"""
+        item = (db_path, sql, tuple(params), label)
+        if self.mode != "sync":
+            try:
+                self._queue.put_nowait(item)
+                self._ensure_thread()
+                return
+            except queue.Full:
+                self.overflowed += 1
+        self._write_batch([item])
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued write is committed; returns False on timeout"""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if time.time() > deadline:
+                return False
+            if self._thread is None or not self._thread.is_alive():
+                # No writer (e.g. during interpreter shutdown): drain on this thread
+                self._drain()
+            else:
+                time.sleep(0.01)
+        return True
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-write-behind", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self, first):
+        batch = [first]
+        deadline = time.time() + self.linger
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.time()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self):
+        while True:
+            try:
+                first = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._commit(self._next_batch(first))
+
+    def _run(self):
+        while True:
+            self._commit(self._next_batch(self._queue.get()))
+
+    def _commit(self, batch):
+        try:
+            self._write_batch(batch)
+        except Exception as e:
+            print(f"Error in write-behind queue: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_batch(self, batch):
+        by_db = {}
+        for item in batch:
+            by_db.setdefault(item[0], []).append(item)
+        for db_path, items in by_db.items():
+            conn = self.connect(db_path)
+            try:
+                for _, sql, params, _ in items:
+                    conn.execute(sql, params)
+                conn.commit()
+                self.written += len(items)
+            except Exception as e:
+                conn.rollback()
+                if len(items) == 1:
+                    self.failed += 1
+                    print(f"Error saving {items[0][3]}: {e}")
+                    continue
+                # Retry one by one so a single bad row doesn't lose the whole group
+                for item in items:
+                    self._write_batch([item])
+
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue() -> WriteBehindQueue:
+    """Process-wide write-behind queue"""
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is None:
+            from config.database import get_connection
+            _write_queue = WriteBehindQueue(get_connection)
+            atexit.register(_write_queue.flush)
+        return _write_queue
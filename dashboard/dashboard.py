@@ -3,15 +3,29 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from config.database import get_database_connection
+from config.database import (
+    get_database_connection, get_llm_calls, get_resume_page, count_resumes,
+    get_resume_filter_options, get_admin_logs_page, search_resumes, find_similar_resumes,
+    DUPLICATE_SIMILARITY
+)
+from utils.rate_limiter import get_rate_limiter
+from utils.job_queue import JobQueue, submit_job
+import os
 import io
 import uuid
 from plotly.subplots import make_subplots
 from io import BytesIO
 
+# Sidebar export choices and the streaming export format they map to
+EXPORT_FORMAT_OPTIONS = {
+    "Excel": "xlsx",
+    "CSV": "csv",
+    "JSON Lines": "jsonl",
+    "Parquet": "parquet",
+}
+
 class DashboardManager:
     def __init__(self):
-        self.conn = get_database_connection()
         self.colors = {
             'primary': '#4CAF50',
             'secondary': '#2196F3',
@@ -26,6 +40,11 @@ class DashboardManager:
             'subtext': '#B0B0B0'
         }
         
+    @property
+    def conn(self):
+        # Pooled per thread, so the manager is safe to reuse across reruns
+        return get_database_connection()
+
     def apply_dashboard_style(self):
         """Apply custom styling for dashboard"""
         st.markdown("""
@@ -127,24 +146,23 @@ class DashboardManager:
             ('This Month', start_of_month),
             ('All Time', datetime(2000, 1, 1))
         ]:
+            day = start_date.strftime('%Y-%m-%d')
             cursor.execute("""
                 SELECT 
-                    COUNT(DISTINCT rd.id) as total_resumes,
-                    ROUND(AVG(ra.ats_score), 1) as avg_ats_score,
-                    ROUND(AVG(ra.keyword_match_score), 1) as avg_keyword_score,
-                    COUNT(DISTINCT CASE WHEN ra.ats_score >= 70 THEN rd.id END) as high_scoring
-                FROM resume_data rd
-                LEFT JOIN resume_analysis ra ON rd.id = ra.resume_id
-                WHERE rd.created_at >= ?
-            """, (start_date.strftime('%Y-%m-%d %H:%M:%S'),))
+                    (SELECT COALESCE(SUM(submissions), 0) FROM daily_resume_stats WHERE day >= ?),
+                    SUM(analyses), SUM(ats_sum), SUM(keyword_sum), SUM(high_scoring)
+                FROM daily_analysis_stats
+                WHERE day >= ?
+            """, (day, day))
             
             row = cursor.fetchone()
             if row:
+                analyses = row[1] or 0
                 metrics[period] = {
                     'total': row[0] or 0,
-                    'ats_score': row[1] or 0,
-                    'keyword_score': row[2] or 0,
-                    'high_scoring': row[3] or 0
+                    'ats_score': round(row[2] / analyses, 1) if analyses else 0,
+                    'keyword_score': round(row[3] / analyses, 1) if analyses else 0,
+                    'high_scoring': row[4] or 0
                 }
             else:
                 metrics[period] = {
@@ -160,37 +178,9 @@ class DashboardManager:
         """Get skill distribution data"""
         cursor = self.conn.cursor()
         cursor.execute("""
-            WITH RECURSIVE split(skill, rest) AS (
-                SELECT '', skills || ','
-                FROM resume_data
-                UNION ALL
-                SELECT
-                    substr(rest, 0, instr(rest, ',')),
-                    substr(rest, instr(rest, ',') + 1)
-                FROM split
-                WHERE rest <> ''
-            ),
-            SkillCategories AS (
-                SELECT 
-                    CASE 
-                        WHEN LOWER(TRIM(skill, '[]" ')) LIKE '%python%' OR LOWER(TRIM(skill, '[]" ')) LIKE '%java%' OR 
-                             LOWER(TRIM(skill, '[]" ')) LIKE '%javascript%' OR LOWER(TRIM(skill, '[]" ')) LIKE '%c++%' OR 
-                             LOWER(TRIM(skill, '[]" ')) LIKE '%programming%' THEN 'Programming'
-                        WHEN LOWER(TRIM(skill, '[]" ')) LIKE '%sql%' OR LOWER(TRIM(skill, '[]" ')) LIKE '%database%' OR 
-                             LOWER(TRIM(skill, '[]" ')) LIKE '%mongodb%' THEN 'Database'
-                        WHEN LOWER(TRIM(skill, '[]" ')) LIKE '%aws%' OR LOWER(TRIM(skill, '[]" ')) LIKE '%cloud%' OR 
-                             LOWER(TRIM(skill, '[]" ')) LIKE '%azure%' THEN 'Cloud'
-                        WHEN LOWER(TRIM(skill, '[]" ')) LIKE '%agile%' OR LOWER(TRIM(skill, '[]" ')) LIKE '%scrum%' OR 
-                             LOWER(TRIM(skill, '[]" ')) LIKE '%management%' THEN 'Management'
-                        ELSE 'Other'
-                    END as category,
-                    COUNT(*) as count
-                FROM split
-                WHERE skill <> ''
-                GROUP BY category
-            )
-            SELECT category, count
-            FROM SkillCategories
+            SELECT skill_category, COUNT(*) as count
+            FROM resume_skills
+            GROUP BY skill_category
             ORDER BY count DESC
         """)
         
@@ -207,14 +197,13 @@ class DashboardManager:
         now = datetime.now()
         dates = [(now - timedelta(days=x)).strftime('%Y-%m-%d') for x in range(6, -1, -1)]
         
-        submissions = []
-        for date in dates:
-            cursor.execute("""
-                SELECT COUNT(*) 
-                FROM resume_data 
-                WHERE DATE(created_at) = DATE(?)
-            """, (date,))
-            submissions.append(cursor.fetchone()[0])
+        cursor.execute("""
+            SELECT day, submissions
+            FROM daily_resume_stats
+            WHERE day >= ?
+        """, (dates[0],))
+        by_day = dict(cursor.fetchall())
+        submissions = [by_day.get(date, 0) for date in dates]
             
         return [d[-3:] for d in dates], submissions  # Return shortened date format (e.g., 'Mon', 'Tue')
 
@@ -223,11 +212,10 @@ class DashboardManager:
         cursor = self.conn.cursor()
         cursor.execute("""
             SELECT 
-                COALESCE(target_category, 'Other') as category,
-                COUNT(*) as count,
-                ROUND(AVG(CASE WHEN ra.ats_score >= 70 THEN 1 ELSE 0 END) * 100, 1) as success_rate
-            FROM resume_data rd
-            LEFT JOIN resume_analysis ra ON rd.id = ra.resume_id
+                category,
+                SUM(submissions) as count,
+                ROUND(SUM(high_scoring) * 100.0 / MAX(SUM(submissions), 1), 1) as success_rate
+            FROM daily_category_stats
             GROUP BY category
             ORDER BY count DESC
             LIMIT 5
@@ -254,38 +242,13 @@ class DashboardManager:
         # Data Export Options
         export_format = st.sidebar.selectbox(
             "Export Format",
-            ["Excel", "CSV", "JSON"],
+            list(EXPORT_FORMAT_OPTIONS),
             key="export_format"
         )
         
         if st.sidebar.button("📥 Export Data"):
-            if export_format == "Excel":
-                excel_data = self.export_to_excel()
-                if excel_data:
-                    st.sidebar.download_button(
-                        "⬇️ Download Excel",
-                        data=excel_data,
-                        file_name=f"resume_data_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
-            elif export_format == "CSV":
-                csv_data = self.export_to_csv()
-                if csv_data:
-                    st.sidebar.download_button(
-                        "⬇️ Download CSV",
-                        data=csv_data,
-                        file_name=f"resume_data_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                        mime="text/csv"
-                    )
-            else:
-                json_data = self.export_to_json()
-                if json_data:
-                    st.sidebar.download_button(
-                        "⬇️ Download JSON",
-                        data=json_data,
-                        file_name=f"resume_data_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
-                        mime="application/json"
-                    )
+            self.start_export(EXPORT_FORMAT_OPTIONS[export_format])
+        self.render_export_status(st.sidebar)
 
         # Database Stats
         st.sidebar.markdown("### 📊 Database Stats")
@@ -296,144 +259,207 @@ class DashboardManager:
             - Storage Used: {stats['storage_size']}
         """)
 
-    def get_resume_data(self):
-        """Get all resume data"""
-        cursor = self.conn.cursor()
-        try:
-            cursor.execute('''
-            SELECT 
-                r.id,
-                r.name,
-                r.email,
-                r.phone,
-                r.linkedin,
-                r.github,
-                r.portfolio,
-                r.target_role,
-                r.target_category,
-                r.created_at,
-                a.ats_score,
-                a.keyword_match_score,
-                a.format_score,
-                a.section_score
-            FROM resume_data r
-            LEFT JOIN resume_analysis a ON r.id = a.resume_id
-            ORDER BY r.created_at DESC
-            ''')
-            return cursor.fetchall()
-        except Exception as e:
-            print(f"Error fetching resume data: {str(e)}")
-            return []
+    def get_resume_data(self, filters=None, after=None, page_size=50):
+        """Get one page of resume data (see config.database.get_resume_page)"""
+        return get_resume_page(filters, after=after, page_size=page_size)
+
+    def _page_cursor(self, state_key, reset_token=None):
+        """Keyset cursor for the current page of a browser; reset when reset_token changes"""
+        if st.session_state.get(f"{state_key}_token") != reset_token or f"{state_key}_cursors" not in st.session_state:
+            st.session_state[f"{state_key}_token"] = reset_token
+            st.session_state[f"{state_key}_cursors"] = [None]
+        return st.session_state[f"{state_key}_cursors"]
+
+    def _render_pager(self, state_key, page, summary):
+        """Previous / next controls for a keyset-paginated browser"""
+        cursors = st.session_state[f"{state_key}_cursors"]
+        col1, col2, col3 = st.columns([1, 3, 1])
+        with col1:
+            if st.button("⬅️ Previous", key=f"{state_key}_prev", disabled=len(cursors) <= 1):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            st.caption(f"Page {len(cursors)} · {summary}")
+        with col3:
+            if st.button("Next ➡️", key=f"{state_key}_next", disabled=not page['has_more']):
+                cursors.append(page['next_cursor'])
+                st.rerun()
 
     def render_resume_data_section(self):
-        """Render resume data section with Excel download"""
+        """Render the paginated resume browser with filters pushed down to SQL"""
         st.markdown("<h2 class='section-title'>Resume Submissions</h2>", unsafe_allow_html=True)
         
-        # Get resume data
-        resume_data = self.get_resume_data()
+        # Style the dataframe
+        st.markdown("""
+        <style>
+        .resume-data {
+            background-color: #2D2D2D;
+            border-radius: 10px;
+            padding: 1rem;
+            margin-bottom: 1rem;
+        }
+        </style>
+        """, unsafe_allow_html=True)
         
-        if resume_data:
-            # Convert to DataFrame
-            columns = [
-                'ID', 'Name', 'Email', 'Phone', 'LinkedIn', 'GitHub', 
-                'Portfolio', 'Target Role', 'Target Category', 'Submission Date',
-                'ATS Score', 'Keyword Match', 'Format Score', 'Section Score'
-            ]
-            df = pd.DataFrame(resume_data, columns=columns)
+        with st.container():
+            st.markdown('<div class="resume-data">', unsafe_allow_html=True)
             
-            # Format scores as percentages
-            score_columns = ['ATS Score', 'Keyword Match', 'Format Score', 'Section Score']
-            for col in score_columns:
-                df[col] = df[col].apply(lambda x: f"{x*100:.1f}%" if pd.notnull(x) else "N/A")
+            # Add filters
+            options = get_resume_filter_options()
+            col1, col2 = st.columns(2)
+            with col1:
+                target_role = st.selectbox(
+                    "Filter by Target Role",
+                    options=["All"] + options['roles'],
+                    key="role_filter"
+                )
+            with col2:
+                target_category = st.selectbox(
+                    "Filter by Category",
+                    options=["All"] + options['categories'],
+                    key="category_filter"
+                )
+            col1, col2 = st.columns(2)
+            with col1:
+                score_range = st.slider("ATS Score Range", 0, 100, (0, 100), key="score_filter")
+            with col2:
+                date_range = st.date_input("Submitted Between", value=(), key="date_filter")
             
-            # Style the dataframe
-            st.markdown("""
-            <style>
-            .resume-data {
-                background-color: #2D2D2D;
-                border-radius: 10px;
-                padding: 1rem;
-                margin-bottom: 1rem;
+            filters = {
+                'role': None if target_role == "All" else target_role,
+                'category': None if target_category == "All" else target_category,
             }
-            </style>
-            """, unsafe_allow_html=True)
+            # The full range keeps resumes that have no analysis yet
+            if score_range != (0, 100):
+                filters['min_score'], filters['max_score'] = score_range
+            if len(date_range) == 2:
+                filters['date_from'], filters['date_to'] = date_range
             
-            with st.container():
-                st.markdown('<div class="resume-data">', unsafe_allow_html=True)
-                
-                # Add filters
-                col1, col2 = st.columns(2)
-                with col1:
-                    target_role = st.selectbox(
-                        "Filter by Target Role",
-                        options=["All"] + list(df['Target Role'].unique()),
-                        key="role_filter"
-                    )
-                with col2:
-                    target_category = st.selectbox(
-                        "Filter by Category",
-                        options=["All"] + list(df['Target Category'].unique()),
-                        key="category_filter"
-                    )
+            cursors = self._page_cursor("resume_browser", repr(sorted(filters.items())))
+            page = self.get_resume_data(filters, after=cursors[-1])
+            total = count_resumes(filters)
+            
+            if page['rows']:
+                columns = [
+                    'ID', 'Name', 'Email', 'Phone', 'LinkedIn', 'GitHub', 
+                    'Portfolio', 'Target Role', 'Target Category', 'Submission Date',
+                    'ATS Score', 'Keyword Match', 'Format Score', 'Section Score'
+                ]
+                df = pd.DataFrame(page['rows'], columns=columns)
                 
-                # Apply filters
-                filtered_df = df.copy()
-                if target_role != "All":
-                    filtered_df = filtered_df[filtered_df['Target Role'] == target_role]
-                if target_category != "All":
-                    filtered_df = filtered_df[filtered_df['Target Category'] == target_category]
+                # Scores are stored on a 0-100 scale
+                score_columns = ['ATS Score', 'Keyword Match', 'Format Score', 'Section Score']
+                for col in score_columns:
+                    df[col] = df[col].apply(lambda x: f"{x:.1f}%" if pd.notnull(x) else "N/A")
                 
-                # Display filtered data
                 st.dataframe(
-                    filtered_df,
+                    df,
                     use_container_width=True,
                     hide_index=True
                 )
+                self._render_pager(
+                    "resume_browser", page,
+                    f"{total['count']}{'' if total['exact'] else '+'} matching resumes"
+                )
+                
+                # Download the page on screen
+                excel_buffer = BytesIO()
+                df.to_excel(excel_buffer, index=False, engine='openpyxl')
+                excel_buffer.seek(0)
                 
-                # Add download buttons
                 col1, col2 = st.columns(2)
                 with col1:
-                    # Download filtered data
-                    excel_buffer = BytesIO()
-                    filtered_df.to_excel(excel_buffer, index=False, engine='openpyxl')
-                    excel_buffer.seek(0)
-                    
                     st.download_button(
-                        label="📥 Download Filtered Data",
+                        label="📥 Download This Page",
                         data=excel_buffer,
-                        file_name=f"resume_data_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                        file_name=f"resume_data_page_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                         key="download_filtered_data"
                     )
-                
                 with col2:
-                    # Download all data
-                    excel_buffer_all = BytesIO()
-                    df.to_excel(excel_buffer_all, index=False, engine='openpyxl')
-                    excel_buffer_all.seek(0)
-                    
-                    st.download_button(
-                        label="📥 Download All Data",
-                        data=excel_buffer_all,
-                        file_name=f"resume_data_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        key="download_all_data"
-                    )
-                
-                st.markdown('</div>', unsafe_allow_html=True)
+                    if st.button("📦 Export All Matching Rows", key="export_filtered_data"):
+                        self.start_export(EXPORT_FORMAT_OPTIONS[st.session_state.get('export_format', 'Excel')], filters)
+                        st.info("Export started. The download will appear under Admin Tools in the sidebar.")
+            else:
+                st.info("No resume submissions available")
+            
+            st.markdown('</div>', unsafe_allow_html=True)
+
+    def render_resume_search_section(self):
+        """Render full-text search over resume content, best matches first"""
+        st.markdown("<h2 class='section-title'>Search Resumes</h2>", unsafe_allow_html=True)
+        
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            query = st.text_input(
+                "Search skills, experience, projects and resume text",
+                placeholder='e.g. kubernetes AND fintech, "machine learning", pyth*',
+                key="resume_search_query"
+            )
+        with col2:
+            limit = st.selectbox("Results", [20, 50, 100], key="resume_search_limit")
+        
+        if not query.strip():
+            return
+        
+        result = search_resumes(query, limit=limit)
+        if result.get('error'):
+            st.error(result['error'])
+        elif result['rows']:
+            df = pd.DataFrame(result['rows'], columns=[
+                'ID', 'Name', 'Email', 'Target Role', 'Target Category',
+                'Submission Date', 'ATS Score', 'Match'
+            ])
+            df['ATS Score'] = df['ATS Score'].apply(lambda x: f"{x:.1f}%" if pd.notnull(x) else "N/A")
+            st.caption(f"Top {len(df)} matches")
+            st.dataframe(df, use_container_width=True, hide_index=True)
         else:
-            st.info("No resume submissions available")
+            st.info("No resumes match this search")
+
+    def render_similar_candidates_section(self):
+        """Render candidates similar to a chosen resume, from the MinHash LSH index"""
+        st.markdown("<h2 class='section-title'>Similar Candidates</h2>", unsafe_allow_html=True)
+        
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            resume_id = st.number_input("Resume ID", min_value=0, step=1, value=0, key="similar_resume_id")
+        with col2:
+            min_similarity = st.slider("Minimum Similarity", 0.1, 1.0, 0.3, 0.05, key="similar_min_similarity")
+        
+        if not resume_id:
+            st.caption("Enter a resume ID from the table below to find candidates like it.")
+            return
+        
+        result = find_similar_resumes(resume_id=int(resume_id), limit=20, min_similarity=min_similarity)
+        if result.get('error'):
+            st.error(result['error'])
+        elif result['rows']:
+            df = pd.DataFrame(result['rows'], columns=[
+                'ID', 'Name', 'Email', 'Target Role', 'Target Category',
+                'Submission Date', 'ATS Score', 'Similarity'
+            ])
+            df['ATS Score'] = df['ATS Score'].apply(lambda x: f"{x:.1f}%" if pd.notnull(x) else "N/A")
+            # Near-identical resumes are usually resubmissions or a shared template
+            df['Near Duplicate'] = df['Similarity'] >= DUPLICATE_SIMILARITY
+            df['Similarity'] = df['Similarity'].apply(lambda x: f"{x:.0%}")
+            st.dataframe(df, use_container_width=True, hide_index=True)
+        else:
+            st.info("No similar candidates found")
 
     def render_admin_section(self):
         """Render admin section with logs and Excel download"""
-        # Render resume data section
+        # Render resume search, similarity and data sections
+        self.render_resume_search_section()
+        self.render_similar_candidates_section()
         self.render_resume_data_section()
         
         # Render admin logs section
         st.markdown("<h2 class='section-title'>Admin Activity Logs</h2>", unsafe_allow_html=True)
         
         # Get admin logs
-        admin_logs = self.get_admin_logs()
+        cursors = self._page_cursor("admin_logs_browser")
+        page = self.get_admin_logs(after=cursors[-1])
+        admin_logs = page['rows']
         
         if admin_logs:
             # Convert to DataFrame
@@ -457,6 +483,7 @@ class DashboardManager:
                     use_container_width=True,
                     hide_index=True
                 )
+                self._render_pager("admin_logs_browser", page, f"{len(admin_logs)} entries")
                 
                 # Add download button
                 excel_buffer = BytesIO()
@@ -464,7 +491,7 @@ class DashboardManager:
                 excel_buffer.seek(0)
                 
                 st.download_button(
-                    label="📥 Download Admin Logs as Excel",
+                    label="📥 Download These Logs as Excel",
                     data=excel_buffer,
                     file_name=f"admin_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -474,95 +501,149 @@ class DashboardManager:
         else:
             st.info("No admin activity logs available")
 
-    def export_to_excel(self):
-        """Export data to Excel format"""
-        query = """
-            SELECT 
-                rd.name, rd.email, rd.phone, rd.linkedin, rd.github, rd.portfolio,
-                rd.summary, rd.target_role, rd.target_category,
-                rd.education, rd.experience, rd.projects, rd.skills,
-                ra.ats_score, ra.keyword_match_score, ra.format_score, ra.section_score,
-                ra.missing_skills, ra.recommendations,
-                rd.created_at
-            FROM resume_data rd
-            LEFT JOIN resume_analysis ra ON rd.id = ra.resume_id
-        """
-        try:
-            df = pd.read_sql_query(query, self.conn)
-            
-            # Create Excel writer object
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                # Write main data
-                df.to_excel(writer, sheet_name='Resume Data', index=False)
-                
-                # Get the workbook and the worksheet
-                workbook = writer.book
-                worksheet = writer.sheets['Resume Data']
-                
-                # Add formatting
-                header_format = workbook.add_format({
-                    'bold': True,
-                    'text_wrap': True,
-                    'valign': 'top',
-                    'fg_color': '#D7E4BC',
-                    'border': 1
-                })
-                
-                # Write headers with formatting
-                for col_num, value in enumerate(df.columns.values):
-                    worksheet.write(0, col_num, value, header_format)
-                    
-                # Auto-adjust columns' width
-                for i, col in enumerate(df.columns):
-                    max_length = max(
-                        df[col].astype(str).apply(len).max(),
-                        len(str(col))
-                    ) + 2
-                    worksheet.set_column(i, i, min(max_length, 50))
-            
-            # Return the Excel file
-            output.seek(0)
-            return output.getvalue()
-            
-        except Exception as e:
-            st.error(f"Error exporting to Excel: {str(e)}")
-            return None
+        self.render_rate_limit_section()
+        self.render_llm_telemetry_section()
 
-    def export_to_csv(self):
-        """Export data to CSV format"""
-        query = """
-            SELECT 
-                rd.name, rd.email, rd.phone, rd.linkedin, rd.github, rd.portfolio,
-                rd.summary, rd.target_role, rd.target_category,
-                rd.education, rd.experience, rd.projects, rd.skills,
-                ra.ats_score, ra.keyword_match_score, ra.format_score, ra.section_score,
-                ra.missing_skills, ra.recommendations,
-                rd.created_at
-            FROM resume_data rd
-            LEFT JOIN resume_analysis ra ON rd.id = ra.resume_id
-        """
+    def get_llm_telemetry(self, days=30):
+        """Get LLM call telemetry as a DataFrame"""
+        columns = ['provider', 'model', 'operation', 'latency_ms', 'prompt_tokens', 'completion_tokens',
+                   'cost_usd', 'retries', 'cache_hit', 'fallback', 'success', 'created_at']
+        df = pd.DataFrame(get_llm_calls(days), columns=columns)
+        df['created_at'] = pd.to_datetime(df['created_at'])
+        return df
+
+    def render_llm_telemetry_section(self):
+        """Render provider latency percentiles, token usage and cost over time"""
+        st.markdown("<h2 class='section-title'>LLM Provider Telemetry</h2>", unsafe_allow_html=True)
+
+        days = st.selectbox("Period", [1, 7, 30, 90], index=2, format_func=lambda d: f"Last {d} days",
+                            key="llm_telemetry_days")
+        df = self.get_llm_telemetry(days)
+        if df.empty:
+            st.info("No LLM calls recorded yet")
+            return
+
+        df['tokens'] = df['prompt_tokens'] + df['completion_tokens']
+        calls = df[df['cache_hit'] == 0]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Provider Calls", len(calls))
+        col2.metric("Cache Hit Rate", f"{df['cache_hit'].mean() * 100:.1f}%")
+        col3.metric("Tokens", f"{int(calls['tokens'].sum()):,}")
+        col4.metric("Estimated Cost", f"${calls['cost_usd'].sum():.2f}")
+
+        # Latency percentiles per provider (successful calls only)
+        successful = calls[calls['success'] == 1]
+        if not successful.empty:
+            percentiles = successful.groupby('provider')['latency_ms'].quantile([0.5, 0.9, 0.99]).unstack()
+            percentiles.columns = ['p50 (ms)', 'p90 (ms)', 'p99 (ms)']
+            summary = calls.groupby('provider').agg(
+                Calls=('provider', 'size'),
+                Errors=('success', lambda s: int((s == 0).sum())),
+                Retries=('retries', 'sum'),
+                Fallbacks=('fallback', lambda s: int(s.notna().sum())),
+                Tokens=('tokens', 'sum'),
+                Cost=('cost_usd', 'sum')
+            ).join(percentiles.round(0)).reset_index().rename(columns={'provider': 'Provider', 'Cost': 'Cost ($)'})
+            summary['Cost ($)'] = summary['Cost ($)'].round(4)
+            st.dataframe(summary, use_container_width=True, hide_index=True)
+
+        # Daily cost per provider
+        daily = calls.groupby([calls['created_at'].dt.date, 'provider'])['cost_usd'].sum().reset_index()
+        fig = px.line(daily, x='created_at', y='cost_usd', color='provider', markers=True,
+                      labels={'created_at': 'Date', 'cost_usd': 'Cost (USD)', 'provider': 'Provider'})
+        fig.update_layout(
+            title="Estimated Cost per Provider",
+            paper_bgcolor=self.colors['card'],
+            plot_bgcolor=self.colors['card'],
+            font={'color': self.colors['text']},
+            height=300,
+            margin=dict(l=20, r=20, t=50, b=20)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        # Daily p90 latency per provider
+        if not successful.empty:
+            latency = successful.groupby([successful['created_at'].dt.date, 'provider'])['latency_ms'] \
+                .quantile(0.9).reset_index()
+            fig = px.line(latency, x='created_at', y='latency_ms', color='provider', markers=True,
+                          labels={'created_at': 'Date', 'latency_ms': 'p90 latency (ms)', 'provider': 'Provider'})
+            fig.update_layout(
+                title="p90 Latency per Provider",
+                paper_bgcolor=self.colors['card'],
+                plot_bgcolor=self.colors['card'],
+                font={'color': self.colors['text']},
+                height=300,
+                margin=dict(l=20, r=20, t=50, b=20)
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+    def get_rate_limit_stats(self):
+        """Get LLM admission-control counters per provider"""
         try:
-            df = pd.read_sql_query(query, self.conn)
-            return df.to_csv(index=False).encode('utf-8')
+            return get_rate_limiter().get_stats()
         except Exception as e:
-            st.error(f"Error exporting to CSV: {str(e)}")
-            return None
+            print(f"Error fetching rate limit stats: {str(e)}")
+            return []
 
-    def export_to_json(self):
-        """Export data to JSON format"""
-        query = """
-            SELECT 
-                rd.*, ra.*
-            FROM resume_data rd
-            LEFT JOIN resume_analysis ra ON rd.id = ra.resume_id
-        """
+    def render_rate_limit_section(self):
+        """Render admitted, queued and shed LLM requests per provider"""
+        st.markdown("<h2 class='section-title'>LLM Admission Control</h2>", unsafe_allow_html=True)
+
+        stats = self.get_rate_limit_stats()
+        if not stats:
+            st.info("No LLM requests recorded yet")
+            return
+
+        df = pd.DataFrame(stats)
+        df['avg_wait'] = df['avg_wait'].round(2)
+        df = df[['provider', 'admitted', 'queued', 'shed', 'avg_wait', 'last_shed_at']]
+        df.columns = ['Provider', 'Admitted', 'Queued', 'Shed', 'Avg Wait (s)', 'Last Shed']
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Admitted", int(df['Admitted'].sum()))
+        col2.metric("Queued", int(df['Queued'].sum()))
+        col3.metric("Shed", int(df['Shed'].sum()))
+        st.dataframe(df, use_container_width=True, hide_index=True)
+
+        if st.button("🔄 Reset Admission Counters", key="reset_rate_limit_stats"):
+            get_rate_limiter().reset_stats()
+            st.rerun()
+
+    def start_export(self, fmt, filters=None):
+        """Queue a streaming export job; its status is shown until the file is downloaded"""
+        # Dates are sent as ISO strings so the job payload stays JSON
+        filters = {k: (v.isoformat() if hasattr(v, 'isoformat') else v) for k, v in (filters or {}).items()}
         try:
-            df = pd.read_sql_query(query, self.conn)
-            return df.to_json(orient='records', date_format='iso')
+            st.session_state.export_job_id = submit_job("export_resumes", {"fmt": fmt, "filters": filters})
         except Exception as e:
-            st.error(f"Error exporting to JSON: {str(e)}")
-            return None
+            st.error(f"Error starting export: {str(e)}")
+
+    def render_export_status(self, container):
+        """Show the progress of this session's export job, or its download button once done"""
+        job_id = st.session_state.get('export_job_id')
+        job = JobQueue().get(job_id) if job_id else None
+        if not job:
+            return
+        
+        if job['status'] in ('queued', 'running'):
+            container.info("⏳ Export in progress...")
+            container.button("🔄 Check Export", key="check_export")
+        elif job['status'] == 'failed':
+            container.error(f"Export failed: {job['error']}")
+        elif 'error' in job['result']:
+            container.error(job['result']['error'])
+        elif os.path.exists(job['result']['path']):
+            result = job['result']
+            with open(result['path'], 'rb') as f:
+                container.download_button(
+                    f"⬇️ Download {result['rows']} rows ({result['format'].upper()})",
+                    data=f,
+                    file_name=result['file_name'],
+                    mime=result['mime'],
+                    key="download_export"
+                )
+        else:
+            container.warning("The export file has expired. Please export again.")
 
     def get_database_stats(self):
         """Get database statistics"""
@@ -577,7 +658,7 @@ class DashboardManager:
         cursor.execute("""
             SELECT COUNT(*) 
             FROM resume_data 
-            WHERE DATE(created_at) = DATE('now')
+            WHERE created_at >= DATE('now') AND created_at < DATE('now', '+1 day')
         """)
         stats['today_submissions'] = cursor.fetchone()[0]
         
@@ -597,19 +678,9 @@ class DashboardManager:
         
         return stats
 
-    def get_admin_logs(self):
-        """Get admin logs"""
-        cursor = self.conn.cursor()
-        try:
-            cursor.execute('''
-            SELECT admin_email, action, timestamp
-            FROM admin_logs
-            ORDER BY timestamp DESC
-            ''')
-            return cursor.fetchall()
-        except Exception as e:
-            print(f"Error fetching admin logs: {str(e)}")
-            return []
+    def get_admin_logs(self, after=None, page_size=50):
+        """Get one page of admin logs (see config.database.get_admin_logs_page)"""
+        return get_admin_logs_page(after=after, page_size=page_size)
 
     def render_dashboard(self):
         """Main dashboard rendering function"""
@@ -853,32 +924,19 @@ class DashboardManager:
                 if metric == 'resumes':
                     cursor.execute("""
                         SELECT 
-                            (COUNT(*) - (
-                                SELECT COUNT(*) 
-                                FROM resume_data 
-                                WHERE created_at < date('now', '-7 days')
-                            )) * 100.0 / 
-                            NULLIF((
-                                SELECT COUNT(*) 
-                                FROM resume_data 
-                                WHERE created_at < date('now', '-7 days')
-                            ), 0)
-                        FROM resume_data
+                            (SUM(submissions) - SUM(CASE WHEN day < date('now', '-7 days') THEN submissions ELSE 0 END)) * 100.0 /
+                            NULLIF(SUM(CASE WHEN day < date('now', '-7 days') THEN submissions ELSE 0 END), 0)
+                        FROM daily_resume_stats
                     """)
                 elif metric == 'ats':
                     cursor.execute("""
                         SELECT 
-                            (AVG(ats_score) - (
-                                SELECT AVG(ats_score) 
-                                FROM resume_analysis 
-                                WHERE created_at < date('now', '-7 days')
-                            )) * 100.0 / 
-                            NULLIF((
-                                SELECT AVG(ats_score) 
-                                FROM resume_analysis 
-                                WHERE created_at < date('now', '-7 days')
-                            ), 0)
-                        FROM resume_analysis
+                            (SUM(ats_sum) / NULLIF(SUM(analyses), 0) - old_avg) * 100.0 / NULLIF(old_avg, 0)
+                        FROM daily_analysis_stats, (
+                            SELECT SUM(ats_sum) / NULLIF(SUM(analyses), 0) as old_avg
+                            FROM daily_analysis_stats
+                            WHERE day < date('now', '-7 days')
+                        )
                     """)
                 
                 change = cursor.fetchone()[0] or 0
@@ -903,11 +961,11 @@ class DashboardManager:
         
         # Most Successful Job Category
         cursor.execute("""
-            SELECT target_category, AVG(ats_score) as avg_score,
-                   COUNT(*) as submission_count
-            FROM resume_data rd
-            JOIN resume_analysis ra ON rd.id = ra.resume_id
-            GROUP BY target_category
+            SELECT category, SUM(ats_sum) / SUM(analyses) as avg_score,
+                   SUM(analyses) as submission_count
+            FROM daily_category_stats
+            GROUP BY category
+            HAVING SUM(analyses) > 0
             ORDER BY avg_score DESC
             LIMIT 1
         """)
@@ -925,10 +983,11 @@ class DashboardManager:
         # Recent Improvement
         cursor.execute("""
             SELECT 
-                (SELECT AVG(ats_score) FROM resume_analysis 
-                 WHERE created_at >= date('now', '-7 days')) as recent_score,
-                (SELECT AVG(ats_score) FROM resume_analysis 
-                 WHERE created_at < date('now', '-7 days')) as old_score
+                SUM(CASE WHEN day >= date('now', '-7 days') THEN ats_sum END) /
+                    SUM(CASE WHEN day >= date('now', '-7 days') THEN analyses END) as recent_score,
+                SUM(CASE WHEN day < date('now', '-7 days') THEN ats_sum END) /
+                    SUM(CASE WHEN day < date('now', '-7 days') THEN analyses END) as old_score
+            FROM daily_analysis_stats
         """)
         scores = cursor.fetchone()
         if scores and scores[0] and scores[1]:
@@ -944,32 +1003,15 @@ class DashboardManager:
         
         # Most Common Skills
         cursor.execute("""
-            WITH RECURSIVE
-            split(skill, rest) AS (
-                SELECT '', skills || ',' 
-                FROM resume_data 
-                WHERE skills IS NOT NULL
-                UNION ALL
-                SELECT
-                    substr(rest, 0, instr(rest, ',')),
-                    substr(rest, instr(rest, ',') + 1)
-                FROM split 
-                WHERE rest <> ''
-            ),
-            cleaned_skills AS (
-                SELECT TRIM(REPLACE(REPLACE(skill, '[', ''), ']', '')) as skill
-                FROM split 
-                WHERE skill <> ''
-            )
-            SELECT skill, COUNT(*) as count
-            FROM cleaned_skills
-            GROUP BY skill
+            SELECT skill_name, COUNT(*) as count
+            FROM resume_skills
+            GROUP BY skill_name COLLATE NOCASE
             ORDER BY count DESC
             LIMIT 3
         """)
         top_skills = cursor.fetchall()
         if top_skills:
-            skills_text = f"Most in-demand skills: Python ({top_skills[0][1]} resumes), Java ({top_skills[1][1]} resumes), Express ({top_skills[2][1]} resumes)"
+            skills_text = ", ".join(f"{name} ({count} resumes)" for name, count in top_skills)
             insights.append({
                 'title': 'Top Skills',
                 'icon': '💡',
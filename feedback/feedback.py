@@ -1,8 +1,8 @@
 import streamlit as st
-import sqlite3
 from datetime import datetime
 import pandas as pd
 import time
+from config.database import get_connection, queue_write
 
 class FeedbackManager:
     def __init__(self):
@@ -11,7 +11,7 @@ class FeedbackManager:
 
     def setup_database(self):
         """Create feedback table if it doesn't exist"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         c = conn.cursor()
         c.execute('''
             CREATE TABLE IF NOT EXISTS feedback (
@@ -29,10 +29,8 @@ class FeedbackManager:
         conn.close()
 
     def save_feedback(self, feedback_data):
-        """Save feedback to database"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''
+        """Save feedback to database (write-behind)"""
+        queue_write('''
             INSERT INTO feedback (
                 rating, usability_score, feature_satisfaction,
                 missing_features, improvement_suggestions,
@@ -46,13 +44,11 @@ class FeedbackManager:
             feedback_data['improvement_suggestions'],
             feedback_data['user_experience'],
             datetime.now()
-        ))
-        conn.commit()
-        conn.close()
+        ), "feedback", db_path=self.db_path)
 
     def get_feedback_stats(self):
         """Get feedback statistics"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         df = pd.read_sql_query("SELECT * FROM feedback", conn)
         conn.close()
         
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Local Stand-in Server for AI and Resume APIs
+Emulates the Gemini generateContent, OpenAI chat completions and APILayer resume_parser
+endpoints with templated responses, configurable latency, error injection and streaming,
+so the analyzers can be benchmarked and load-tested offline.
+
+Start the server:
+    python stub_server.py --port 8765 --latency-ms 800 --error-rate 0.05
+
+Point the app at it (Gemini, OpenAI, OpenRouter and APILayer clients all switch):
+    LLM_STUB_SERVER_URL=http://127.0.0.1:8765 streamlit run app.py
+
+GET /stats returns request counts per endpoint; POST /stats/reset clears them.
+"""
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+SKILL_WORDS = ['Python', 'Java', 'JavaScript', 'SQL', 'React', 'Docker', 'AWS', 'Machine Learning',
+               'Data Analysis', 'Communication', 'Leadership', 'Git', 'Kubernetes', 'Excel', 'Tableau']
+
+
+def estimate_tokens(text):
+    return (len(text or "") + 3) // 4
+
+
+def resume_score(prompt):
+    """Deterministic score that grows with the amount of resume text"""
+    words = len(re.findall(r"\w+", prompt))
+    return max(40, min(92, 40 + words // 40))
+
+
+def found_skills(prompt):
+    lowered = prompt.lower()
+    return [skill for skill in SKILL_WORDS if skill.lower() in lowered] or ['Communication']
+
+
+def render_response(prompt, json_mode):
+    """Pick a templated response matching the prompt the app sent"""
+    score = resume_score(prompt)
+    skills = found_skills(prompt)
+    if json_mode and '"resume_score"' in prompt:
+        return json.dumps({
+            "overall_assessment": "Stand-in analysis: the resume is clearly structured with room for more metrics.",
+            "professional_profile": "Consistent career narrative.",
+            "skills": {"current": skills, "proficiency": "Intermediate", "missing": ["Cloud certifications"]},
+            "experience_analysis": "Use more quantified achievements.",
+            "education_analysis": "Education section is complete.",
+            "strengths": ["Clear structure", "Relevant technical skills", "Consistent formatting"],
+            "improvements": ["Quantify achievements", "Add a targeted summary", "Include keywords from the role"],
+            "ats": {"score": max(0, score - 5), "recommendations": ["Use standard section headings"]},
+            "recommended_courses": ["A certification relevant to the target role"],
+            "resume_score": score,
+            "role_alignment": "Good alignment with the target role.",
+            "job_match": "",
+            "unmet_requirements": []
+        })
+    if json_mode and '"part_summary"' in prompt:
+        return json.dumps({
+            "part_summary": "Stand-in summary of this part of the resume.",
+            "skills": skills, "missing_skills": ["Cloud certifications"],
+            "strengths": ["Detailed content"], "improvements": ["Quantify achievements"],
+            "ats_recommendations": ["Use standard section headings"], "recommended_courses": [],
+            "role_fit": "", "score": score, "ats_score": max(0, score - 5)
+        })
+    if '"enhanced_text"' in prompt:
+        resume = prompt.split("Original Resume:", 1)[-1]
+        resume = resume.split("Target Job Description:", 1)[0].split("Please provide:", 1)[0].strip()
+        return json.dumps({
+            "enhanced_text": resume,
+            "suggestions": ["Start bullets with strong action verbs", "Quantify achievements"],
+            "keywords_added": skills[:3],
+            "improvements_made": ["Stand-in enhancement applied"]
+        })
+    if "## Resume Score" in prompt:
+        return (f"## Overall Assessment\nStand-in analysis of the resume.\n\n"
+                f"## Skills Analysis\n- **Current Skills**: {', '.join(skills)}\n"
+                f"- **Missing Skills**: Cloud certifications\n\n"
+                f"## Key Strengths\n- Clear structure\n- Relevant technical skills\n\n"
+                f"## Areas for Improvement\n- Quantify achievements\n\n"
+                f"## ATS Optimization Assessment\nATS Score: {max(0, score - 5)}/100\n\n"
+                f"## Recommended Courses/Certifications\n- A certification relevant to the target role\n\n"
+                f"## Resume Score\nResume Score: {score}/100\n")
+    if "section of a resume" in prompt:
+        section = prompt.split("ATS optimization:", 1)[-1].split("Provide an improved version", 1)[0].strip()
+        return section or "Delivered measurable results."
+    return "Stand-in reply: focus on quantifiable achievements and role-specific keywords."
+
+
+def parse_resume_fields(text):
+    """APILayer-shaped parse of a plain-text resume"""
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    email = re.search(r'[\w.+-]+@[\w-]+\.[\w.]+', text)
+    phone = re.search(r'\+?\d[\d\s().-]{7,}\d', text)
+    linkedin = re.search(r'(https?://)?(www\.)?linkedin\.com/\S+', text, re.IGNORECASE)
+    github = re.search(r'(https?://)?(www\.)?github\.com/\S+', text, re.IGNORECASE)
+    experience = [line for line in lines if re.search(r'\b(19|20)\d{2}\b', line)][:10]
+    education = [line for line in lines if re.search(r'\b(university|college|b\.?sc|m\.?sc|bachelor|master|ph\.?d)\b',
+                                                      line, re.IGNORECASE)][:5]
+    return {
+        "name": lines[0] if lines else "",
+        "email": email.group(0) if email else "",
+        "phone": phone.group(0) if phone else "",
+        "location": "",
+        "linkedin_url": linkedin.group(0) if linkedin else "",
+        "github_url": github.group(0) if github else "",
+        "summary": lines[1] if len(lines) > 1 else "",
+        "experience": [{"title": line} for line in experience],
+        "education": [{"name": line} for line in education],
+        "skills": found_skills(text),
+        "certifications": [],
+        "languages": [],
+        "total_experience_years": len(experience)
+    }
+
+
+class StubConfig:
+    def __init__(self, latency_ms=0, jitter_ms=0, tokens_per_second=0, error_rate=0.0,
+                 error_codes=(429, 500), stream_chunk_chars=40, stream_delay_ms=20, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_codes = list(error_codes)
+        self.stream_chunk_chars = stream_chunk_chars
+        self.stream_delay_ms = stream_delay_ms
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def delay(self, output_text):
+        """Simulated time to first byte plus generation time"""
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        seconds = max(0.0, self.latency_ms + jitter) / 1000
+        if self.tokens_per_second:
+            seconds += estimate_tokens(output_text) / self.tokens_per_second
+        return seconds
+
+    def injected_error(self):
+        with self.lock:
+            if self.error_rate and self.random.random() < self.error_rate:
+                return self.random.choice(self.error_codes)
+        return None
+
+    def record(self, endpoint, status, seconds):
+        with self.lock:
+            entry = self.stats.setdefault(endpoint, {"requests": 0, "errors": 0, "total_seconds": 0.0})
+            entry["requests"] += 1
+            entry["errors"] += 1 if status >= 400 else 0
+            entry["total_seconds"] += seconds
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    config = StubConfig()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Keep benchmark output quiet; errors are still counted in /stats
+        pass
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            return self._send_json(200, {"status": "ok"})
+        if path == "/stats":
+            with self.config.lock:
+                return self._send_json(200, self.config.stats)
+        self._send_json(404, {"error": {"message": f"Unknown path {path}"}})
+
+    def do_POST(self):
+        started = time.time()
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        if url.path == "/stats/reset":
+            with self.config.lock:
+                self.config.stats.clear()
+            return self._send_json(200, {"status": "reset"})
+
+        gemini = re.match(r"^/v1(beta)?/models/([^/:]+):(generateContent|streamGenerateContent)$", url.path)
+        if gemini:
+            endpoint, status = "gemini", self._handle_gemini(body, gemini.group(3) == "streamGenerateContent",
+                                                               parse_qs(url.query).get("alt") == ["sse"])
+        elif url.path.rstrip("/").endswith("/chat/completions"):
+            endpoint, status = "openai", self._handle_openai(body)
+        elif url.path.rstrip("/").endswith("/resume_parser/upload"):
+            endpoint, status = "apilayer", self._handle_apilayer(body)
+        else:
+            endpoint, status = "unknown", self._send_json(404, {"error": {"message": f"Unknown path {url.path}"}})
+        self.config.record(endpoint, status, time.time() - started)
+
+    def _handle_gemini(self, body, stream, sse):
+        request = json.loads(body or b"{}")
+        prompt = "\n".join(part.get("text", "") for content in request.get("contents", [])
+                           for part in content.get("parts", []))
+        generation = request.get("generationConfig") or request.get("generation_config") or {}
+        json_mode = (generation.get("responseMimeType") or generation.get("response_mime_type")) == "application/json"
+        text = render_response(prompt, json_mode)
+
+        error = self._maybe_fail(text)
+        if error:
+            return error
+        usage = {"promptTokenCount": estimate_tokens(prompt), "candidatesTokenCount": estimate_tokens(text),
+                 "totalTokenCount": estimate_tokens(prompt) + estimate_tokens(text)}
+
+        def payload(chunk, finished):
+            data = {"candidates": [{"content": {"role": "model", "parts": [{"text": chunk}]}, "index": 0}]}
+            if finished:
+                data["candidates"][0]["finishReason"] = "STOP"
+                data["usageMetadata"] = usage
+            return data
+
+        if stream:
+            chunks = self._chunks(text)
+            if sse:
+                return self._send_sse([payload(chunk, i == len(chunks) - 1) for i, chunk in enumerate(chunks)])
+            return self._send_json(200, [payload(chunk, i == len(chunks) - 1) for i, chunk in enumerate(chunks)])
+        return self._send_json(200, payload(text, True))
+
+    def _handle_openai(self, body):
+        request = json.loads(body or b"{}")
+        messages = request.get("messages", [])
+        prompt = messages[-1].get("content", "") if messages else ""
+        json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+        text = render_response(prompt, json_mode)
+
+        error = self._maybe_fail(text)
+        if error:
+            return error
+        model = request.get("model", "stub-model")
+        prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+        response_id = f"chatcmpl-stub{int(time.time() * 1000)}"
+
+        if request.get("stream"):
+            chunks = self._chunks(text)
+            events = [{"id": response_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                       "model": model, "choices": [{"index": 0, "delta": {"content": chunk},
+                                                    "finish_reason": None}]} for chunk in chunks]
+            events.append({"id": response_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                           "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            return self._send_sse(events, done_marker=True)
+
+        return self._send_json(200, {
+            "id": response_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": estimate_tokens(text),
+                      "total_tokens": prompt_tokens + estimate_tokens(text)}
+        })
+
+    def _handle_apilayer(self, body):
+        # The client uploads the resume as multipart form data; the text part is all we need
+        content_type = self.headers.get("Content-Type", "")
+        text = body.decode("utf-8", errors="ignore")
+        boundary = re.search(r"boundary=(.+)", content_type)
+        if boundary:
+            for part in text.split("--" + boundary.group(1).strip('"')):
+                if 'name="file"' in part:
+                    text = part.split("\r\n\r\n", 1)[-1].rstrip("\r\n-")
+                    break
+        error = self._maybe_fail("")
+        if error:
+            return error
+        return self._send_json(200, parse_resume_fields(text))
+
+    def _maybe_fail(self, output_text):
+        """Sleep for the simulated latency and return an error status if one is injected"""
+        time.sleep(self.config.delay(output_text))
+        status = self.config.injected_error()
+        if not status:
+            return None
+        if status == 429:
+            message = "You exceeded your current quota (insufficient_quota). Stand-in injected error."
+            return self._send_json(429, {"error": {"message": message, "type": "insufficient_quota",
+                                                   "code": "insufficient_quota", "status": "RESOURCE_EXHAUSTED"}})
+        return self._send_json(status, {"error": {"message": "Stand-in injected server error",
+                                                  "type": "server_error", "code": status}})
+
+    def _chunks(self, text):
+        size = max(1, self.config.stream_chunk_chars)
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    def _send_json(self, status, data):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        return status
+
+    def _send_sse(self, events, done_marker=False):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for event in events:
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.config.stream_delay_ms / 1000)
+        if done_marker:
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        return 200
+
+
+def serve(host="127.0.0.1", port=8765, config=None):
+    """Create the stand-in server (call serve_forever() on the result)"""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config or StubConfig()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini, OpenAI and APILayer APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Base latency added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Uniform +/- jitter on the base latency")
+    parser.add_argument("--tokens-per-second", type=float, default=0,
+                        help="Simulated generation speed (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-codes", default="429,500", help="Comma-separated statuses for injected errors")
+    parser.add_argument("--stream-chunk-chars", type=int, default=40)
+    parser.add_argument("--stream-delay-ms", type=float, default=20)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible jitter and errors")
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        error_codes=[int(code) for code in args.error_codes.split(",") if code.strip()],
+        stream_chunk_chars=args.stream_chunk_chars,
+        stream_delay_ms=args.stream_delay_ms,
+        seed=args.seed
+    )
+    server = serve(args.host, args.port, config)
+    print(f"Stand-in API server listening on http://{args.host}:{args.port}")
+    print(f"Set LLM_STUB_SERVER_URL=http://{args.host}:{args.port} to point the app at it")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+Test Configuration
+Makes the repository root importable so tests can import config and utils directly,
+and provides a throwaway resume database.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def resume_db(tmp_path, monkeypatch):
+    """Point config.database at a fresh, migrated database file for one test"""
+    from config import database
+    path = str(tmp_path / "resume_data.db")
+    monkeypatch.setattr(database, "DB_PATH", path)
+    database.init_database()
+    yield path
+    database.close_connections()
@@ -0,0 +1,68 @@
+"""
+Chat Engine Tests
+The resume chat prompt stays within its token ceiling: the grounding block is fixed,
+recent turns are kept verbatim and older ones are folded into the rolling summary.
+"""
+import pytest
+
+from utils.chat_engine import ResumeChatEngine
+from utils.text_compactor import estimate_tokens
+
+RESUME = "Jane Doe\nExperience\n" + "\n".join(
+    f"- Built service {i} handling {i * 1000} requests per second with Python and PostgreSQL." for i in range(200)
+)
+
+
+class RecordingProvider:
+    """Answers every question and keeps the messages it was sent"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def chat(self, messages, temperature=0.7, max_tokens=500):
+        self.prompts.append(messages)
+        return f"Answer {len(self.prompts)}. Add measurable outcomes to every bullet."
+
+
+def prompt_tokens(messages):
+    return sum(estimate_tokens(message["content"]) for message in messages)
+
+
+@pytest.fixture
+def engine():
+    return ResumeChatEngine(RecordingProvider(), RESUME, max_context_tokens=1200, grounding_tokens=500,
+                            window_turns=4, summary_tokens=60)
+
+
+def test_grounding_is_compacted_once_and_reused(engine):
+    assert estimate_tokens(engine.grounding) <= 520
+    engine.ask("How is my summary?")
+    engine.ask("What about my skills?")
+    first, second = (prompts[0]["content"] for prompts in engine.provider.prompts)
+    # Every turn is sent the same system prompt and resume block
+    assert first == second
+    assert first.endswith(engine.grounding)
+
+
+def test_old_turns_move_into_the_summary(engine):
+    for i in range(5):
+        engine.ask(f"Question {i}? Please be detailed.")
+
+    assert len(engine.window) == 4
+    assert engine.window[0]["content"] == "Question 3? Please be detailed."
+    assert "User asked: Question 0?" in engine.summary
+    assert "Coach advised: Answer 1." in engine.summary
+    assert estimate_tokens(engine.summary) <= 60
+    assert "Summary of the earlier conversation" in engine.build_messages("Next?")[0]["content"]
+
+
+def test_prompt_never_exceeds_the_context_ceiling(engine):
+    for i in range(20):
+        engine.ask(f"Question {i}: " + "rewrite this bullet with stronger verbs " * 20)
+        assert prompt_tokens(engine.provider.prompts[-1]) <= engine.max_context_tokens
+
+
+def test_window_keeps_the_newest_messages_that_fit(engine):
+    engine.window = [{"role": "user", "content": "old " * 2000}, {"role": "assistant", "content": "recent reply"}]
+    messages = engine.build_messages("Latest question")
+    assert [m["content"] for m in messages[1:]] == ["recent reply", "Latest question"]
@@ -0,0 +1,114 @@
+"""
+Chunked Analysis Tests
+Resumes over the provider's token budget are analyzed section by section and merged
+locally: scores weighted by chunk size, lists deduplicated, failed chunks noted.
+"""
+import json
+import threading
+
+import pytest
+
+from utils import ai_resume_analyzer
+from utils.ai_resume_analyzer import AIResumeAnalyzer
+from utils.llm_providers import LLMProvider
+from utils.text_compactor import chunk_sections, compact_resume_text, estimate_tokens
+
+EXPERIENCE = "\n".join(f"- Led migration {i} of billing services to Kubernetes, cutting costs by {i}%"
+                       for i in range(40))
+PROJECTS = "\n".join(f"- Open source parser {i} for resume documents" for i in range(15))
+RESUME = f"Jane Doe\n\nExperience\n{EXPERIENCE}\n\nProjects\n{PROJECTS}\n\nSkills\nPython, SQL, Kubernetes"
+
+
+class ChunkScoringLLM(LLMProvider):
+    """Scores experience chunks 90 and everything else 60, optionally failing project chunks"""
+    name = "fake"
+    display_name = "Fake LLM"
+    token_budget = 400
+
+    def __init__(self, fail_projects=False):
+        super().__init__("fake-model")
+        self.enabled = True
+        self.fail_projects = fail_projects
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def analyze(self, prompt, json_mode=False, max_tokens=None, admitted=False, **kwargs):
+        with self.lock:
+            self.calls.append({"prompt": prompt, "max_tokens": max_tokens, "admitted": admitted})
+        resume_part = prompt.split("Resume part:")[1]
+        if self.fail_projects and "parser" in resume_part:
+            raise RuntimeError("upstream timeout")
+        experience = "Led migration" in resume_part
+        return json.dumps({
+            "part_summary": "Strong delivery record." if experience else "Relevant side projects.",
+            "skills": ["Python", "Kubernetes"] if experience else ["python", "Parsing"],
+            "missing_skills": ["Terraform", "Parsing"],
+            "strengths": ["Quantified impact"] if experience else ["Open source work"],
+            "score": 90 if experience else 60,
+        })
+
+    def served_by(self):
+        return self.display_name
+
+
+@pytest.fixture
+def admissions(monkeypatch):
+    admitted = []
+    monkeypatch.setattr(ai_resume_analyzer, "admit", lambda key, cost=1.0, max_wait=None: admitted.append(cost))
+    return admitted
+
+
+def expected_chunks():
+    return chunk_sections(compact_resume_text(RESUME), ChunkScoringLLM.token_budget)
+
+
+def test_long_resume_is_analyzed_in_chunks(admissions):
+    llm = ChunkScoringLLM()
+    result = AIResumeAnalyzer().analyze_resume_with_provider(RESUME, provider=llm)
+
+    chunks = expected_chunks()
+    assert len(chunks) > 1
+    assert result["chunks"] == len(chunks) == len(llm.calls)
+    assert admissions == [len(chunks)]
+    assert all(call["admitted"] and call["max_tokens"] == 700 for call in llm.calls)
+    # Every line of the resume reached one of the chunk prompts
+    prompts = "\n".join(call["prompt"] for call in llm.calls)
+    assert "migration 39" in prompts and "parser 14" in prompts and "Python, SQL, Kubernetes" in prompts
+
+
+def test_scores_are_weighted_by_chunk_size(admissions):
+    result = AIResumeAnalyzer().analyze_resume_with_provider(RESUME, provider=ChunkScoringLLM())
+
+    weights = [(estimate_tokens(text), 90 if "Led migration" in text else 60) for _, text in expected_chunks()]
+    expected = round(sum(w * score for w, score in weights) / sum(w for w, _ in weights))
+    assert result["resume_score"] == result["ats_score"] == expected
+    assert 60 < expected < 90
+
+
+def test_lists_are_merged_without_duplicates(admissions):
+    result = AIResumeAnalyzer().analyze_resume_with_provider(RESUME, provider=ChunkScoringLLM())
+
+    skills = result["structured"]["skills"]
+    assert skills["current"] == ["Python", "Kubernetes", "Parsing"]
+    # A skill one chunk shows is not reported missing by another
+    assert skills["missing"] == ["Terraform"]
+    assert result["strengths"] == ["Quantified impact", "Open source work"]
+    assert "## Overall Assessment" in result["analysis"]
+
+
+def test_failed_chunks_are_noted_and_skipped(admissions):
+    result = AIResumeAnalyzer().analyze_resume_with_provider(RESUME, provider=ChunkScoringLLM(fail_projects=True))
+
+    assert result["resume_score"] == 90
+    assert "could not be analyzed" in result["structured"]["overall_assessment"]
+
+
+def test_short_resume_keeps_the_single_prompt(admissions):
+    llm = ChunkScoringLLM()
+    llm.token_budget = 4000
+    llm.analyze = lambda prompt, **kwargs: "Resume Score: 70/100\nATS Score: 65/100"
+    result = AIResumeAnalyzer().analyze_resume_with_provider(RESUME, provider=llm)
+
+    assert "chunks" not in result
+    assert (result["resume_score"], result["ats_score"]) == (70, 65)
+    assert admissions == []
@@ -0,0 +1,61 @@
+"""
+Connection Pool Tests
+Each thread reuses one tuned WAL connection per database file; close() only rolls back
+work the caller left uncommitted.
+"""
+import threading
+
+import pytest
+
+from config.database import get_connection, close_connections, BUSY_TIMEOUT_MS
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "pool.db")
+    conn = get_connection(path)
+    conn.execute("CREATE TABLE items (name TEXT)")
+    conn.commit()
+    yield path
+    close_connections()
+
+
+def test_connection_is_reused_within_a_thread(db_path, tmp_path):
+    assert get_connection(db_path) is get_connection(db_path)
+    assert get_connection(str(tmp_path / "other.db")) is not get_connection(db_path)
+
+    other_thread = []
+
+    def connect():
+        other_thread.append(get_connection(db_path))
+        close_connections()
+
+    thread = threading.Thread(target=connect)
+    thread.start()
+    thread.join()
+    assert other_thread[0] is not get_connection(db_path)
+
+
+def test_pragmas_are_applied(db_path):
+    conn = get_connection(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == BUSY_TIMEOUT_MS
+    # NORMAL
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+
+def test_close_keeps_the_connection_and_drops_uncommitted_work(db_path):
+    conn = get_connection(db_path)
+    conn.execute("INSERT INTO items VALUES ('committed')")
+    conn.commit()
+    conn.execute("INSERT INTO items VALUES ('abandoned')")
+    conn.close()
+
+    assert get_connection(db_path) is conn
+    assert conn.execute("SELECT name FROM items").fetchall() == [("committed",)]
+
+
+def test_close_connections_opens_a_fresh_connection(db_path):
+    conn = get_connection(db_path)
+    close_connections()
+    assert get_connection(db_path) is not conn
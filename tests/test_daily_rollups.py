@@ -0,0 +1,130 @@
+"""
+Daily Rollup Tests
+The daily_* tables kept by triggers match aggregates over the base tables after inserts
+and deletes, and the migration backfill produces the same rows.
+"""
+import sqlite3
+
+import pytest
+
+from config.migrations import migrate, _daily_rollups
+
+RESUME_STATS = """
+    SELECT date(created_at), COUNT(*) FROM resume_data GROUP BY 1 ORDER BY 1
+"""
+ANALYSIS_STATS = """
+    SELECT date(created_at), COUNT(*), SUM(COALESCE(ats_score, 0)), SUM(COALESCE(keyword_match_score, 0)),
+           SUM(COALESCE(ats_score, 0) >= 70)
+    FROM resume_analysis GROUP BY 1 ORDER BY 1
+"""
+CATEGORY_STATS = """
+    SELECT date(ra.created_at), COALESCE(rd.target_category, 'Other'), COUNT(*), SUM(COALESCE(ra.ats_score, 0))
+    FROM resume_analysis ra LEFT JOIN resume_data rd ON rd.id = ra.resume_id GROUP BY 1, 2 ORDER BY 1, 2
+"""
+AI_STATS = """
+    SELECT date(created_at), model_used, job_role, COUNT(*), SUM(resume_score)
+    FROM ai_analysis GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+"""
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / "resume_data.db")
+    migrate(conn)
+    yield conn
+    conn.close()
+
+
+def add_resume(conn, day, category):
+    cursor = conn.execute(
+        "INSERT INTO resume_data (name, email, phone, target_category, created_at) VALUES (?, ?, ?, ?, ?)",
+        ("Jane Doe", "jane@example.com", "555-0100", category, f"{day} 10:00:00")
+    )
+    return cursor.lastrowid
+
+
+def add_analysis(conn, resume_id, day, ats_score, keyword_score=50.0):
+    conn.execute(
+        "INSERT INTO resume_analysis (resume_id, ats_score, keyword_match_score, created_at) VALUES (?, ?, ?, ?)",
+        (resume_id, ats_score, keyword_score, f"{day} 11:00:00")
+    )
+
+
+def add_ai_analysis(conn, resume_id, day, score, model="Google Gemini", role="Data Engineer"):
+    conn.execute(
+        "INSERT INTO ai_analysis (resume_id, model_used, resume_score, job_role, created_at) VALUES (?, ?, ?, ?, ?)",
+        (resume_id, model, score, role, f"{day} 12:00:00")
+    )
+
+
+def populate(conn):
+    first = add_resume(conn, "2026-01-05", "Engineering")
+    second = add_resume(conn, "2026-01-05", None)
+    third = add_resume(conn, "2026-01-06", "Engineering")
+    add_analysis(conn, first, "2026-01-05", 82.0)
+    add_analysis(conn, second, "2026-01-05", 55.0)
+    add_analysis(conn, third, "2026-01-06", None)
+    add_ai_analysis(conn, first, "2026-01-05", 75)
+    add_ai_analysis(conn, second, "2026-01-05", 91)
+    add_ai_analysis(conn, third, "2026-01-06", 40, model="OpenAI")
+    conn.commit()
+
+
+def rollups(conn):
+    return {
+        "resumes": conn.execute(
+            "SELECT day, submissions FROM daily_resume_stats WHERE submissions > 0 ORDER BY day").fetchall(),
+        "analyses": conn.execute(
+            "SELECT day, analyses, ats_sum, keyword_sum, high_scoring FROM daily_analysis_stats "
+            "WHERE analyses > 0 ORDER BY day").fetchall(),
+        "categories": conn.execute(
+            "SELECT day, category, analyses, ats_sum FROM daily_category_stats "
+            "WHERE analyses > 0 ORDER BY day, category").fetchall(),
+        "ai": conn.execute(
+            "SELECT day, model_used, job_role, SUM(analyses), SUM(score_sum) FROM daily_ai_stats "
+            "GROUP BY 1, 2, 3 HAVING SUM(analyses) > 0 ORDER BY 1, 2, 3").fetchall(),
+    }
+
+
+def aggregates(conn):
+    return {
+        "resumes": conn.execute(RESUME_STATS).fetchall(),
+        "analyses": conn.execute(ANALYSIS_STATS).fetchall(),
+        "categories": conn.execute(CATEGORY_STATS).fetchall(),
+        "ai": conn.execute(AI_STATS).fetchall(),
+    }
+
+
+def test_triggers_keep_rollups_in_step_with_inserts(conn):
+    populate(conn)
+    assert rollups(conn) == aggregates(conn)
+    assert rollups(conn)["analyses"][0] == ("2026-01-05", 2, 137.0, 100.0, 1)
+
+
+def test_triggers_keep_rollups_in_step_with_deletes(conn):
+    populate(conn)
+    conn.execute("DELETE FROM resume_analysis WHERE ats_score = 82.0")
+    conn.execute("DELETE FROM ai_analysis WHERE model_used = 'OpenAI'")
+    conn.execute("DELETE FROM resume_data WHERE target_category IS NULL")
+    conn.commit()
+
+    assert rollups(conn) == aggregates(conn)
+    # Emptied AI buckets are removed rather than left at zero
+    assert conn.execute("SELECT COUNT(*) FROM daily_ai_stats WHERE analyses <= 0").fetchone()[0] == 0
+
+
+def test_score_buckets_follow_the_resume_score(conn):
+    populate(conn)
+    buckets = conn.execute("SELECT score_bucket, analyses FROM daily_ai_stats ORDER BY score_bucket").fetchall()
+    assert buckets == [("21-40", 1), ("61-80", 1), ("81-100", 1)]
+
+
+def test_backfill_rebuilds_the_same_rollups(conn):
+    populate(conn)
+    expected = rollups(conn)
+    conn.execute("DELETE FROM daily_ai_stats")
+    conn.execute("UPDATE daily_resume_stats SET submissions = 0")
+
+    _daily_rollups(conn.cursor())
+    conn.commit()
+    assert rollups(conn) == expected
@@ -0,0 +1,75 @@
+"""
+Data Export Tests
+Streaming exports of a small resume database in every format, including Excel exports
+that roll over to a new worksheet when one fills up.
+"""
+import csv
+import json
+import os
+import sys
+
+import pyarrow.parquet as pq
+import pytest
+from openpyxl import load_workbook
+
+from config.database import EXPORT_COLUMNS, save_resume_bundle
+from utils import data_export
+from utils.data_export import export_resumes
+
+
+@pytest.fixture
+def resumes(resume_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(data_export, "EXPORT_DIR", str(tmp_path / "exports"))
+    for i in range(5):
+        save_resume_bundle(
+            {'personal_info': {'full_name': f'Candidate {i}', 'email': f'c{i}@example.com'},
+             'target_role': 'Data Engineer', 'target_category': 'Data', 'skills': ['SQL']},
+            analysis={'ats_score': 50 + i, 'keyword_match_score': 40}
+        )
+    return resume_db
+
+
+def test_csv_export_streams_every_row(resumes):
+    result = export_resumes("csv", chunk_size=2)
+    assert result["rows"] == 5
+    with open(result["path"], newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == EXPORT_COLUMNS
+    assert sorted(row[0] for row in rows[1:]) == [f"Candidate {i}" for i in range(5)]
+    assert not any(name.endswith(".part") for name in os.listdir(data_export.EXPORT_DIR))
+
+
+def test_jsonl_export_writes_one_object_per_row(resumes):
+    result = export_resumes("jsonl", chunk_size=2)
+    with open(result["path"], encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 5
+    assert set(records[0]) == set(EXPORT_COLUMNS)
+
+
+def test_parquet_export_keeps_scores_numeric(resumes):
+    result = export_resumes("parquet", chunk_size=2)
+    table = pq.read_table(result["path"])
+    assert table.num_rows == 5
+    assert sorted(table.column("ats_score").to_pylist()) == [50.0, 51.0, 52.0, 53.0, 54.0]
+
+
+@pytest.mark.parametrize("writer", ["xlsxwriter", "openpyxl"])
+def test_xlsx_export_rolls_over_to_new_sheets(resumes, monkeypatch, writer):
+    if writer == "openpyxl":
+        # Without xlsxwriter the write-only openpyxl workbook is used
+        monkeypatch.setitem(sys.modules, "xlsxwriter", None)
+    else:
+        pytest.importorskip("xlsxwriter")
+    monkeypatch.setattr(data_export, "XLSX_SHEET_ROWS", 2)
+
+    result = export_resumes("xlsx", chunk_size=3)
+    workbook = load_workbook(result["path"], read_only=True)
+    assert workbook.sheetnames == ["Resume Data", "Resume Data 2", "Resume Data 3"]
+    sheets = [list(workbook[name].iter_rows(values_only=True)) for name in workbook.sheetnames]
+    assert all(list(sheet[0]) == EXPORT_COLUMNS for sheet in sheets)
+    assert [len(sheet) - 1 for sheet in sheets] == [2, 2, 1]
+
+
+def test_unknown_format_is_an_error(resumes):
+    assert "error" in export_resumes("xml")
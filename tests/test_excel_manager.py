@@ -0,0 +1,79 @@
+"""
+Excel Manager Tests
+The append-only segment store: saves never rewrite the workbook, reads see every row,
+and compaction merges segments into resume_data.xlsx exactly once.
+"""
+import os
+import threading
+
+import pytest
+
+from utils import excel_manager
+from utils.excel_manager import ExcelManager
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ExcelManager(str(tmp_path / "resume_data.xlsx"))
+
+
+def segments(store):
+    return sorted(name for name in os.listdir(store.segment_dir) if name.endswith(".csv"))
+
+
+def test_saves_append_to_the_active_segment(store):
+    for i in range(3):
+        assert store.save_resume_data(f"user-{i}", "Backend Developer", f"resume {i}", {"score": i})
+
+    assert not os.path.exists(store.excel_file)
+    assert segments(store) == ["active.csv"]
+    df = store.read_all()
+    assert list(df["user_id"]) == ["user-0", "user-1", "user-2"]
+    assert df.loc[2, "analysis_data"] == "{'score': 2}"
+
+
+def test_concurrent_saves_lose_no_rows(store):
+    def save(worker):
+        for i in range(20):
+            store.save_resume_data(f"user-{worker}", "Data Engineer", f"resume {worker}-{i}")
+
+    threads = [threading.Thread(target=save, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(store.read_all()) == 80
+
+
+def test_compaction_merges_segments_into_the_workbook(store):
+    store.save_resume_data("user-1", "Backend Developer", "first")
+    assert len(store.compact()) == 1
+    store.save_resume_data("user-2", "Data Engineer", "second")
+
+    assert os.path.exists(store.excel_file)
+    assert segments(store) == ["active.csv"]
+    assert list(store.read_all()["content"]) == ["first", "second"]
+    # A second compaction appends the new rows without duplicating the merged ones
+    assert list(store.compact()["content"]) == ["first", "second"]
+    assert segments(store) == []
+
+
+def test_reads_compact_once_enough_rows_are_pending(store, monkeypatch):
+    monkeypatch.setattr(excel_manager, "COMPACT_ROWS", 3)
+    store.save_resume_data("user-1", "Backend Developer", "first")
+    store.save_resume_data("user-2", "Backend Developer", "second")
+    assert len(store.get_all_resumes()) == 2
+    assert not os.path.exists(store.excel_file)
+
+    store.save_resume_data("user-3", "Backend Developer", "third")
+    assert len(store.get_all_resumes()) == 3
+    assert os.path.exists(store.excel_file)
+    assert segments(store) == []
+    assert len(store.get_all_resumes()) == 3
+
+
+def test_user_resumes_match_numeric_ids(store):
+    store.save_resume_data(42, "Backend Developer", "mine")
+    store.save_resume_data(7, "Backend Developer", "theirs")
+    store.compact()
+    assert list(store.get_user_resumes(42)["content"]) == ["mine"]
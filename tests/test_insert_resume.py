@@ -0,0 +1,68 @@
+"""
+Resume Insert Tests
+Every submission gets its own resume_data row; repeat uploads of a file share its
+content_hash, and each row gets its skills and similarity signature.
+"""
+import sqlite3
+
+import pytest
+
+from config.migrations import migrate
+from config.database import insert_resume
+
+
+@pytest.fixture
+def cursor(tmp_path):
+    conn = sqlite3.connect(tmp_path / "resume_data.db")
+    migrate(conn)
+    yield conn.cursor()
+    conn.close()
+
+
+def resume(role, content_hash="a" * 64, text="Jane Doe\nExperience\nBuilt Python services with SQL and Docker"):
+    return {
+        'personal_info': {'full_name': 'Jane Doe', 'email': 'jane@example.com'},
+        'summary': 'Backend engineer',
+        'target_role': role,
+        'skills': ['Python', 'SQL', 'Docker'],
+        'resume_text': text,
+        'content_hash': content_hash
+    }
+
+
+def test_resubmitting_a_file_for_another_role_adds_a_row(cursor):
+    first = insert_resume(cursor, resume("Backend Developer"))
+    second = insert_resume(cursor, resume("Data Engineer"))
+
+    assert first != second
+    rows = cursor.execute(
+        "SELECT id, target_role FROM resume_data WHERE content_hash = ? ORDER BY id", ("a" * 64,)
+    ).fetchall()
+    # Each submission keeps its own role rather than attaching to the first row
+    assert rows == [(first, "Backend Developer"), (second, "Data Engineer")]
+
+
+def test_each_submission_gets_skills_and_a_signature(cursor):
+    ids = [insert_resume(cursor, resume(role)) for role in ("Backend Developer", "Data Engineer")]
+    for resume_id in ids:
+        skills = cursor.execute(
+            "SELECT COUNT(*) FROM resume_skills WHERE resume_id = ?", (resume_id,)
+        ).fetchone()[0]
+        signatures = cursor.execute(
+            "SELECT COUNT(*) FROM resume_signatures WHERE resume_id = ?", (resume_id,)
+        ).fetchone()[0]
+        assert skills == 3
+        assert signatures == 1
+
+
+def test_resume_without_text_is_fingerprinted_on_its_fields(cursor):
+    resume_id = insert_resume(cursor, resume("Backend Developer", content_hash=None, text=None))
+    assert cursor.execute(
+        "SELECT COUNT(*) FROM resume_signatures WHERE resume_id = ?", (resume_id,)
+    ).fetchone()[0] == 1
+
+
+def test_resumes_without_a_hash_are_stored_separately(cursor):
+    first = insert_resume(cursor, resume("Backend Developer", content_hash=None))
+    second = insert_resume(cursor, resume("Backend Developer", content_hash=None))
+    assert first != second
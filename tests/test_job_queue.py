@@ -0,0 +1,108 @@
+"""
+Job Queue Tests
+Claiming, finishing, deduplicating and requeueing jobs on a temporary jobs database,
+and the extraction and report tasks failing their job with a readable error.
+"""
+import sqlite3
+
+import pytest
+
+from utils import job_queue
+from utils.job_queue import JobQueue, make_dedupe_key, MAX_ATTEMPTS
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setitem(job_queue.TASKS, "echo", lambda value=None: {"value": value})
+    monkeypatch.setitem(job_queue.TASKS, "explode", lambda: 1 / 0)
+    return JobQueue(str(tmp_path / "jobs.db"))
+
+
+def set_started(queue, job_id, started_at, attempts):
+    conn = sqlite3.connect(queue.db_path)
+    conn.execute("UPDATE jobs SET started_at = ?, attempts = ? WHERE id = ?", (started_at, attempts, job_id))
+    conn.commit()
+    conn.close()
+
+
+def test_claim_takes_each_queued_job_once(queue):
+    first = queue.submit("echo", {"value": 1})
+    second = queue.submit("echo", {"value": 2})
+
+    claimed = [queue.claim(), queue.claim()]
+    assert {job["id"] for job in claimed} == {first, second}
+    assert queue.claim() is None
+    assert queue.get(first)["status"] == "running"
+
+
+def test_run_one_records_results_and_errors(queue):
+    ok = queue.submit("echo", {"value": b"\x00pdf"})
+    failing = queue.submit("explode", {})
+    while queue.run_one():
+        pass
+
+    assert queue.get(ok)["status"] == "done"
+    assert queue.get(ok)["result"] == {"value": b"\x00pdf"}
+    assert queue.get(failing)["status"] == "failed"
+    assert "division by zero" in queue.get(failing)["error"]
+    assert queue.run_one() is False
+
+
+def test_unknown_kind_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.submit("missing", {})
+
+
+def test_dedupe_returns_the_same_job_and_retries_failures(queue):
+    job_id = queue.submit("explode", {}, dedupe=True)
+    assert queue.submit("explode", {}, dedupe=True) == job_id
+    queue.run_one()
+    assert queue.get(job_id)["status"] == "failed"
+
+    assert queue.submit("explode", {}, dedupe=True) == job_id
+    assert queue.get(job_id)["status"] == "queued"
+
+
+def test_dedupe_key_shares_only_unfinished_jobs(queue):
+    key = make_dedupe_key("echo", b"resume bytes", {"role": "Data Engineer"})
+    assert key == make_dedupe_key("echo", b"resume bytes", {"role": "Data Engineer"})
+    assert key != make_dedupe_key("echo", b"resume bytes", {"role": "Backend Developer"})
+
+    first = queue.submit("echo", {"value": 1}, dedupe_key=key)
+    assert queue.submit("echo", {"value": 1}, dedupe_key=key) == first
+    queue.run_one()
+    assert queue.submit("echo", {"value": 1}, dedupe_key=key) != first
+
+
+def test_stale_running_jobs_are_requeued_then_failed(queue):
+    retried = queue.submit("echo", {"value": 1})
+    exhausted = queue.submit("echo", {"value": 2})
+    queue.claim()
+    queue.claim()
+    set_started(queue, retried, "2000-01-01 00:00:00", 1)
+    set_started(queue, exhausted, "2000-01-01 00:00:00", MAX_ATTEMPTS)
+
+    assert queue.requeue_stale() == 1
+    assert queue.get(retried)["status"] == "queued"
+    assert queue.get(exhausted)["status"] == "failed"
+    assert queue.get(exhausted)["error"] == "Worker did not finish the job"
+
+
+def test_recent_running_jobs_are_left_alone(queue):
+    job_id = queue.submit("echo", {})
+    queue.claim()
+    assert queue.requeue_stale() == 0
+    assert queue.get(job_id)["status"] == "running"
+
+
+@pytest.mark.parametrize("kind, payload, message", [
+    ("extract_text", {"file_bytes": b"not a pdf", "file_type": "pdf"}, "All text extraction methods failed"),
+    ("pdf_report", {"analysis_result": {}, "candidate_name": "Jane", "job_role": "Data Engineer"},
+     "No analysis result provided"),
+])
+def test_extraction_and_report_errors_fail_the_job(queue, kind, payload, message):
+    job_id = queue.submit(kind, payload)
+    queue.run_one()
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert message in job["error"]
@@ -0,0 +1,142 @@
+"""
+LLM Provider Tests
+Provider lookup and the hedged race between a primary and a secondary provider, with
+admission control disabled and telemetry captured in memory.
+"""
+import logging
+import threading
+import time
+
+import pytest
+
+from utils import llm_providers
+from utils.llm_providers import (
+    LLMProvider, HedgedProvider, LocalStubProvider, ProviderError, get_provider
+)
+from utils.rate_limiter import RateLimitExceeded
+
+# Calls still running in the hedge pool; each test waits for its losers to finish
+_running = []
+
+
+class FakeProvider(LLMProvider):
+    def __init__(self, name, delay=0.0, error=None):
+        super().__init__("fake-model")
+        self.name = name
+        self.display_name = name.title()
+        self.enabled = True
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def complete(self, messages, temperature=0.7, max_tokens=None, json_mode=False):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return f"{self.name} answer"
+
+    def _tracked_complete(self, *args, **kwargs):
+        finished = threading.Event()
+        _running.append(finished)
+        try:
+            return super()._tracked_complete(*args, **kwargs)
+        finally:
+            finished.set()
+
+
+@pytest.fixture(autouse=True)
+def calls(monkeypatch):
+    monkeypatch.setenv("LLM_RATE_LIMIT", "0")
+    monkeypatch.setenv("LLM_HEDGE_PROVIDER", "")
+    recorded = []
+    monkeypatch.setattr(llm_providers, "record_llm_call",
+                        lambda provider, model, operation, latency_ms, **kwargs: recorded.append((provider, kwargs)))
+    yield recorded
+    # A losing call must not finish after the telemetry patch is undone
+    while _running:
+        _running.pop().wait(5)
+
+
+def messages():
+    return [{"role": "user", "content": "Review this resume"}]
+
+
+def test_get_provider_accepts_display_names():
+    provider = get_provider("Local Stub")
+    assert isinstance(provider, LocalStubProvider)
+    assert "Local stub" in provider.analyze("Say something")
+    with pytest.raises(ProviderError):
+        get_provider("nope")
+
+
+def test_get_provider_wraps_a_hedge_partner():
+    provider = get_provider("gemini", hedge_with="local", hedge_after=3)
+    assert isinstance(provider, HedgedProvider)
+    assert provider.hedge_after == 3
+    assert isinstance(provider.secondary, LocalStubProvider)
+
+
+def test_fast_primary_is_never_hedged():
+    primary, secondary = FakeProvider("primary"), FakeProvider("secondary")
+    hedged = HedgedProvider(primary, secondary, hedge_after=1.0)
+
+    assert hedged.generate(messages()) == "primary answer"
+    assert hedged.served_by() == "Primary"
+    assert secondary.calls == 0
+
+
+def test_slow_primary_loses_to_the_hedge(calls):
+    primary, secondary = FakeProvider("primary", delay=0.5), FakeProvider("secondary")
+    hedged = HedgedProvider(primary, secondary, hedge_after=0.05)
+
+    assert hedged.generate(messages()) == "secondary answer"
+    assert hedged.served_by() == "Secondary"
+    # The hedge is recorded as a fallback for the primary
+    assert [kwargs["fallback"] for provider, kwargs in calls if provider == "secondary"] == ["primary"]
+
+
+def test_failed_primary_is_hedged_immediately():
+    primary = FakeProvider("primary", error=ProviderError("quota exhausted"))
+    secondary = FakeProvider("secondary")
+    hedged = HedgedProvider(primary, secondary, hedge_after=5.0)
+
+    started = time.perf_counter()
+    assert hedged.generate(messages()) == "secondary answer"
+    assert time.perf_counter() - started < 2.0
+
+
+def test_error_is_raised_when_both_providers_fail():
+    hedged = HedgedProvider(FakeProvider("primary", error=ProviderError("primary down")),
+                            FakeProvider("secondary", error=ProviderError("secondary down")), hedge_after=0.01)
+    with pytest.raises(ProviderError):
+        hedged.generate(messages())
+
+
+def test_shed_hedge_is_logged_and_the_primary_answers(monkeypatch, caplog):
+    def admit(provider, cost=1.0, max_wait=None):
+        if provider == "secondary":
+            raise RateLimitExceeded(provider, "global", 12.0)
+        return 0.0
+
+    monkeypatch.setattr(llm_providers, "admit", admit)
+    secondary = FakeProvider("secondary")
+    hedged = HedgedProvider(FakeProvider("primary", delay=0.2), secondary, hedge_after=0.01)
+
+    with caplog.at_level(logging.WARNING, logger="utils.llm_providers"):
+        assert hedged.generate(messages()) == "primary answer"
+    assert secondary.calls == 0
+    assert "Hedge to Secondary skipped" in caplog.text
+
+
+def test_winner_is_tracked_per_thread():
+    hedged = HedgedProvider(FakeProvider("primary", delay=0.3), FakeProvider("secondary"), hedge_after=0.05)
+    hedged.generate(messages())
+    other_thread = []
+    thread = threading.Thread(target=lambda: other_thread.append(hedged.served_by()))
+    thread.start()
+    thread.join()
+
+    assert hedged.served_by() == "Secondary"
+    # A thread that made no call is not told about another caller's winner
+    assert other_thread == ["Primary"]
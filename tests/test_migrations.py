@@ -0,0 +1,94 @@
+"""
+Migration Tests
+Upgrades a copy of the shipped baseline database and an empty one to the latest schema,
+and checks that re-running migrations changes nothing.
+"""
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from config.migrations import migrate, get_schema_version, LATEST_VERSION, MIGRATIONS
+
+BASELINE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resume_data.db")
+
+COUNTED_TABLES = ["resume_data", "resume_analysis", "resume_skills", "ai_analysis", "resume_signatures"]
+
+
+def table_counts(conn):
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in COUNTED_TABLES if table in tables}
+
+
+def columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    if not os.path.exists(BASELINE_DB):
+        pytest.skip("baseline resume_data.db is not present")
+    path = tmp_path / "resume_data.db"
+    shutil.copy(BASELINE_DB, path)
+    conn = sqlite3.connect(path)
+    yield conn
+    conn.close()
+
+
+def test_versions_are_consecutive():
+    assert [version for version, _, _ in MIGRATIONS] == list(range(1, LATEST_VERSION + 1))
+
+
+def test_baseline_upgrades_to_latest_without_losing_rows(baseline):
+    resumes_before = baseline.execute("SELECT COUNT(*) FROM resume_data").fetchone()[0]
+    assert get_schema_version(baseline) == 0
+
+    assert migrate(baseline) == LATEST_VERSION
+    assert get_schema_version(baseline) == LATEST_VERSION
+    assert baseline.execute("SELECT COUNT(*) FROM resume_data").fetchone()[0] == resumes_before
+    assert {"resume_text", "content_hash", "user_id", "content"} <= columns(baseline, "resume_data")
+    # Resumes without extracted text are still fingerprinted from their structured fields
+    unsigned = baseline.execute('''
+        SELECT COUNT(*) FROM resume_data
+        WHERE id NOT IN (SELECT resume_id FROM resume_signatures) AND TRIM(name) <> ''
+    ''').fetchone()[0]
+    assert unsigned == 0
+
+
+def test_migrating_again_is_a_no_op(baseline):
+    migrate(baseline)
+    counts = table_counts(baseline)
+    assert migrate(baseline) == LATEST_VERSION
+    assert table_counts(baseline) == counts
+
+
+@pytest.mark.parametrize("from_version", [0, 1, 3, 5, 7, 9])
+def test_rerunning_migrations_keeps_data_intact(baseline, from_version):
+    migrate(baseline)
+    counts = table_counts(baseline)
+    baseline.execute(f"PRAGMA user_version = {from_version}")
+    baseline.commit()
+
+    assert migrate(baseline) == LATEST_VERSION
+    assert table_counts(baseline) == counts
+
+
+def test_content_hash_allows_one_row_per_submission(baseline):
+    migrate(baseline)
+    for role in ("Data Scientist", "Backend Developer"):
+        baseline.execute(
+            "INSERT INTO resume_data (name, email, phone, target_role, content_hash) VALUES ('A', '', '', ?, 'h')",
+            (role,)
+        )
+    assert baseline.execute("SELECT COUNT(*) FROM resume_data WHERE content_hash = 'h'").fetchone()[0] == 2
+
+
+def test_empty_database_migrates(tmp_path):
+    conn = sqlite3.connect(tmp_path / "fresh.db")
+    try:
+        assert migrate(conn) == LATEST_VERSION
+        assert table_counts(conn)["resume_data"] == 0
+    finally:
+        conn.close()
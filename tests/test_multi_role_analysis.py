@@ -0,0 +1,102 @@
+"""
+Multi-Role Analysis Tests
+One resume analyzed against several roles concurrently, admitted as one batch, with a
+comparison sorted by score and per-role failures kept out of the best-fit pick.
+"""
+import json
+import re
+import threading
+import time
+
+import pytest
+
+from utils import ai_resume_analyzer
+from utils.ai_resume_analyzer import AIResumeAnalyzer
+from utils.llm_providers import LLMProvider
+
+SCORES = {"Data Engineer": 82, "Backend Developer": 74, "Product Manager": 55}
+ROLES = {
+    "Data Engineer": {"description": "Builds data pipelines", "required_skills": ["Python", "Spark"]},
+    "Backend Developer": {"description": "Builds APIs", "required_skills": ["Python", "PostgreSQL"]},
+    "Product Manager": None,
+}
+
+
+class RoleScoringLLM(LLMProvider):
+    """Scores the resume by the role named in the prompt and records every prompt"""
+    name = "fake"
+    display_name = "Fake LLM"
+
+    def __init__(self, delay=0.1, fail_role=None):
+        super().__init__("fake-model")
+        self.enabled = True
+        self.delay = delay
+        self.fail_role = fail_role
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def analyze(self, prompt, json_mode=False, admitted=False, **kwargs):
+        with self.lock:
+            self.prompts.append((prompt, admitted))
+        time.sleep(self.delay)
+        role = next(role for role in SCORES if role in prompt)
+        if role == self.fail_role:
+            raise RuntimeError("upstream timeout")
+        return json.dumps({
+            "resume_score": SCORES[role],
+            "ats": {"score": SCORES[role] - 10},
+            "skills": {"missing": [f"{role} tooling"]},
+            "strengths": ["Strong Python", "Clear impact", "Good structure", "Concise"],
+        })
+
+    def served_by(self):
+        return self.display_name
+
+
+@pytest.fixture
+def admissions(monkeypatch):
+    admitted = []
+    monkeypatch.setattr(ai_resume_analyzer, "admit", lambda key, cost=1.0, max_wait=None: admitted.append(cost))
+    return admitted
+
+
+def test_roles_are_compared_and_ranked(admissions):
+    llm = RoleScoringLLM()
+    started = time.perf_counter()
+    result = AIResumeAnalyzer().analyze_multiple_roles("Jane Doe\nSkills\nPython, SQL", ROLES, provider=llm)
+    elapsed = time.perf_counter() - started
+
+    assert [row["role"] for row in result["comparison"]] == ["Data Engineer", "Backend Developer", "Product Manager"]
+    assert result["best_role"] == "Data Engineer"
+    assert result["comparison"][0]["missing_skills"] == ["Data Engineer tooling"]
+    assert len(result["comparison"][0]["top_strengths"]) == 3
+    assert result["model_used"] == "Fake LLM"
+    # The roles ran concurrently under a single admission
+    assert elapsed < len(ROLES) * llm.delay
+    assert admissions == [3]
+    assert all(admitted for _, admitted in llm.prompts)
+
+
+def test_prompts_differ_only_after_the_resume(admissions):
+    llm = RoleScoringLLM(delay=0)
+    AIResumeAnalyzer().analyze_multiple_roles("Jane Doe\nSkills\nPython, SQL", ROLES, provider=llm)
+
+    prefixes = {prompt.split("Python, SQL")[0] for prompt, _ in llm.prompts}
+    assert len(prefixes) == 1
+    assert all(re.search(r"Python, SQL.*(Data Engineer|Backend Developer|Product Manager)", prompt, re.S)
+               for prompt, _ in llm.prompts)
+
+
+def test_failed_role_is_reported_but_not_picked(admissions):
+    llm = RoleScoringLLM(delay=0, fail_role="Data Engineer")
+    result = AIResumeAnalyzer().analyze_multiple_roles("Jane Doe\nSkills\nPython, SQL", ROLES, provider=llm)
+
+    failed = next(row for row in result["comparison"] if row["role"] == "Data Engineer")
+    assert "upstream timeout" in failed["error"]
+    assert result["best_role"] == "Backend Developer"
+
+
+def test_missing_input_is_rejected():
+    analyzer = AIResumeAnalyzer()
+    assert "error" in analyzer.analyze_multiple_roles("", ROLES, provider=RoleScoringLLM())
+    assert "error" in analyzer.analyze_multiple_roles("Jane Doe", {}, provider=RoleScoringLLM())
@@ -0,0 +1,126 @@
+"""
+OpenAI Enhancer Tests
+Section-level enhancement: sections are rewritten concurrently, admitted as one batch,
+stitched back in document order and cached per section.
+"""
+import threading
+import time
+
+import pytest
+
+from utils import openai_enhancer
+from utils.openai_enhancer import OpenAIEnhancer
+
+RESUME = """Jane Doe
+jane@example.com
+
+SUMMARY
+Backend engineer with six years of experience.
+
+EXPERIENCE
+Built payment APIs in Python.
+
+EDUCATION
+BSc Computer Science
+
+SKILLS
+Python, SQL, Docker
+"""
+
+
+class FakeProvider:
+    """Rewrites each section after a short delay and tracks how many calls overlap"""
+    name = "openai"
+    rate_key = "openai"
+    enabled = True
+
+    def __init__(self, delay=0.2, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.prompts = []
+        self.admitted = []
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def enhance(self, prompt, system=None, max_tokens=None, admitted=False):
+        with self.lock:
+            self.prompts.append(prompt)
+            self.admitted.append(admitted)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(self.delay)
+            section = prompt.split("Enhance this ")[1].split(" section")[0]
+            if section == self.fail_on:
+                raise RuntimeError("Error code: 429 - insufficient_quota")
+            return f"Enhanced {section}"
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def admissions(monkeypatch):
+    admitted = []
+    monkeypatch.setattr(openai_enhancer, "admit", lambda key, cost=1.0, max_wait=None: admitted.append(cost))
+    monkeypatch.setattr(openai_enhancer, "record_llm_call", lambda *args, **kwargs: None)
+    monkeypatch.setattr(openai_enhancer, "_SECTION_CACHE", openai_enhancer.OrderedDict())
+    return admitted
+
+
+def make_enhancer(provider):
+    enhancer = OpenAIEnhancer()
+    enhancer.provider = provider
+    enhancer.enabled = True
+    return enhancer
+
+
+def test_sections_are_enhanced_concurrently_in_order(admissions):
+    provider = FakeProvider()
+    started = time.perf_counter()
+    result = make_enhancer(provider).enhance_resume_sections(RESUME)
+    elapsed = time.perf_counter() - started
+
+    text = result["enhanced_text"]
+    assert text.index("Enhanced Summary") < text.index("Enhanced Experience") < text.index("Enhanced Skills")
+    # Sections outside the enhanced set pass through untouched
+    assert "Jane Doe" in text and "BSc Computer Science" in text
+    assert result["sections_enhanced"] == 3
+    assert provider.peak > 1 and elapsed < 3 * provider.delay
+    # One admission covers the whole fan-out and each call skips its own
+    assert admissions == [3]
+    assert all(provider.admitted)
+
+
+def test_only_edited_sections_are_requested_again(admissions):
+    provider = FakeProvider(delay=0)
+    enhancer = make_enhancer(provider)
+    enhancer.enhance_resume_sections(RESUME)
+    result = enhancer.enhance_resume_sections(RESUME.replace("Python, SQL, Docker", "Python, Go"))
+
+    assert len(provider.prompts) == 4
+    assert "Python, Go" in provider.prompts[-1]
+    assert result["cache_hits"] == 2
+    assert admissions == [3, 1]
+
+
+def test_failed_section_keeps_its_original_text(admissions):
+    result = make_enhancer(FakeProvider(delay=0, fail_on="Experience")).enhance_resume_sections(RESUME)
+
+    assert "Built payment APIs in Python." in result["enhanced_text"]
+    assert "Enhanced Summary" in result["enhanced_text"]
+    assert result["sections_enhanced"] == 2
+    assert "error" not in result
+
+
+def test_quota_error_on_every_section_is_reported(admissions):
+    def quota_exhausted(*args, **kwargs):
+        raise RuntimeError("Error code: 429 - insufficient_quota")
+
+    provider = FakeProvider(delay=0)
+    provider.enhance = quota_exhausted
+    result = make_enhancer(provider).enhance_resume_sections(RESUME)
+
+    assert result["error"] == "quota_exceeded"
+    assert result["enhanced_text"] == RESUME
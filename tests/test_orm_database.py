@@ -0,0 +1,71 @@
+"""
+ORM Database Tests
+The SQLAlchemy DatabaseManager writes the same rows as the app's saves: resumes get their
+skills and signature, and analyses carry the scores the dashboard rollups sum.
+"""
+import json
+import sqlite3
+
+import pytest
+
+from config.migrations import migrate
+from utils.database import DatabaseManager
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "resume_data.db")
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def manager(db_path):
+    manager = DatabaseManager(db_path)
+    yield manager
+    manager.close()
+
+
+def query(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def test_save_resume_goes_through_the_shared_insert(manager, db_path):
+    content = {'personal_info': {'full_name': 'Jane Doe'}, 'skills': ['Python', 'SQL'],
+               'resume_text': 'Jane Doe builds Python services'}
+    resume_id = manager.save_resume('user-1', 'Backend Developer', content)
+
+    assert query(db_path, 'SELECT user_id, target_role, content FROM resume_data WHERE id = ?', (resume_id,)) == [
+        ('user-1', 'Backend Developer', json.dumps(content))
+    ]
+    assert query(db_path, 'SELECT COUNT(*) FROM resume_skills WHERE resume_id = ?', (resume_id,)) == [(2,)]
+    assert query(db_path, 'SELECT COUNT(*) FROM resume_signatures WHERE resume_id = ?', (resume_id,)) == [(1,)]
+    assert manager.get_resume(resume_id).job_role == 'Backend Developer'
+
+
+@pytest.mark.parametrize("encode", [lambda data: data, json.dumps])
+def test_save_analysis_fills_the_score_columns(manager, db_path, encode):
+    resume_id = manager.save_resume('user-1', 'Backend Developer', 'plain text resume')
+    manager.save_analysis(resume_id, encode({'ats_score': 82, 'keyword_match_score': 64,
+                                             'format_score': 90, 'section_score': 75}))
+
+    assert query(db_path, '''
+        SELECT ats_score, keyword_match_score, format_score, section_score
+        FROM resume_analysis WHERE resume_id = ?
+    ''', (resume_id,)) == [(82.0, 64.0, 90.0, 75.0)]
+    # The rollup trigger sums the same scores the base table holds
+    assert query(db_path, 'SELECT SUM(analyses), SUM(ats_sum), SUM(high_scoring) FROM daily_analysis_stats') == [
+        (1, 82.0, 1)
+    ]
+
+
+def test_save_analysis_without_scores_stores_zero(manager, db_path):
+    resume_id = manager.save_resume('user-1', 'Backend Developer', 'plain text resume')
+    manager.save_analysis(resume_id, 'free-form notes')
+    assert query(db_path, 'SELECT ats_score, analysis_data FROM resume_analysis') == [(0.0, 'free-form notes')]
@@ -0,0 +1,125 @@
+"""
+Rate Limiter Tests
+Token refill and burst arithmetic of the SQLite token buckets, on a temporary database
+and a fake clock.
+"""
+import types
+
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import TokenBucketLimiter, RateLimitExceeded
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", types.SimpleNamespace(time=clock.time, sleep=clock.sleep))
+    return clock
+
+
+@pytest.fixture
+def limiter(tmp_path, monkeypatch, clock):
+    # 60 requests per minute (one token per second) with a burst of 10
+    monkeypatch.setenv("LLM_RATE_LIMIT", "1")
+    monkeypatch.setenv("LLM_GLOBAL_RPM", "60")
+    monkeypatch.setenv("LLM_GLOBAL_BURST", "10")
+    monkeypatch.setenv("LLM_SESSION_RPM", "6")
+    monkeypatch.setenv("LLM_SESSION_BURST", "2")
+    return TokenBucketLimiter(str(tmp_path / "rate.db"), max_wait=15)
+
+
+def tokens(limiter, key):
+    conn = limiter._connect()
+    try:
+        return conn.execute("SELECT tokens FROM rate_buckets WHERE key = ?", (key,)).fetchone()["tokens"]
+    finally:
+        conn.close()
+
+
+def test_burst_is_admitted_without_waiting(limiter, clock):
+    for _ in range(10):
+        assert limiter.acquire("gemini") == 0.0
+    assert clock.slept == []
+    assert tokens(limiter, "global:gemini") == pytest.approx(0.0)
+
+
+def test_request_past_the_burst_waits_for_refill(limiter, clock):
+    for _ in range(10):
+        limiter.acquire("gemini")
+    assert limiter.acquire("gemini") == pytest.approx(1.0)
+    assert clock.slept == [pytest.approx(1.0)]
+
+
+def test_tokens_refill_at_the_configured_rate_up_to_capacity(limiter, clock):
+    limiter.acquire("gemini", cost=10)
+    clock.now += 4
+    assert limiter.acquire("gemini", cost=4) == 0.0
+    clock.now += 3600
+    limiter.acquire("gemini", cost=0)
+    # Refill never exceeds the burst size
+    assert tokens(limiter, "global:gemini") == pytest.approx(10.0)
+
+
+def test_fan_out_cost_is_admitted_at_once(limiter, clock):
+    limiter.acquire("gemini", cost=6)
+    limiter.acquire("gemini", cost=4)
+    # The bucket is empty: a six-call fan-out waits six seconds, or is shed without a budget
+    with pytest.raises(RateLimitExceeded) as shed:
+        limiter.acquire("gemini", cost=6, max_wait=0)
+    assert shed.value.retry_after == pytest.approx(6.0)
+    assert shed.value.scope == "global"
+    assert limiter.acquire("gemini", cost=6) == pytest.approx(6.0)
+
+
+def test_shed_requests_consume_no_tokens(limiter, clock):
+    limiter.acquire("gemini", cost=10)
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire("gemini", cost=20, max_wait=5)
+    assert tokens(limiter, "global:gemini") == pytest.approx(0.0)
+    stats = {row["provider"]: row for row in limiter.get_stats()}
+    assert stats["gemini"]["shed"] == 1
+    assert stats["gemini"]["admitted"] == 1
+
+
+def test_request_larger_than_the_burst_is_admitted(limiter, clock):
+    # A 25-chunk analysis on an idle bucket of 10 runs at once and leaves the bucket in debt
+    assert limiter.acquire("gemini", cost=25) == 0.0
+    assert tokens(limiter, "global:gemini") == pytest.approx(-15.0)
+    # The next request waits for the debt to be repaid, here longer than max_wait allows
+    with pytest.raises(RateLimitExceeded) as shed:
+        limiter.acquire("gemini")
+    assert shed.value.retry_after == pytest.approx(16.0)
+    clock.now += 15
+    assert limiter.acquire("gemini", cost=25) == pytest.approx(10.0)
+
+
+def test_session_bucket_rejects_without_sleeping(limiter, clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "get_rate_limiter", lambda: limiter)
+    rate_limiter.admit_session("gemini", session_id="abc")
+    rate_limiter.admit_session("gemini", session_id="abc")
+    with pytest.raises(RateLimitExceeded) as shed:
+        rate_limiter.admit_session("gemini", session_id="abc")
+    assert shed.value.scope == "session"
+    assert shed.value.retry_after == pytest.approx(10.0)
+    assert clock.slept == []
+    # Other sessions have their own bucket
+    assert rate_limiter.admit_session("gemini", session_id="xyz") == 0.0
+
+
+def test_unlimited_providers_are_never_limited(limiter, clock):
+    for _ in range(50):
+        assert limiter.acquire("local") == 0.0
@@ -0,0 +1,75 @@
+"""
+Resume Browser Tests
+Keyset pages walk every resume exactly once, newest first, with filters applied in SQL
+and each resume joined to its latest analysis; counts are capped past a threshold.
+"""
+import pytest
+
+from config import database
+from config.database import save_resume_bundle, get_resume_page, count_resumes
+
+# Several resumes share a timestamp so the id tie-breaker is exercised
+CREATED_AT = ["2026-01-01 09:00:00", "2026-01-02 09:00:00", "2026-01-02 09:00:00",
+              "2026-01-02 09:00:00", "2026-01-03 09:00:00", "2026-01-04 09:00:00", "2026-01-04 09:00:00"]
+
+
+@pytest.fixture
+def resume_ids(resume_db):
+    ids = []
+    for i, created_at in enumerate(CREATED_AT):
+        role = "Data Engineer" if i % 2 else "Backend Developer"
+        resume_id = save_resume_bundle(
+            {"personal_info": {"full_name": f"Candidate {i}"}, "target_role": role, "target_category": "Engineering"},
+            analysis={"ats_score": 50 + i * 5})
+        ids.append(resume_id)
+        conn = database.get_database_connection()
+        conn.execute("UPDATE resume_data SET created_at = ? WHERE id = ?", (created_at, resume_id))
+        conn.commit()
+    return ids
+
+
+def all_pages(filters=None, page_size=3):
+    rows, after = [], None
+    while True:
+        page = get_resume_page(filters, after=after, page_size=page_size)
+        rows.extend(page["rows"])
+        if not page["has_more"]:
+            return rows
+        after = page["next_cursor"]
+
+
+def test_pages_cover_every_resume_once_newest_first(resume_ids):
+    rows = all_pages()
+    assert [row[0] for row in rows] == [resume_id for _, resume_id in sorted(zip(CREATED_AT, resume_ids), reverse=True)]
+
+
+def test_last_page_has_no_cursor(resume_ids):
+    page = get_resume_page(page_size=len(resume_ids))
+    assert len(page["rows"]) == len(resume_ids)
+    assert (page["has_more"], page["next_cursor"]) == (False, None)
+
+
+def test_filters_are_applied_before_paging(resume_ids):
+    rows = all_pages({"role": "Data Engineer"}, page_size=2)
+    assert [row[1] for row in rows] == ["Candidate 5", "Candidate 3", "Candidate 1"]
+
+    rows = all_pages({"min_score": 60, "date_to": "2026-01-02"}, page_size=2)
+    assert sorted(row[1] for row in rows) == ["Candidate 2", "Candidate 3"]
+
+
+def test_rows_show_the_latest_analysis(resume_ids):
+    conn = database.get_database_connection()
+    conn.execute(database.INSERT_ANALYSIS_SQL, (resume_ids[0], 99.0, 0, 0, 0, "", ""))
+    conn.commit()
+
+    rows = all_pages()
+    assert len(rows) == len(resume_ids)
+    assert next(row for row in rows if row[0] == resume_ids[0])[10] == 99
+
+
+def test_counts_are_capped(resume_ids, monkeypatch):
+    assert count_resumes() == {"count": 7, "exact": True}
+    assert count_resumes({"role": "Data Engineer"}) == {"count": 3, "exact": True}
+
+    monkeypatch.setattr(database, "COUNT_ESTIMATE_CAP", 2)
+    assert count_resumes({"category": "Engineering"}) == {"count": 2, "exact": False}
@@ -0,0 +1,66 @@
+"""
+Resume Bundle Tests
+A resume, its skills, analysis and AI analysis are saved together or not at all, and
+bulk imports commit once per batch.
+"""
+import sqlite3
+
+import pytest
+
+from config.database import save_resume_bundle, save_resume_bundles
+
+TABLES = ("resume_data", "resume_skills", "resume_analysis", "ai_analysis")
+
+
+def bundle(name, ats_score=75.0):
+    return {
+        "resume": {"personal_info": {"full_name": name, "email": f"{name.lower()}@example.com"},
+                   "skills": ["Python", "SQL"], "target_category": "Engineering"},
+        "analysis": {"ats_score": ats_score, "keyword_match_score": 60, "format_score": 80, "section_score": 70},
+        "ai_analysis": {"model_used": "Google Gemini", "resume_score": 81, "job_role": "Data Engineer"},
+    }
+
+
+def counts(db_path):
+    conn = sqlite3.connect(db_path)
+    result = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in TABLES}
+    conn.close()
+    return result
+
+
+def test_bundle_is_saved_together(resume_db):
+    data = bundle("Jane")
+    resume_id = save_resume_bundle(data["resume"], data["analysis"], data["ai_analysis"])
+
+    assert resume_id is not None
+    assert counts(resume_db) == {"resume_data": 1, "resume_skills": 2, "resume_analysis": 1, "ai_analysis": 1}
+    conn = sqlite3.connect(resume_db)
+    assert conn.execute("SELECT resume_id, ats_score FROM resume_analysis").fetchone() == (resume_id, 75.0)
+    conn.close()
+
+
+def test_failed_analysis_rolls_back_the_resume(resume_db):
+    data = bundle("Jane", ats_score="not a score")
+    assert save_resume_bundle(data["resume"], data["analysis"], data["ai_analysis"]) is None
+    assert counts(resume_db) == dict.fromkeys(TABLES, 0)
+
+
+def test_resume_alone_can_be_saved(resume_db):
+    assert save_resume_bundle(bundle("Jane")["resume"]) is not None
+    assert counts(resume_db) == {"resume_data": 1, "resume_skills": 2, "resume_analysis": 0, "ai_analysis": 0}
+
+
+def test_bulk_import_commits_each_batch(resume_db):
+    ids = save_resume_bundles([bundle(f"Candidate{i}") for i in range(5)], batch_size=2)
+
+    assert len(ids) == len(set(ids)) == 5
+    assert counts(resume_db) == {"resume_data": 5, "resume_skills": 10, "resume_analysis": 5, "ai_analysis": 5}
+
+
+def test_failing_batch_is_rolled_back_and_earlier_batches_kept(resume_db):
+    bundles = [bundle(f"Candidate{i}") for i in range(5)]
+    bundles[3] = bundle("Broken", ats_score="not a score")
+
+    ids = save_resume_bundles(bundles, batch_size=2)
+    assert len(ids) == 2
+    assert counts(resume_db) == {"resume_data": 2, "resume_skills": 4, "resume_analysis": 2, "ai_analysis": 2}
@@ -0,0 +1,71 @@
+"""
+Resume Skills Tests
+Skills from the builder, the analyzer or an old str(list) column are flattened into
+unique names, categorized and stored in resume_skills with the resume.
+"""
+import sqlite3
+
+import pytest
+
+from config import database
+from config.database import normalize_skills, categorize_skill, save_resume_data
+from config.migrations import _backfill_resume_skills
+
+
+@pytest.mark.parametrize("skills", [
+    {"technical": ["Python", "SQL"], "soft": ["Leadership"], "tools": "Docker"},
+    ["Python", "SQL", "Leadership", "Docker"],
+    "['Python', 'SQL', 'Leadership', 'Docker']",
+    "Python, SQL, Leadership, Docker",
+])
+def test_every_stored_shape_is_normalized(skills):
+    assert normalize_skills(skills) == ["Python", "SQL", "Leadership", "Docker"]
+
+
+def test_duplicates_and_blanks_are_dropped():
+    assert normalize_skills(["Python", "python ", "", "SQL, Python"]) == ["Python", "SQL"]
+    assert normalize_skills(None) == []
+    assert normalize_skills("[]") == []
+
+
+@pytest.mark.parametrize("name, category", [
+    ("Python", "Programming"),
+    ("PostgreSQL", "Database"),
+    ("AWS Lambda", "Cloud"),
+    ("Scrum", "Management"),
+    ("Figma", "Other"),
+])
+def test_skill_categories(name, category):
+    assert categorize_skill(name) == category
+
+
+def test_skills_are_saved_with_the_resume(resume_db):
+    resume_id = save_resume_data({
+        "personal_info": {"full_name": "Jane Doe"},
+        "skills": {"technical": ["Python", "MongoDB"], "soft": ["Agile"]},
+    })
+
+    conn = sqlite3.connect(resume_db)
+    rows = conn.execute(
+        "SELECT skill_name, skill_category FROM resume_skills WHERE resume_id = ? ORDER BY id", (resume_id,)
+    ).fetchall()
+    conn.close()
+    assert rows == [("Python", "Programming"), ("MongoDB", "Database"), ("Agile", "Management")]
+
+
+def test_backfill_only_fills_resumes_without_skills(resume_db):
+    conn = database.get_database_connection()
+    cursor = conn.cursor()
+    save_resume_data({"personal_info": {"full_name": "Already normalized"}, "skills": ["Python"]})
+    legacy_id = save_resume_data({"personal_info": {"full_name": "Legacy"}, "skills": ["Azure", "Java"]})
+    # A row saved before skills were normalized at write time
+    cursor.execute("DELETE FROM resume_skills WHERE resume_id = ?", (legacy_id,))
+    conn.commit()
+
+    _backfill_resume_skills(cursor)
+    conn.commit()
+
+    assert cursor.execute("SELECT COUNT(*) FROM resume_skills").fetchone()[0] == 3
+    assert cursor.execute(
+        "SELECT skill_name FROM resume_skills WHERE resume_id = ? ORDER BY id", (legacy_id,)
+    ).fetchall() == [("Azure",), ("Java",)]
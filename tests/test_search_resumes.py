@@ -0,0 +1,77 @@
+"""
+Resume Search Tests
+Full-text search ranks skill and role matches first, accepts FTS5 syntax, retries
+unparseable input as plain terms and falls back to LIKE scans without FTS5.
+"""
+import pytest
+
+from config import database
+from config.database import save_resume_bundle, search_resumes
+
+
+def resume(name, role, skills, summary, resume_text="", category="Engineering"):
+    return {
+        "personal_info": {"full_name": name, "email": f"{name.split()[0].lower()}@example.com"},
+        "target_role": role,
+        "target_category": category,
+        "summary": summary,
+        "skills": skills,
+        "resume_text": resume_text,
+    }
+
+
+@pytest.fixture
+def resumes(resume_db):
+    return {
+        "platform": save_resume_bundle(
+            resume("Ada Platform", "DevOps Engineer", ["Kubernetes", "Terraform"], "Runs clusters for a fintech startup"),
+            analysis={"ats_score": 88}),
+        "analyst": save_resume_bundle(
+            resume("Ben Analyst", "Data Analyst", ["SQL", "Tableau"], "Reporting for retail banks",
+                   resume_text="Evaluated Kubernetes once during a proof of concept", category="Data"),
+            analysis={"ats_score": 61}),
+        "developer": save_resume_bundle(
+            resume("Cy Developer", "Backend Developer", ["C++", "Python"], "Low latency trading systems in fintech")),
+    }
+
+
+def names(result):
+    return [row[1] for row in result["rows"]]
+
+
+def test_skill_matches_rank_above_mentions_in_the_text(resumes):
+    result = search_resumes("kubernetes")
+    assert names(result) == ["Ada Platform", "Ben Analyst"]
+    assert "**Kubernetes**" in result["rows"][0][7]
+    assert result["rows"][0][6] == 88
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("kubernetes AND fintech", ["Ada Platform"]),
+    ("fintech NOT kubernetes", ["Cy Developer"]),
+    ('"retail banks"', ["Ben Analyst"]),
+    ("terra*", ["Ada Platform"]),
+])
+def test_fts5_query_syntax(resumes, query, expected):
+    assert names(search_resumes(query)) == expected
+
+
+def test_unparseable_input_is_searched_as_terms(resumes):
+    assert names(search_resumes("c++")) == ["Cy Developer"]
+    assert "error" not in search_resumes('"unbalanced quote')
+
+
+def test_filters_and_limit_apply_to_matches(resumes):
+    assert names(search_resumes("kubernetes", filters={"category": "Data"})) == ["Ben Analyst"]
+    assert names(search_resumes("kubernetes", filters={"min_score": 70})) == ["Ada Platform"]
+    assert len(search_resumes("fintech", limit=1)["rows"]) == 1
+    assert search_resumes("   ") == {"rows": []}
+
+
+def test_like_fallback_without_the_fts_table(resumes):
+    conn = database.get_database_connection()
+    conn.execute("DROP TABLE resume_fts")
+    conn.commit()
+
+    assert sorted(names(search_resumes("Kubernetes"))) == ["Ada Platform", "Ben Analyst"]
+    assert names(search_resumes("fintech trading")) == ["Cy Developer"]
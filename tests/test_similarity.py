@@ -0,0 +1,118 @@
+"""
+Similarity Tests
+MinHash estimates and LSH recall of near-duplicate resumes, with the index kept in a
+temporary directory.
+"""
+import random
+import sqlite3
+
+import numpy as np
+import pytest
+
+from config import similarity
+from config.similarity import (
+    LSHIndex, minhash, pack_signature, unpack_signature, estimate_similarity, shingles, signature_text
+)
+
+VOCABULARY = [f"word{i}" for i in range(2000)]
+
+
+def random_resume(rng, words=300):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def near_duplicate(rng, text, changes=10):
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    return " ".join(words)
+
+
+def jaccard(a, b):
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def signatures_db(path, texts):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE resume_signatures (resume_id INTEGER PRIMARY KEY, signature BLOB NOT NULL)")
+    conn.executemany(
+        "INSERT INTO resume_signatures (resume_id, signature) VALUES (?, ?)",
+        [(resume_id, pack_signature(minhash(text))) for resume_id, text in texts.items()]
+    )
+    conn.commit()
+    return conn
+
+
+def test_signature_round_trips_and_is_deterministic():
+    signature = minhash("python developer with ten years of backend experience")
+    assert signature.shape == (similarity.NUM_PERM,)
+    assert np.array_equal(unpack_signature(pack_signature(signature)), signature)
+    assert np.array_equal(minhash("python developer with ten years of backend experience"), signature)
+
+
+def test_empty_text_has_no_signature():
+    assert minhash("") is None
+    assert minhash("  \n ") is None
+
+
+def test_structured_fields_are_used_without_text():
+    assert signature_text("extracted text", summary="ignored") == "extracted text"
+    assert signature_text(None, name="Jane Doe", email="jane@example.com") == "Jane Doe jane@example.com"
+
+
+def test_estimate_tracks_jaccard_similarity():
+    rng = random.Random(7)
+    base = random_resume(rng)
+    for changes in (5, 20, 60):
+        other = near_duplicate(rng, base, changes)
+        estimate = estimate_similarity(minhash(base), [minhash(other)])[0]
+        assert estimate == pytest.approx(jaccard(base, other), abs=0.12)
+
+
+def test_lsh_finds_near_duplicates(tmp_path):
+    rng = random.Random(11)
+    originals = {resume_id: random_resume(rng) for resume_id in range(1, 201)}
+    duplicates = {resume_id + 1000: near_duplicate(rng, text) for resume_id, text in originals.items()}
+    conn = signatures_db(tmp_path / "resumes.db", {**originals, **duplicates})
+
+    index = LSHIndex(str(tmp_path / "resumes_lsh.npy"))
+    index.refresh(conn)
+    assert len(index) == 400
+
+    found = sum(resume_id + 1000 in index.candidates(minhash(text)) for resume_id, text in originals.items())
+    assert found / len(originals) >= 0.95
+    # Unrelated resumes share almost no buckets
+    unrelated = index.candidates(minhash(random_resume(rng)))
+    assert len(unrelated) < 20
+
+
+def test_merged_index_file_serves_the_same_candidates(tmp_path, monkeypatch):
+    monkeypatch.setattr(similarity, "LSH_MERGE_ROWS", 10)
+    rng = random.Random(3)
+    texts = {resume_id: random_resume(rng) for resume_id in range(1, 51)}
+    conn = signatures_db(tmp_path / "resumes.db", texts)
+    path = tmp_path / "resumes_lsh.npy"
+
+    index = LSHIndex(str(path))
+    index.refresh(conn)
+    assert path.exists()
+
+    # A fresh process maps the file instead of rebuilding it
+    reopened = LSHIndex(str(path))
+    reopened.refresh(conn)
+    assert reopened.watermark == 50
+    assert 17 in reopened.candidates(minhash(texts[17]))
+
+
+def test_signature_added_below_the_watermark_is_searchable(tmp_path):
+    rng = random.Random(5)
+    texts = {resume_id: random_resume(rng) for resume_id in range(1, 21)}
+    late = texts.pop(4)
+    conn = signatures_db(tmp_path / "resumes.db", texts)
+
+    index = LSHIndex(str(tmp_path / "resumes_lsh.npy"))
+    index.refresh(conn)
+    assert 4 not in index.candidates(minhash(late))
+    index.add(4, minhash(late))
+    assert 4 in index.candidates(minhash(near_duplicate(rng, late, 3)))
@@ -0,0 +1,131 @@
+"""
+Single-Flight Tests
+Coalescing of concurrent identical calls and the keys that decide what is identical.
+"""
+import threading
+
+import pytest
+
+from utils.single_flight import SingleFlight, single_flight, _default_key
+
+
+def run_concurrently(fn, args_list):
+    results = [None] * len(args_list)
+    errors = [None] * len(args_list)
+
+    def target(i, args):
+        try:
+            results[i] = fn(*args)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=target, args=(i, args)) for i, args in enumerate(args_list)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+
+def blocking_function(group, release, calls):
+    @single_flight(group=group)
+    def fetch(key):
+        calls.append(key)
+        release.wait(5)
+        return {"key": key, "items": [1, 2]}
+    return fetch
+
+
+def wait_for_waiters(group, count):
+    # Waiters register under the group's lock before blocking on the leader
+    for _ in range(500):
+        with group._lock:
+            if sum(call.waiters for call in group._calls.values()) >= count:
+                return
+        threading.Event().wait(0.01)
+    raise AssertionError("waiters never joined the in-flight call")
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    group, release, calls = SingleFlight(), threading.Event(), []
+    fetch = blocking_function(group, release, calls)
+
+    threading.Timer(0, lambda: (wait_for_waiters(group, 4), release.set())).start()
+    results, errors = run_concurrently(fetch, [("a",)] * 5)
+
+    assert calls == ["a"]
+    assert errors == [None] * 5
+    assert all(result == {"key": "a", "items": [1, 2]} for result in results)
+    assert group.coalesced == 4
+    # Every caller gets its own copy of the shared result
+    assert len({id(result) for result in results}) == 5
+
+
+def test_different_arguments_are_not_coalesced():
+    group, release, calls = SingleFlight(), threading.Event(), []
+    fetch = blocking_function(group, release, calls)
+    release.set()
+
+    run_concurrently(fetch, [("a",), ("b",)])
+
+    assert sorted(calls) == ["a", "b"]
+    assert group.coalesced == 0
+
+
+def test_error_is_raised_in_every_waiter_and_the_key_is_released():
+    group, release = SingleFlight(), threading.Event()
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        release.wait(5)
+        raise ValueError("provider down")
+
+    threading.Timer(0, lambda: (wait_for_waiters(group, 2), release.set())).start()
+    _, errors = run_concurrently(lambda: group.do("k", failing), [()] * 3)
+
+    assert len(attempts) == 1
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert group.do("k", lambda: "retried") == "retried"
+
+
+def test_method_key_ignores_the_instance():
+    class Analyzer:
+        def analyze(self, text):
+            return text
+
+    key_a = _default_key(Analyzer.analyze, (Analyzer(), "resume"), {}, method=True)
+    key_b = _default_key(Analyzer.analyze, (Analyzer(), "resume"), {}, method=True)
+    assert key_a == key_b
+    assert key_a != _default_key(Analyzer.analyze, (Analyzer(), "other"), {}, method=True)
+
+
+def test_function_key_keeps_the_first_argument():
+    def score(first, second):
+        return first + second
+
+    assert _default_key(score, (1, 2), {}) != _default_key(score, (3, 2), {})
+
+
+@pytest.mark.parametrize("method, expected", [(None, True), (False, False)])
+def test_decorator_detects_methods_by_their_self_parameter(method, expected):
+    group = SingleFlight()
+    seen = []
+
+    class Parser:
+        @single_flight(group=group, method=method)
+        def parse(self, text):
+            return text
+
+    original = group.do
+
+    def recording_do(key, fn, *args, **kwargs):
+        seen.append(key)
+        return original(key, fn, *args, **kwargs)
+
+    group.do = recording_do
+    # Both instances stay alive so they cannot share an address (and repr)
+    parsers = [Parser(), Parser()]
+    for parser in parsers:
+        parser.parse("same")
+    assert (seen[0] == seen[1]) is expected
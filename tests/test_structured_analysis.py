@@ -0,0 +1,128 @@
+"""
+Structured Analysis Tests
+Parsing and validating JSON analyses, rendering them as the markdown report, and the
+single-pass markdown parser used when a response does not validate.
+"""
+import json
+
+import pytest
+
+from utils.ai_resume_analyzer import (
+    AIResumeAnalyzer, load_json_object, parse_markdown_sections, find_section, bullet_items, split_skill_groups
+)
+
+MARKDOWN_REPORT = """## Overall Assessment
+Solid backend profile.
+
+## Skills Analysis
+- **Current Skills**: Python, SQL
+- **Missing Skills**:
+- Kubernetes
+- Terraform
+
+## Key Strengths
+- **Clear** impact statements
+- Strong SQL
+
+## Areas for Improvement
+* Add metrics
+
+## ATS Optimization Assessment
+ATS Score: 72/100
+
+## Recommended Courses/Certifications
+- AWS Solutions Architect
+
+## Resume Score
+Resume Score: 81/100
+"""
+
+
+class FakeLLM:
+    """Returns a canned response and remembers whether JSON mode was requested"""
+
+    def __init__(self, response):
+        self.response = response
+        self.json_mode = None
+
+    def analyze(self, prompt, json_mode=False, admitted=False):
+        self.json_mode = json_mode
+        return self.response
+
+    def served_by(self):
+        return "Fake"
+
+
+@pytest.fixture
+def analyzer():
+    return AIResumeAnalyzer()
+
+
+def test_json_object_tolerates_code_fences():
+    assert load_json_object('```json\n{"resume_score": 80}\n```') == {"resume_score": 80}
+    with pytest.raises(ValueError):
+        load_json_object("[1, 2]")
+    with pytest.raises(ValueError):
+        load_json_object("Resume Score: 80/100")
+
+
+def test_structured_analysis_is_coerced_in_one_pass(analyzer):
+    data = analyzer._parse_structured_analysis(json.dumps({
+        "resume_score": "85",
+        "ats": {"score": 140, "recommendations": "Use standard headings"},
+        "skills": {"current": ["Python", " "], "missing": ["**Kubernetes**"]},
+        "strengths": ["Clear impact"],
+    }))
+    assert data["resume_score"] == 85
+    assert data["ats"] == {"score": 100, "recommendations": ["Use standard headings"]}
+    assert data["skills"]["current"] == ["Python"]
+    assert data["skills"]["missing"] == ["Kubernetes"]
+    assert data["improvements"] == []
+
+    with pytest.raises(ValueError):
+        analyzer._parse_structured_analysis('{"overall_assessment": "no score"}')
+
+
+def test_rendered_report_parses_back_to_the_same_scores(analyzer):
+    data = analyzer._parse_structured_analysis(json.dumps({
+        "resume_score": 77, "ats": {"score": 64}, "strengths": ["Strong SQL"], "improvements": ["Add metrics"]
+    }))
+    report = analyzer._structured_to_markdown(data)
+    assert analyzer._extract_score_from_text(report) == 77
+    assert analyzer._extract_ats_score_from_text(report) == 64
+    assert analyzer._sections_to_lists(report)["strengths"] == ["Strong SQL"]
+    # Empty sections are left out of the report
+    assert "## Education Analysis" not in report
+
+
+def test_markdown_sections_are_split_once():
+    sections = parse_markdown_sections(MARKDOWN_REPORT)
+    assert list(sections)[:2] == ["Overall Assessment", "Skills Analysis"]
+    assert bullet_items(find_section(sections, "Key Strengths")) == ["Clear impact statements", "Strong SQL"]
+    assert bullet_items(find_section(sections, "Areas for Improvement")) == ["Add metrics"]
+    assert split_skill_groups(find_section(sections, "Skills Analysis")) == {
+        "current": ["Python", "SQL"], "proficiency": [], "missing": ["Kubernetes", "Terraform"]
+    }
+    assert parse_markdown_sections("") == {}
+
+
+def test_structured_response_fills_the_result(analyzer):
+    llm = FakeLLM(json.dumps({"resume_score": 90, "ats": {"score": 70}, "strengths": ["Leadership"],
+                              "improvements": ["Quantify results"], "recommended_courses": ["CKA"]}))
+    result = analyzer._run_analysis(llm, "resume text", structured=True)
+
+    assert llm.json_mode is True
+    assert (result["resume_score"], result["ats_score"]) == (90, 70)
+    assert result["weaknesses"] == ["Quantify results"]
+    assert result["structured"]["recommended_courses"] == ["CKA"]
+    assert "## Key Strengths\n- Leadership" in result["analysis"]
+    assert result["model_used"] == "Fake"
+
+
+def test_invalid_json_falls_back_to_markdown_parsing(analyzer):
+    result = analyzer._run_analysis(FakeLLM(MARKDOWN_REPORT), "resume text", structured=True)
+
+    assert result["structured"] is None
+    assert (result["resume_score"], result["ats_score"]) == (81, 72)
+    assert result["suggestions"] == ["AWS Solutions Architect"]
+    assert result["analysis"] == MARKDOWN_REPORT
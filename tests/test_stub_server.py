@@ -0,0 +1,100 @@
+"""
+Stand-in Server Tests
+The local Gemini, OpenAI and APILayer stand-ins answer in each API's shape, stream,
+inject errors and count requests.
+"""
+import json
+import threading
+
+import pytest
+import requests
+
+from stub_server import StubConfig, serve
+
+
+@pytest.fixture
+def start_server():
+    servers = []
+
+    def start(**options):
+        server = serve(port=0, config=StubConfig(**options))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_gemini_json_mode_returns_a_structured_analysis(start_server):
+    url = start_server()
+    response = requests.post(f"{url}/v1beta/models/gemini-2.0-flash:generateContent", json={
+        "contents": [{"parts": [{"text": 'Return JSON with "resume_score". Resume: Python and SQL developer'}]}],
+        "generationConfig": {"responseMimeType": "application/json"},
+    }, timeout=5)
+
+    candidate = response.json()["candidates"][0]
+    analysis = json.loads(candidate["content"]["parts"][0]["text"])
+    assert candidate["finishReason"] == "STOP"
+    assert 40 <= analysis["resume_score"] <= 92
+    assert analysis["skills"]["current"] == ["Python", "SQL"]
+    assert response.json()["usageMetadata"]["totalTokenCount"] > 0
+
+
+def test_openai_markdown_report_and_usage(start_server):
+    url = start_server()
+    response = requests.post(f"{url}/v1/chat/completions", json={
+        "model": "gpt-3.5-turbo",
+        "messages": [{"role": "user", "content": "## Resume Score\nResume: Docker and AWS engineer"}],
+    }, timeout=5).json()
+
+    text = response["choices"][0]["message"]["content"]
+    assert "Resume Score:" in text and "ATS Score:" in text
+    assert response["model"] == "gpt-3.5-turbo"
+    assert response["usage"]["total_tokens"] == (response["usage"]["prompt_tokens"]
+                                                  + response["usage"]["completion_tokens"])
+
+
+def test_openai_stream_is_sent_as_server_sent_events(start_server):
+    url = start_server(stream_chunk_chars=10, stream_delay_ms=0)
+    response = requests.post(f"{url}/v1/chat/completions", json={
+        "messages": [{"role": "user", "content": "How should I improve my resume?"}], "stream": True,
+    }, timeout=5)
+
+    events = [line[len("data: "):] for line in response.text.split("\n") if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(event)["choices"][0]["delta"].get("content", "") for event in events[:-1]]
+    assert len(chunks) > 2
+    assert "".join(chunks).startswith("Stand-in reply")
+
+
+def test_injected_errors_are_counted(start_server):
+    url = start_server(error_rate=1.0, error_codes=[429], seed=1)
+    response = requests.post(f"{url}/v1/chat/completions",
+                             json={"messages": [{"role": "user", "content": "hi"}]}, timeout=5)
+
+    assert response.status_code == 429
+    assert response.json()["error"]["code"] == "insufficient_quota"
+    assert requests.get(f"{url}/stats", timeout=5).json()["openai"] == {
+        "requests": 1, "errors": 1, "total_seconds": pytest.approx(0, abs=1)
+    }
+    requests.post(f"{url}/stats/reset", timeout=5)
+    assert requests.get(f"{url}/stats", timeout=5).json() == {}
+
+
+def test_apilayer_upload_is_parsed(start_server):
+    url = start_server()
+    resume = b"Jane Doe\nData engineer\njane@example.com\nAcme Corp 2019 - 2023\nBSc Computer Science, State University"
+    response = requests.post(f"{url}/resume_parser/upload", files={"file": ("resume.txt", resume)}, timeout=5).json()
+
+    assert response["name"] == "Jane Doe"
+    assert response["email"] == "jane@example.com"
+    assert response["experience"] == [{"title": "Acme Corp 2019 - 2023"}]
+    assert len(response["education"]) == 1
+
+
+def test_latency_includes_generation_time():
+    config = StubConfig(latency_ms=100, tokens_per_second=100)
+    assert config.delay("x" * 400) == pytest.approx(1.1)
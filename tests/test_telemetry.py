@@ -0,0 +1,91 @@
+"""
+Telemetry Tests
+Provider calls are recorded with tokens, retries and outcome, buffered in memory and
+written to the llm_calls table in one batch.
+"""
+import pytest
+
+from config import database
+from utils import llm_providers
+from utils.llm_providers import LLMProvider, ProviderError
+from utils.telemetry import TelemetryRecorder, estimate_cost
+
+
+class FlakyProvider(LLMProvider):
+    """Fails with the given errors in turn, then answers"""
+    name = "flaky"
+    display_name = "Flaky"
+
+    def __init__(self, *errors):
+        super().__init__("gpt-3.5-turbo")
+        self.enabled = True
+        self.errors = list(errors)
+        self.calls = 0
+
+    def complete(self, messages, temperature=0.7, max_tokens=None, json_mode=False):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "x" * 40
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    monkeypatch.setenv("LLM_TELEMETRY", "1")
+    recorder = TelemetryRecorder(flush_interval=3600, batch_size=1000)
+    monkeypatch.setattr(llm_providers, "record_llm_call", recorder.record)
+    monkeypatch.setattr(llm_providers, "admit", lambda key, cost=1.0, max_wait=None: 0.0)
+    monkeypatch.setattr(llm_providers.time, "sleep", lambda seconds: None)
+    return recorder
+
+
+def test_cost_uses_the_model_price():
+    assert estimate_cost("gpt-3.5-turbo", 1_000_000, 1_000_000) == pytest.approx(2.0)
+    assert estimate_cost("unknown-model", 5000, 5000) == 0.0
+
+
+def test_transient_errors_are_retried_and_counted(recorder):
+    provider = FlakyProvider(RuntimeError("503 overloaded"), RuntimeError("Request timed out"))
+    assert provider.generate([{"role": "user", "content": "y" * 400}], operation="analyze") == "x" * 40
+
+    [entry] = recorder._buffer
+    assert provider.calls == 3
+    assert (entry["provider"], entry["operation"], entry["retries"], entry["success"]) == ("flaky", "analyze", 2, 1)
+    # Token counts are estimated when the vendor reports no usage
+    assert (entry["prompt_tokens"], entry["completion_tokens"]) == (100, 10)
+    assert entry["cost_usd"] == pytest.approx(estimate_cost("gpt-3.5-turbo", 100, 10))
+
+
+def test_permanent_errors_are_recorded_as_failures(recorder):
+    provider = FlakyProvider(ProviderError("insufficient_quota"))
+    with pytest.raises(ProviderError):
+        provider.generate([{"role": "user", "content": "hello"}])
+
+    [entry] = recorder._buffer
+    assert provider.calls == 1
+    assert (entry["success"], entry["retries"], entry["error"]) == (0, 0, "insufficient_quota")
+
+
+def test_flush_writes_one_batch(recorder, resume_db):
+    recorder.record("gemini", "gemini-2.5-flash", "analyze", 812.34, prompt_tokens=900, completion_tokens=300)
+    recorder.record("openai", "gpt-3.5-turbo", "enhance", 0.0, cache_hit=True)
+
+    assert recorder.flush() == 2
+    assert recorder.flush() == 0
+    rows = database.get_llm_calls(days=1)
+    assert [(row[0], row[3], row[8]) for row in rows] == [("gemini", 812.3, 0), ("openai", 0.0, 1)]
+
+
+def test_failed_flush_keeps_the_records(recorder, monkeypatch):
+    monkeypatch.setattr(database, "save_llm_calls", lambda records: False)
+    recorder.record("gemini", "gemini-2.5-flash", "analyze", 10.0)
+
+    assert recorder.flush() == 0
+    assert len(recorder._buffer) == 1
+
+
+def test_disabled_recorder_drops_records(monkeypatch):
+    monkeypatch.setenv("LLM_TELEMETRY", "0")
+    recorder = TelemetryRecorder()
+    recorder.record("gemini", "gemini-2.5-flash", "analyze", 10.0)
+    assert recorder._buffer == []
@@ -0,0 +1,76 @@
+"""
+Text Compactor Tests
+Budget fitting and section chunking of resume text.
+"""
+from utils.text_compactor import (
+    estimate_tokens, compact_resume_text, split_sections, fit_to_budget, chunk_text, chunk_sections
+)
+
+
+def make_resume(experience_lines=40, interest_lines=20):
+    lines = ["Jane Doe", "jane@example.com", "", "Summary", "Backend engineer who ships reliable services.", ""]
+    lines.append("Experience")
+    lines += [f"- Built service {i} handling {i * 100} requests per second" for i in range(experience_lines)]
+    lines += ["", "Skills", "Python, SQL, Docker, Kubernetes", "", "Interests"]
+    lines += [f"Hobby number {i} with a long description of weekend plans" for i in range(interest_lines)]
+    return "\n".join(lines)
+
+
+def test_compaction_removes_page_markers_and_blank_runs():
+    text = "Jane Doe\n\n\n\nPage 1 of 2\nSummary\nEngineer\n\n\n\nExperience\n- Did things"
+    compacted = compact_resume_text(text)
+    assert "Page 1 of 2" not in compacted
+    assert "\n\n\n" not in compacted
+    assert "Engineer" in compacted
+
+
+def test_split_sections_keeps_headings_and_order():
+    sections = split_sections(make_resume(2, 2))
+    assert [name for name, _ in sections] == ['header', 'summary', 'experience', 'skills', 'interests']
+    assert sections[2][1].startswith("Experience")
+
+
+def test_text_within_budget_is_unchanged():
+    text = make_resume(2, 2)
+    assert fit_to_budget(text, estimate_tokens(text)) == text
+
+
+def test_fit_to_budget_drops_low_value_sections_first():
+    text = make_resume()
+    budget = estimate_tokens(text) - 100
+    fitted = fit_to_budget(text, budget)
+    assert estimate_tokens(fitted) <= budget
+    assert "Interests" not in fitted
+    assert "Experience" in fitted and "Skills" in fitted
+
+
+def test_fit_to_budget_truncates_high_value_sections_from_the_end():
+    text = make_resume(experience_lines=200, interest_lines=0)
+    budget = 400
+    fitted = fit_to_budget(text, budget)
+    assert estimate_tokens(fitted) <= budget
+    assert "Built service 0 " in fitted
+    assert "Built service 199 " not in fitted
+
+
+def test_chunk_text_respects_budget_and_keeps_every_line():
+    text = "\n".join(f"line {i} " + "x" * 30 for i in range(100))
+    chunks = chunk_text(text, 50)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+    assert "\n".join(chunks).split("\n") == text.split("\n")
+
+
+def test_chunk_text_cuts_overlong_lines():
+    chunks = chunk_text("y" * 1000, 10)
+    assert chunks == ["y" * 40]
+
+
+def test_chunk_sections_groups_small_sections_and_splits_large_ones():
+    text = make_resume(experience_lines=120, interest_lines=2)
+    chunks = chunk_sections(text, 300)
+    assert all(estimate_tokens(body) <= 300 + len(names) for names, body in chunks)
+    # The small leading sections share a chunk, the long experience section spans several
+    assert chunks[0][0][:2] == ['header', 'summary']
+    assert sum('experience' in names for names, _ in chunks) > 1
+    assert chunks[-1][0][-1] == 'interests'
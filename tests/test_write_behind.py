@@ -0,0 +1,108 @@
+"""
+Write-Behind Queue Tests
+Queued inserts are committed by the background writer in grouped transactions; a bad
+row is retried alone, a full queue writes synchronously and sync mode commits at once.
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from config import database
+from config.database import queue_write, INSERT_ANALYSIS_SQL
+from config.write_behind import WriteBehindQueue, get_write_queue
+
+INSERT_EVENT = "INSERT INTO events (name) VALUES (?)"
+
+
+class CountingConnect:
+    """Opens a connection per thread and database, counting commits"""
+
+    def __init__(self):
+        self.commits = 0
+        self._local = threading.local()
+
+    def __call__(self, db_path):
+        connections = self._local.__dict__.setdefault("connections", {})
+        if db_path not in connections:
+            connections[db_path] = self.Connection(self, db_path)
+        return connections[db_path]
+
+    class Connection(sqlite3.Connection):
+        def __init__(self, owner, db_path):
+            super().__init__(db_path)
+            self.owner = owner
+
+        def commit(self):
+            self.owner.commits += 1
+            super().commit()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "events.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE events (name TEXT NOT NULL)")
+    conn.close()
+    return path
+
+
+def event_names(db_path):
+    conn = sqlite3.connect(db_path)
+    names = [row[0] for row in conn.execute("SELECT name FROM events ORDER BY rowid")]
+    conn.close()
+    return names
+
+
+def test_queued_writes_are_committed_in_groups(db_path):
+    connect = CountingConnect()
+    writes = WriteBehindQueue(connect, mode="async", linger=0.2)
+    for i in range(50):
+        writes.submit(db_path, INSERT_EVENT, (f"event {i}",))
+
+    assert writes.flush()
+    assert event_names(db_path) == [f"event {i}" for i in range(50)]
+    assert writes.written == 50
+    assert connect.commits < 50
+
+
+def test_a_bad_row_does_not_lose_the_group(db_path):
+    writes = WriteBehindQueue(CountingConnect(), mode="async", linger=0.2)
+    writes.submit(db_path, INSERT_EVENT, ("first",))
+    writes.submit(db_path, INSERT_EVENT, (None,), label="broken event")
+    writes.submit(db_path, INSERT_EVENT, ("third",))
+
+    assert writes.flush()
+    assert event_names(db_path) == ["first", "third"]
+    assert (writes.written, writes.failed) == (2, 1)
+
+
+def test_full_queue_writes_synchronously(db_path, monkeypatch):
+    writes = WriteBehindQueue(CountingConnect(), mode="async", max_size=1)
+    # Keep the writer from draining so the queue stays full
+    monkeypatch.setattr(writes, "_ensure_thread", lambda: None)
+    writes.submit(db_path, INSERT_EVENT, ("queued",))
+    writes.submit(db_path, INSERT_EVENT, ("overflow",))
+
+    assert event_names(db_path) == ["overflow"]
+    assert writes.overflowed == 1
+    assert writes.pending() == 1
+    # With no writer thread, flush drains on the caller
+    assert writes.flush()
+    assert event_names(db_path) == ["overflow", "queued"]
+
+
+def test_sync_mode_commits_before_returning(db_path):
+    writes = WriteBehindQueue(CountingConnect(), mode="sync")
+    writes.submit(db_path, INSERT_EVENT, ("immediate",))
+    assert event_names(db_path) == ["immediate"]
+    assert writes.pending() == 0
+
+
+def test_queue_write_reaches_the_resume_database(resume_db):
+    queue_write(INSERT_ANALYSIS_SQL, (7, 82.0, 60.0, 80.0, 70.0, "", ""), "analysis data", db_path=database.DB_PATH)
+    assert get_write_queue().flush()
+
+    conn = sqlite3.connect(resume_db)
+    assert conn.execute("SELECT resume_id, ats_score FROM resume_analysis").fetchall() == [(7, 82.0)]
+    conn.close()
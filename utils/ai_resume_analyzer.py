@@ -1,7 +1,5 @@
 import os
-import streamlit as st
 from dotenv import load_dotenv
-import google.generativeai as genai
 import pdfplumber
 from pdf2image import convert_from_path
 import pytesseract
@@ -10,23 +8,190 @@ import requests
 import json
 import math
 import re
+from .llm_providers import LLMProvider, GeminiProvider, ProviderError, get_provider, MODEL_CHOICES
+from .rate_limiter import admit, RateLimitExceeded
+from .text_compactor import prepare_resume_text, compact_prompt, estimate_tokens, fit_to_budget, chunk_sections
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+
+
+# JSON shape requested from the model in structured analysis mode
+ANALYSIS_JSON_SCHEMA = {
+    "overall_assessment": "string",
+    "professional_profile": "string",
+    "skills": {"current": ["string"], "proficiency": "string", "missing": ["string"]},
+    "experience_analysis": "string",
+    "education_analysis": "string",
+    "strengths": ["string"],
+    "improvements": ["string"],
+    "ats": {"score": "integer 0-100", "recommendations": ["string"]},
+    "recommended_courses": ["string"],
+    "resume_score": "integer 0-100",
+    "role_alignment": "string (only when a target role is given)",
+    "job_match": "string (only when a job description is given)",
+    "unmet_requirements": ["string (only when a job description is given)"]
+}
+
+_BULLET_PREFIXES = ("-", "*", "•")
+
+
+class ExtractionError(Exception):
+    """Raised when no text can be extracted from an uploaded resume"""
+
+
+class ReportError(Exception):
+    """Raised when a PDF report cannot be generated"""
+
+
+def clean_markdown(text):
+    """Remove bold/italic, header and link markdown from a line of text"""
+    if not text:
+        return ""
+    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
+    text = re.sub(r'\*(.*?)\*', r'\1', text)
+    text = re.sub(r'__(.*?)__', r'\1', text)
+    text = re.sub(r'^#{1,6}\s+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', text)
+    return text.strip()
+
+
+@lru_cache(maxsize=32)
+def _parse_sections_cached(analysis_text):
+    sections = []
+    title, lines = None, []
+    for line in analysis_text.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith("##"):
+            if title is not None:
+                sections.append((title, "\n".join(lines).strip()))
+            title = stripped.lstrip("#").strip().strip("*").strip().rstrip(":")
+            lines = []
+        elif title is not None:
+            lines.append(line)
+    if title is not None:
+        sections.append((title, "\n".join(lines).strip()))
+    return tuple(sections)
+
+
+def parse_markdown_sections(analysis_text):
+    """Split a '## Title' style report into {title: content} in a single pass over its lines"""
+    if not analysis_text:
+        return {}
+    return dict(_parse_sections_cached(analysis_text))
+
+
+def find_section(sections, prefix):
+    """Return the content of the first section whose title starts with prefix"""
+    prefix = prefix.lower()
+    for title, content in sections.items():
+        if title.lower().startswith(prefix):
+            return content
+    return ""
+
+
+def bullet_items(content):
+    """Return the cleaned text of every bullet line in a section"""
+    items = []
+    for line in content.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith(_BULLET_PREFIXES):
+            item = clean_markdown(stripped.lstrip("-*• ").strip())
+            if item:
+                items.append(item)
+    return items
+
+
+def split_skill_groups(skills_content):
+    """Group a Skills Analysis section into current, proficiency and missing skill lists"""
+    groups = {"current": [], "proficiency": [], "missing": []}
+    labels = (("current skills", "current"), ("skill proficiency", "proficiency"), ("missing skills", "missing"))
+    group = None
+    for line in skills_content.split("\n"):
+        plain = clean_markdown(line.strip().lstrip("-*• ")).strip()
+        if not plain:
+            continue
+        label = next((key for text, key in labels if plain.lower().startswith(text)), None)
+        if label:
+            group = label
+            remainder = plain.split(":", 1)[1].strip() if ":" in plain else ""
+            if remainder:
+                groups[group].extend(item.strip() for item in remainder.split(",") if item.strip())
+        elif group and line.strip().startswith(_BULLET_PREFIXES):
+            groups[group].append(plain)
+    return groups
+
+
+def load_json_object(raw_text):
+    """Parse a model response that should be a single JSON object (tolerates code fences)"""
+    text = (raw_text or "").strip()
+    if text.startswith("```"):
+        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text)
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Response is not valid JSON: {e}")
+    if not isinstance(data, dict):
+        raise ValueError("Response JSON is not an object")
+    return data
+
+
+def _as_text(value):
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _as_list(value):
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    return [clean_markdown(str(item)) for item in value if str(item).strip()]
+
+
+def _as_score(value):
+    try:
+        return max(0, min(int(float(value)), 100))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _merge_lists(lists, limit):
+    """Interleave lists (one item from each in turn), dropping case-insensitive duplicates"""
+    merged, seen = [], set()
+    for position in range(max((len(items) for items in lists), default=0)):
+        for items in lists:
+            if position < len(items) and items[position].lower() not in seen:
+                seen.add(items[position].lower())
+                merged.append(items[position])
+    return merged[:limit]
+
+
+def _most_common(names):
+    """Most frequent provider name in a fan-out, or None when no call succeeded"""
+    return Counter(names).most_common(1)[0][0] if names else None
 
 
 class AIResumeAnalyzer:
+    # Resume tokens per map-step prompt in chunked analysis
+    CHUNK_TOKENS = 2000
+
     def __init__(self):
         # Load environment variables
         load_dotenv()
         
-        # Configure Google Gemini AI
+        # API keys; every model call goes through get_provider, which configures its client
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
         self.openrouter_api_key = os.getenv("OPENROUTER_API_KEY")
-        
-        if self.google_api_key:
-            genai.configure(api_key=self.google_api_key)
     
     def extract_text_from_pdf(self, pdf_file):
-        """Extract text from PDF using pdfplumber and OCR if needed"""
+        """
+        Extract text from PDF using pdfplumber and OCR if needed
+
+        Runs in job workers, so it reports nothing through Streamlit: it raises
+        ExtractionError, naming every method that failed, when no text is found.
+        """
         text = ""
+        failures = []
         
         # Save the uploaded file to a temporary file
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
@@ -57,9 +222,9 @@ class AIResumeAnalyzer:
                         except Exception as e:
                             # Don't show these specific errors to the user
                             if "PDFColorSpace" not in str(e) and "Cannot convert" not in str(e):
-                                st.warning(f"Error extracting text from page with pdfplumber: {e}")
+                                print(f"Error extracting text from page with pdfplumber: {e}")
             except Exception as e:
-                st.warning(f"pdfplumber extraction failed: {e}")
+                failures.append(f"pdfplumber extraction failed: {e}")
             
             # If pdfplumber extraction worked, return the text
             if text.strip():
@@ -67,7 +232,6 @@ class AIResumeAnalyzer:
                 return text.strip()
             
             # Try PyPDF2 as a fallback
-            st.info("Trying PyPDF2 extraction method...")
             try:
                 import pypdf
                 pdf_text = ""
@@ -82,19 +246,15 @@ class AIResumeAnalyzer:
                     os.unlink(temp_path)  # Clean up the temp file
                     return pdf_text.strip()
             except Exception as e:
-                st.warning(f"PyPDF2 extraction failed: {e}")
-            
-            # If we got here, both extraction methods failed
-            st.warning("Standard text extraction methods failed. Your PDF might be image-based or scanned.")
+                failures.append(f"PyPDF2 extraction failed: {e}")
             
-            # Try OCR as a last resort
+            # Both extraction methods failed: the PDF might be image-based or scanned,
+            # so try OCR as a last resort
             try:
                 # Check if we can import the required OCR libraries
                 import pytesseract
                 from pdf2image import convert_from_path
                 
-                st.info("Attempting OCR for image-based PDF. This may take a moment...")
-                
                 # Check if poppler is installed
                 poppler_path = None
                 if os.name == 'nt':  # Windows
@@ -108,11 +268,10 @@ class AIResumeAnalyzer:
                     for path in possible_paths:
                         if os.path.exists(path):
                             poppler_path = path
-                            st.success(f"Found Poppler at: {path}")
                             break
                     
                     if not poppler_path:
-                        st.warning("Poppler not found in common locations. Using default path: C:\\poppler\\Library\\bin")
+                        print("Poppler not found in common locations. Using default path: C:\\poppler\\Library\\bin")
                         poppler_path = r'C:\poppler\Library\bin'
                 
                 # Try to convert PDF to images
@@ -124,8 +283,7 @@ class AIResumeAnalyzer:
                     
                     # Process each image with OCR
                     ocr_text = ""
-                    for i, image in enumerate(images):
-                        st.info(f"Processing page {i+1} with OCR...")
+                    for image in images:
                         page_text = pytesseract.image_to_string(image)
                         ocr_text += page_text + "\n"
                     
@@ -133,23 +291,17 @@ class AIResumeAnalyzer:
                         os.unlink(temp_path)  # Clean up the temp file
                         return ocr_text.strip()
                     else:
-                        st.error("OCR extraction yielded no text. Please check if the PDF contains actual text content.")
+                        failures.append("OCR extraction yielded no text")
                 except Exception as e:
-                    st.error(f"PDF to image conversion failed: {e}")
-                    st.info("If you're on Windows, make sure Poppler is installed and in your PATH.")
-                    st.info("Download Poppler from: https://github.com/oschwartz10612/poppler-windows/releases/")
+                    failures.append(f"PDF to image conversion failed: {e} (on Windows, make sure Poppler is "
+                                    "installed and in your PATH: https://github.com/oschwartz10612/poppler-windows/releases/)")
             except ImportError as e:
-                st.error(f"OCR libraries not available: {e}")
-                st.info("Please install the required OCR libraries:")
-                st.code("pip install pytesseract pdf2image")
-                st.info("For Windows, also download and install:")
-                st.info("1. Tesseract OCR: https://github.com/UB-Mannheim/tesseract/wiki")
-                st.info("2. Poppler: https://github.com/oschwartz10612/poppler-windows/releases/")
+                failures.append(f"OCR libraries not available: {e} (install them with: pip install pytesseract pdf2image)")
             except Exception as e:
-                st.error(f"OCR processing failed: {e}")
+                failures.append(f"OCR processing failed: {e}")
         
         except Exception as e:
-            st.error(f"PDF processing failed: {e}")
+            failures.append(f"PDF processing failed: {e}")
         
         # Clean up the temp file
         try:
@@ -157,12 +309,13 @@ class AIResumeAnalyzer:
         except:
             pass
         
-        # If all extraction methods failed, return an empty string
-        st.error("All text extraction methods failed. Please try a different PDF or manually extract the text.")
-        return ""
+        raise ExtractionError(
+            "All text extraction methods failed. Please try a different PDF or manually extract the text. "
+            + "; ".join(failures)
+        )
     
     def extract_text_from_docx(self, docx_file):
-        """Extract text from DOCX file"""
+        """Extract text from DOCX file, raising ExtractionError when it cannot be read"""
         from docx import Document
         
         # Save the uploaded file to a temporary file
@@ -176,108 +329,374 @@ class AIResumeAnalyzer:
             for para in doc.paragraphs:
                 text += para.text + "\n"
         except Exception as e:
-            st.error(f"Error extracting text from DOCX: {e}")
-        
-        os.unlink(temp_path)  # Clean up the temp file
+            raise ExtractionError(f"Error extracting text from DOCX: {e}")
+        finally:
+            os.unlink(temp_path)  # Clean up the temp file
         return text
     
     def analyze_resume_with_gemini(self, resume_text, job_description=None, job_role=None):
         """Analyze resume using Google Gemini AI"""
+        return self.analyze_resume_with_provider(resume_text, job_description, job_role, provider="gemini")
+
+    def analyze_resume_with_provider(self, resume_text, job_description=None, job_role=None, provider="gemini",
+                                     structured=False, chunked=None):
+        """
+        Analyze resume with any configured LLM provider (name or LLMProvider instance)
+
+        With structured=True the model is asked for JSON matching ANALYSIS_JSON_SCHEMA; if the
+        response does not validate it is parsed as a markdown report instead. Resumes longer
+        than the provider's token budget (or any resume with chunked=True) are analyzed
+        section by section in parallel and merged locally, see _run_chunked_analysis.
+        """
+        if not resume_text:
+            return {"error": "Resume text is required for analysis."}
+
+        try:
+            llm = provider if isinstance(provider, LLMProvider) else get_provider(provider)
+        except ProviderError as e:
+            return {"error": str(e)}
+
+        if not llm.enabled:
+            if isinstance(llm, GeminiProvider):
+                return {"error": "Google API key is not configured. Please add it to your .env file."}
+            return {"error": f"{llm.display_name} is not configured. Please add its API key to your .env file."}
+
+        try:
+            resume_text = prepare_resume_text(resume_text, label=llm.display_name)
+            if chunked is None:
+                chunked = estimate_tokens(resume_text) > llm.token_budget
+            if chunked:
+                return self._run_chunked_analysis(llm, resume_text, job_description, job_role)
+            resume_text = fit_to_budget(resume_text, llm.token_budget)
+            return self._run_analysis(llm, resume_text, job_description, job_role, structured)
+        except Exception as e:
+            return {"error": f"Analysis failed: {str(e)}"}
+
+    def _run_analysis(self, llm, resume_text, job_description=None, job_role=None, structured=False,
+                      admitted=False):
+        """Prompt an enabled provider with already-compacted resume text and assemble the result"""
+        data = None
+        if structured:
+            prompt = self._build_structured_prompt(resume_text, job_description, job_role)
+            analysis = llm.analyze(prompt, json_mode=True, admitted=admitted)
+            try:
+                data = self._parse_structured_analysis(analysis)
+                analysis = self._structured_to_markdown(data)
+            except ValueError as e:
+                print(f"Structured analysis invalid, falling back to markdown parsing: {e}")
+        else:
+            base_prompt = self._build_analysis_prompt(resume_text, job_description, job_role)
+            analysis = llm.analyze(base_prompt, admitted=admitted)
+
+        if data:
+            resume_score = data["resume_score"]
+            ats_score = data["ats"]["score"]
+            lists = {
+                "strengths": data["strengths"],
+                "weaknesses": data["improvements"],
+                "suggestions": data["recommended_courses"]
+            }
+        else:
+            resume_score = self._extract_score_from_text(analysis)
+            ats_score = self._extract_ats_score_from_text(analysis)
+            lists = self._sections_to_lists(analysis)
+
+        return {
+            "analysis": analysis,
+            "resume_score": resume_score,
+            "ats_score": ats_score,
+            "structured": data,
+            **lists,
+            "model_used": llm.served_by()
+        }
+
+    def _run_chunked_analysis(self, llm, resume_text, job_description=None, job_role=None, max_workers=6):
+        """
+        Map-reduce analysis for long resumes
+
+        Map: consecutive sections are grouped into chunks of CHUNK_TOKENS and each chunk is
+        analyzed concurrently with a short prompt and a small output limit. Reduce: scores
+        are averaged weighted by chunk size and lists are merged locally, without another
+        model call. Latency is roughly that of one chunk regardless of document length.
+        """
+        chunk_tokens = min(self.CHUNK_TOKENS, llm.token_budget)
+        chunks = chunk_sections(resume_text, chunk_tokens)
+        print(f"[{llm.display_name}] Chunked analysis: {estimate_tokens(resume_text)} tokens in {len(chunks)} chunks")
+
+        def analyze_chunk(index):
+            names, text = chunks[index]
+            prompt = self._build_chunk_prompt(text, names, index, len(chunks), job_description, job_role)
+            try:
+                partial = self._parse_chunk_analysis(
+                    llm.analyze(prompt, json_mode=True, max_tokens=700, admitted=True))
+                served_by.append(llm.served_by())
+                return partial
+            except Exception as e:
+                print(f"Chunk {index + 1}/{len(chunks)} ({', '.join(names)}) failed: {e}")
+                return None
+
+        served_by = []
+        # All chunks are admitted at once, so a busy bucket cannot shed the analysis halfway through
+        admit(llm.rate_key, cost=len(chunks))
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+            partials = list(executor.map(analyze_chunk, range(len(chunks))))
+
+        completed = [(chunks[i], partial) for i, partial in enumerate(partials) if partial]
+        if not completed:
+            return {"error": "Analysis failed: no part of the resume could be analyzed."}
+
+        weights = [estimate_tokens(text) for (_, text), _ in completed]
+        total_weight = sum(weights) or 1
+
+        def weighted(key):
+            return round(sum(partial[key] * w for (_, partial), w in zip(completed, weights)) / total_weight)
+
+        current_skills = _merge_lists([p["skills"] for _, p in completed], 60)
+        known = {skill.lower() for skill in current_skills}
+        missing_skills = [skill for skill in _merge_lists([p["missing_skills"] for _, p in completed], 20)
+                          if skill.lower() not in known][:10]
+        notes = [f"**{', '.join(name.title() for name in names)}**: {partial['summary']}"
+                 for (names, _), partial in completed if partial["summary"]]
+        fit_notes = "\n".join(f"- {p['role_fit']}" for _, p in completed if p["role_fit"])
+
+        data = {
+            "overall_assessment": "\n\n".join(notes),
+            "professional_profile": "",
+            "skills": {"current": current_skills, "proficiency": "", "missing": missing_skills},
+            "experience_analysis": "",
+            "education_analysis": "",
+            "strengths": _merge_lists([p["strengths"] for _, p in completed], 7),
+            "improvements": _merge_lists([p["improvements"] for _, p in completed], 7),
+            "ats": {"score": weighted("ats_score"),
+                    "recommendations": _merge_lists([p["ats_recommendations"] for _, p in completed], 5)},
+            "recommended_courses": _merge_lists([p["recommended_courses"] for _, p in completed], 7),
+            "resume_score": weighted("score"),
+            "role_alignment": fit_notes if job_role else "",
+            "job_match": fit_notes if job_description and not job_role else "",
+            "unmet_requirements": []
+        }
+        if len(completed) < len(chunks):
+            data["overall_assessment"] += (f"\n\nNote: {len(chunks) - len(completed)} of {len(chunks)} "
+                                           f"parts of the resume could not be analyzed.")
+
+        return {
+            "analysis": self._structured_to_markdown(data),
+            "resume_score": data["resume_score"],
+            "ats_score": data["ats"]["score"],
+            "structured": data,
+            "strengths": data["strengths"],
+            "weaknesses": data["improvements"],
+            "suggestions": data["recommended_courses"],
+            "chunks": len(chunks),
+            "model_used": _most_common(served_by) or llm.display_name
+        }
+
+    def _build_chunk_prompt(self, chunk_text, section_names, index, total, job_description=None, job_role=None):
+        """Short per-chunk prompt for map-reduce analysis"""
+        prompt = f"""
+        You are an expert resume analyst. Below is part {index + 1} of {total} of a long resume,
+        covering: {', '.join(section_names)}. Analyze ONLY this part and respond with ONLY a JSON object:
+        {{"part_summary": "2-3 sentences", "skills": ["string"], "missing_skills": ["string"],
+        "strengths": ["up to 4 items"], "improvements": ["up to 4 items"], "ats_recommendations": ["string"],
+        "recommended_courses": ["up to 3 items"], "role_fit": "string", "score": "integer 0-100 for this part",
+        "ats_score": "integer 0-100 for this part"}}
+        """
+        if job_role:
+            prompt += f"""
+            Target role: {job_role}. Use "role_fit" for how this part supports the role.
+            """
+        if job_description:
+            prompt += f"""
+            Job Description:
+            {job_description}
+            Use "role_fit" for how this part matches the job description.
+            """
+        prompt += f"""
+        Resume part:
+        {chunk_text}
+        """
+        return compact_prompt(prompt)
+
+    def _parse_chunk_analysis(self, raw_text):
+        """Validate one map-step response; raises ValueError when it is not usable"""
+        data = load_json_object(raw_text)
+        if "score" not in data:
+            raise ValueError("Response JSON does not contain a score")
+        return {
+            "summary": _as_text(data.get("part_summary")),
+            "skills": _as_list(data.get("skills")),
+            "missing_skills": _as_list(data.get("missing_skills")),
+            "strengths": _as_list(data.get("strengths")),
+            "improvements": _as_list(data.get("improvements")),
+            "ats_recommendations": _as_list(data.get("ats_recommendations")),
+            "recommended_courses": _as_list(data.get("recommended_courses")),
+            "role_fit": _as_text(data.get("role_fit")),
+            "score": _as_score(data.get("score")),
+            "ats_score": _as_score(data.get("ats_score", data.get("score")))
+        }
+
+    def analyze_multiple_roles(self, resume_text, roles, provider="Google Gemini", max_workers=4):
+        """
+        Analyze one resume against several target roles concurrently
+
+        The resume is compacted once and every per-role prompt starts with the same
+        instructions and resume text, so only the short role suffix differs between calls
+        (and providers with prefix caching reuse the shared part).
+
+        Parameters:
+        - resume_text: The text content of the resume
+        - roles: Mapping of role name to its JOB_ROLES entry (or None)
+        - provider: Provider name or MODEL_CHOICES display name
+
+        Returns:
+        - Dictionary with per-role results and a comparison sorted by resume score
+        """
         if not resume_text:
             return {"error": "Resume text is required for analysis."}
+        if not roles:
+            return {"error": "Select at least one role to compare."}
+
+        try:
+            llm = provider if isinstance(provider, LLMProvider) else get_provider(provider)
+        except ProviderError as e:
+            return {"error": str(e)}
+        if not llm.enabled:
+            return {"error": f"{llm.display_name} is not configured. Please add its API key to your .env file."}
+
+        resume_text = prepare_resume_text(resume_text, llm.token_budget, label=f"{llm.display_name} roles")
+
+        def analyze_role(role_name):
+            job_description = self._role_job_description(role_name, roles[role_name])
+            try:
+                return self._run_analysis(llm, resume_text, job_description, role_name, structured=True,
+                                          admitted=True)
+            except Exception as e:
+                return {"error": f"Analysis failed: {str(e)}"}
+
+        role_names = list(roles)
+        try:
+            # One admission for every role, so the comparison is never left half done
+            admit(llm.rate_key, cost=len(role_names))
+        except RateLimitExceeded as e:
+            return {"error": str(e)}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(role_names)))) as executor:
+            results = dict(zip(role_names, executor.map(analyze_role, role_names)))
+
+        comparison = []
+        for role_name, result in results.items():
+            if "error" in result:
+                comparison.append({"role": role_name, "resume_score": 0, "ats_score": 0,
+                                   "missing_skills": [], "top_strengths": [], "error": result["error"]})
+                continue
+            if result["structured"]:
+                missing_skills = result["structured"]["skills"]["missing"]
+            else:
+                missing_skills = self.extract_missing_skills_from_analysis(result["analysis"])
+            comparison.append({
+                "role": role_name,
+                "resume_score": result["resume_score"],
+                "ats_score": result["ats_score"],
+                "missing_skills": missing_skills,
+                "top_strengths": result["strengths"][:3],
+                "error": None
+            })
+        comparison.sort(key=lambda row: (row["resume_score"], row["ats_score"]), reverse=True)
+
+        successful = [row for row in comparison if not row["error"]]
+        return {
+            "roles": results,
+            "comparison": comparison,
+            "best_role": successful[0]["role"] if successful else None,
+            "model_used": _most_common([r["model_used"] for r in results.values() if "error" not in r])
+                          or llm.display_name
+        }
+
+    def _role_job_description(self, job_role, role_info):
+        """Short job description built from a JOB_ROLES entry"""
+        if not role_info:
+            return None
+        return f"""
+        Role: {job_role}
+        Description: {role_info.get('description', '')}
+        Required Skills: {', '.join(role_info.get('required_skills', []))}
+        """
+
+    def _build_analysis_prompt(self, resume_text, job_description=None, job_role=None):
+        """Build the structured analysis prompt shared by every provider"""
+        base_prompt = f"""
+        You are an expert resume analyst with deep knowledge of industry standards, job requirements, and hiring practices across various fields. Your task is to provide a comprehensive, detailed analysis of the resume provided.
         
-        if not self.google_api_key:
-            return {"error": "Google API key is not configured. Please add it to your .env file."}
+        Please structure your response in the following format:
         
-        try:
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            
-            base_prompt = f"""
-            You are an expert resume analyst with deep knowledge of industry standards, job requirements, and hiring practices across various fields. Your task is to provide a comprehensive, detailed analysis of the resume provided.
-            
-            Please structure your response in the following format:
-            
-            ## Overall Assessment
-            [Provide a detailed assessment of the resume's overall quality, effectiveness, and alignment with industry standards. Include specific observations about formatting, content organization, and general impression. Be thorough and specific.]
-            
-            ## Professional Profile Analysis
-            [Analyze the candidate's professional profile, experience trajectory, and career narrative. Discuss how well their story comes across and whether their career progression makes sense for their apparent goals.]
-            
-            ## Skills Analysis
-            - **Current Skills**: [List ALL skills the candidate demonstrates in their resume, categorized by type (technical, soft, domain-specific, etc.). Be comprehensive.]
-            - **Skill Proficiency**: [Assess the apparent level of expertise in key skills based on how they're presented in the resume]
-            - **Missing Skills**: [List important skills that would improve the resume for their target role. Be specific and explain why each skill matters.]
-            
-            ## Experience Analysis
-            [Provide detailed feedback on how well the candidate has presented their experience. Analyze the use of action verbs, quantifiable achievements, and relevance to their target role. Suggest specific improvements.]
-            
-            ## Education Analysis
-            [Analyze the education section, including relevance of degrees, certifications, and any missing educational elements that would strengthen their profile.]
-            
-            ## Key Strengths
-            [List 5-7 specific strengths of the resume with detailed explanations of why these are effective]
-            
-            ## Areas for Improvement
-            [List 5-7 specific areas where the resume could be improved with detailed, actionable recommendations]
-            
-            ## ATS Optimization Assessment
-            [Analyze how well the resume is optimized for Applicant Tracking Systems. Provide a specific ATS score from 0-100, with 100 being perfectly optimized. Use this format: "ATS Score: XX/100". Then suggest specific keywords and formatting changes to improve ATS performance.]
-            
-            ## Recommended Courses/Certifications
-            [Suggest 5-7 specific courses or certifications that would enhance the candidate's profile, with a brief explanation of why each would be valuable]
+        ## Overall Assessment
+        [Provide a detailed assessment of the resume's overall quality, effectiveness, and alignment with industry standards. Include specific observations about formatting, content organization, and general impression. Be thorough and specific.]
+        
+        ## Professional Profile Analysis
+        [Analyze the candidate's professional profile, experience trajectory, and career narrative. Discuss how well their story comes across and whether their career progression makes sense for their apparent goals.]
+        
+        ## Skills Analysis
+        - **Current Skills**: [List ALL skills the candidate demonstrates in their resume, categorized by type (technical, soft, domain-specific, etc.). Be comprehensive.]
+        - **Skill Proficiency**: [Assess the apparent level of expertise in key skills based on how they're presented in the resume]
+        - **Missing Skills**: [List important skills that would improve the resume for their target role. Be specific and explain why each skill matters.]
+        
+        ## Experience Analysis
+        [Provide detailed feedback on how well the candidate has presented their experience. Analyze the use of action verbs, quantifiable achievements, and relevance to their target role. Suggest specific improvements.]
+        
+        ## Education Analysis
+        [Analyze the education section, including relevance of degrees, certifications, and any missing educational elements that would strengthen their profile.]
+        
+        ## Key Strengths
+        [List 5-7 specific strengths of the resume with detailed explanations of why these are effective]
+        
+        ## Areas for Improvement
+        [List 5-7 specific areas where the resume could be improved with detailed, actionable recommendations]
+        
+        ## ATS Optimization Assessment
+        [Analyze how well the resume is optimized for Applicant Tracking Systems. Provide a specific ATS score from 0-100, with 100 being perfectly optimized. Use this format: "ATS Score: XX/100". Then suggest specific keywords and formatting changes to improve ATS performance.]
+        
+        ## Recommended Courses/Certifications
+        [Suggest 5-7 specific courses or certifications that would enhance the candidate's profile, with a brief explanation of why each would be valuable]
+        
+        ## Resume Score
+        [Provide a score from 0-100 based on the overall quality of the resume. Use this format exactly: "Resume Score: XX/100" where XX is the numerical score. Be consistent with your assessment - a resume with significant issues should score below 60, an average resume 60-75, a good resume 75-85, and an excellent resume 85-100.]
+        
+        Resume:
+        {resume_text}
+        """
+        
+        if job_role:
+            base_prompt += f"""
             
-            ## Resume Score
-            [Provide a score from 0-100 based on the overall quality of the resume. Use this format exactly: "Resume Score: XX/100" where XX is the numerical score. Be consistent with your assessment - a resume with significant issues should score below 60, an average resume 60-75, a good resume 75-85, and an excellent resume 85-100.]
+            The candidate is targeting a role as: {job_role}
             
-            Resume:
-            {resume_text}
+            ## Role Alignment Analysis
+            [Analyze how well the resume aligns with the target role of {job_role}. Provide specific recommendations to better align the resume with this role.]
             """
+        
+        if job_description:
+            base_prompt += f"""
             
-            if job_role:
-                base_prompt += f"""
-                
-                The candidate is targeting a role as: {job_role}
-                
-                ## Role Alignment Analysis
-                [Analyze how well the resume aligns with the target role of {job_role}. Provide specific recommendations to better align the resume with this role.]
-                """
-            
-            if job_description:
-                base_prompt += f"""
-                
-                Additionally, compare this resume to the following job description:
-                
-                Job Description:
-                {job_description}
-                
-                ## Job Match Analysis
-                [Provide a detailed analysis of how well the resume matches the job description, with a match percentage and specific areas of alignment and misalignment]
-                
-                ## Key Job Requirements Not Met
-                [List specific requirements from the job description that are not addressed in the resume, with recommendations on how to address each gap]
-                """
-            
-            response = model.generate_content(base_prompt)
-            analysis = response.text.strip()
+            Additionally, compare this resume to the following job description:
             
-            # Extract resume score if present
-            resume_score = self._extract_score_from_text(analysis)
+            Job Description:
+            {job_description}
             
-            # Extract ATS score if present
-            ats_score = self._extract_ats_score_from_text(analysis)
+            ## Job Match Analysis
+            [Provide a detailed analysis of how well the resume matches the job description, with a match percentage and specific areas of alignment and misalignment]
             
-            return {
-                "analysis": analysis,
-                "resume_score": resume_score,
-                "ats_score": ats_score
-            }
-        
-        except Exception as e:
-            return {"error": f"Analysis failed: {str(e)}"}
+            ## Key Job Requirements Not Met
+            [List specific requirements from the job description that are not addressed in the resume, with recommendations on how to address each gap]
+            """
+
+        return compact_prompt(base_prompt)
 
     
     def generate_pdf_report(self, analysis_result, candidate_name, job_role):
-        """Generate a PDF report of the analysis"""
+        """Generate a PDF report of the analysis, raising ReportError when it cannot be built"""
+        # Validate input data
+        if not analysis_result:
+            raise ReportError("No analysis result provided for PDF generation")
+
         try:
             # Import required libraries
             try:
@@ -295,8 +714,7 @@ class AIResumeAnalyzer:
                 import datetime
                 import math
             except ImportError as e:
-                st.error(f"Error importing PDF libraries: {str(e)}")
-                st.info("Please make sure reportlab is installed: pip install reportlab")
+                print(f"Error importing PDF libraries: {str(e)}")
                 return self.simple_generate_pdf_report(analysis_result, candidate_name, job_role)
             
             # Helper function to clean markdown formatting
@@ -318,14 +736,6 @@ class AIResumeAnalyzer:
                 
                 return text.strip()
             
-            # Validate input data
-            if not analysis_result:
-                st.error("No analysis result provided for PDF generation")
-                return None
-                
-            # Print debug info
-            st.info(f"Generating PDF report for {candidate_name} targeting {job_role}")
-            
             # Create a buffer for the PDF
             buffer = io.BytesIO()
             
@@ -1093,99 +1503,138 @@ class AIResumeAnalyzer:
             buffer.seek(0)
             return buffer
         
+        except ReportError:
+            raise
         except Exception as e:
-            st.error(f"Error generating simple PDF report: {str(e)}")
             import traceback
-            st.code(traceback.format_exc())
-            return None
+            traceback.print_exc()
+            raise ReportError(f"Error generating PDF report: {str(e)}")
             
     def extract_skills_from_analysis(self, analysis_text):
         """Extract skills from the analysis text"""
-        skills = []
-        
-        try:
-            if "Current Skills" in analysis_text:
-                skills_section = analysis_text.split("Current Skills")[1]
-                if "##" in skills_section:
-                    skills_section = skills_section.split("##")[0]
-                
-                for line in skills_section.split("\n"):
-                    if line.strip() and ("-" in line or "*" in line or "•" in line):
-                        skill = line.replace("-", "").replace("*", "").replace("•", "").strip()
-                        if skill:
-                            skills.append(skill)
-        except Exception as e:
-            st.warning(f"Error extracting skills: {str(e)}")
-        
-        return skills
+        sections = parse_markdown_sections(analysis_text)
+        return split_skill_groups(find_section(sections, "Skills Analysis"))["current"]
         
     def extract_missing_skills_from_analysis(self, analysis_text):
         """Extract missing skills from the analysis text"""
-        missing_skills = []
-        
-        try:
-            if "Missing Skills" in analysis_text:
-                missing_section = analysis_text.split("Missing Skills")[1]
-                if "##" in missing_section:
-                    missing_section = missing_section.split("##")[0]
-                
-                for line in missing_section.split("\n"):
-                    if line.strip() and ("-" in line or "*" in line or "•" in line):
-                        skill = line.replace("-", "").replace("*", "").replace("•", "").strip()
-                        if skill:
-                            missing_skills.append(skill)
-        except Exception as e:
-            st.warning(f"Error extracting missing skills: {str(e)}")
-        
-        return missing_skills
+        sections = parse_markdown_sections(analysis_text)
+        return split_skill_groups(find_section(sections, "Skills Analysis"))["missing"]
     
     def _extract_score_from_text(self, analysis_text):
         """Extract the resume score from the analysis text"""
-        try:
-            # Look for the Resume Score section
-            if "## Resume Score" in analysis_text:
-                score_section = analysis_text.split("## Resume Score")[1].strip()
-                # Extract the first number found
-                score_match = re.search(r'Resume Score:\s*(\d{1,3})/100', score_section)
-                if score_match:
-                    score = int(score_match.group(1))
-                    # Ensure score is within valid range
-                    return max(0, min(score, 100))
-                
-                # Try another pattern if the first one doesn't match
-                score_match = re.search(r'\b(\d{1,3})\b', score_section)
-                if score_match:
-                    score = int(score_match.group(1))
-                    # Ensure score is within valid range
-                    return max(0, min(score, 100))
-            
-            # If no score found in Resume Score section, try to find it elsewhere
-            score_match = re.search(r'Resume Score:\s*(\d{1,3})/100', analysis_text)
-            if score_match:
-                score = int(score_match.group(1))
-                return max(0, min(score, 100))
-                
-            return 0
-        except Exception as e:
-            print(f"Error extracting score: {str(e)}")
-            return 0
+        score_section = find_section(parse_markdown_sections(analysis_text), "Resume Score")
+        score_match = (re.search(r'Resume Score:?\**\s*(\d{1,3})\s*/\s*100', score_section)
+                       or re.search(r'\b(\d{1,3})\b', score_section)
+                       or re.search(r'Resume Score:?\**\s*(\d{1,3})\s*/\s*100', analysis_text or ""))
+        if score_match:
+            return max(0, min(int(score_match.group(1)), 100))
+        return 0
             
     def _extract_ats_score_from_text(self, analysis_text):
         """Extract the ATS score from the analysis text"""
-        try:
-            # Look for the ATS Score in the ATS Optimization Assessment section
-            if "## ATS Optimization Assessment" in analysis_text:
-                ats_section = analysis_text.split("## ATS Optimization Assessment")[1].split("##")[0].strip()
-                # Extract the score using regex
-                score_match = re.search(r'ATS Score:\s*(\d{1,3})/100', ats_section)
-                if score_match:
-                    score = int(score_match.group(1))
-                    # Ensure score is within valid range
-                    return max(0, min(score, 100))
-            return 0
-        except Exception as e:
-            print(f"Error extracting ATS score: {str(e)}")
-            return 0
+        ats_section = find_section(parse_markdown_sections(analysis_text), "ATS Optimization")
+        score_match = (re.search(r'ATS Score:?\**\s*(\d{1,3})\s*/\s*100', ats_section)
+                       or re.search(r'ATS Score:?\**\s*(\d{1,3})\s*/\s*100', analysis_text or ""))
+        if score_match:
+            return max(0, min(int(score_match.group(1)), 100))
+        return 0
+
+    def _build_structured_prompt(self, resume_text, job_description=None, job_role=None):
+        """Build a prompt asking for the analysis as a single JSON object"""
+        prompt = f"""
+        You are an expert resume analyst with deep knowledge of industry standards, job requirements, and hiring practices.
+        Analyze the resume below and respond with ONLY a JSON object matching this schema (no markdown, no commentary):
+        {json.dumps(ANALYSIS_JSON_SCHEMA, indent=1)}
+
+        Guidelines:
+        - "skills.current": every skill the resume demonstrates; "skills.missing": skills that would strengthen it for the target role.
+        - "strengths" and "improvements": 5-7 specific, actionable items each.
+        - "recommended_courses": 5-7 courses or certifications with a short reason.
+        - "resume_score": below 60 for significant issues, 60-75 average, 75-85 good, 85-100 excellent.
+        - "ats.score": how well the resume is optimized for Applicant Tracking Systems.
+
+        Resume:
+        {resume_text}
+        """
+        if job_role:
+            prompt += f"""
+            Target role: {job_role}. Fill "role_alignment" with how well the resume aligns with this role.
+            """
+        if job_description:
+            prompt += f"""
+            Job Description:
+            {job_description}
+            Fill "job_match" (with a match percentage) and "unmet_requirements".
+            """
+        return compact_prompt(prompt)
+
+    def _parse_structured_analysis(self, raw_text):
+        """
+        Parse and validate a structured analysis in one pass
+
+        Raises ValueError when the response is not a JSON object with a resume score.
+        """
+        data = load_json_object(raw_text)
+        if "resume_score" not in data:
+            raise ValueError("Response JSON does not contain a resume_score")
+
+        skills = data.get("skills") if isinstance(data.get("skills"), dict) else {}
+        ats = data.get("ats") if isinstance(data.get("ats"), dict) else {"score": data.get("ats_score")}
+        return {
+            "overall_assessment": _as_text(data.get("overall_assessment")),
+            "professional_profile": _as_text(data.get("professional_profile")),
+            "skills": {
+                "current": _as_list(skills.get("current")),
+                "proficiency": _as_text(skills.get("proficiency")),
+                "missing": _as_list(skills.get("missing"))
+            },
+            "experience_analysis": _as_text(data.get("experience_analysis")),
+            "education_analysis": _as_text(data.get("education_analysis")),
+            "strengths": _as_list(data.get("strengths")),
+            "improvements": _as_list(data.get("improvements")),
+            "ats": {"score": _as_score(ats.get("score")), "recommendations": _as_list(ats.get("recommendations"))},
+            "recommended_courses": _as_list(data.get("recommended_courses")),
+            "resume_score": _as_score(data.get("resume_score")),
+            "role_alignment": _as_text(data.get("role_alignment")),
+            "job_match": _as_text(data.get("job_match")),
+            "unmet_requirements": _as_list(data.get("unmet_requirements"))
+        }
+
+    def _structured_to_markdown(self, data):
+        """Render a validated structured analysis in the '## Section' report format"""
+        def bullets(items):
+            return "\n".join(f"- {item}" for item in items)
+
+        parts = [
+            ("Overall Assessment", data["overall_assessment"]),
+            ("Professional Profile Analysis", data["professional_profile"]),
+            ("Skills Analysis", "\n".join([
+                f"- **Current Skills**: {', '.join(data['skills']['current'])}",
+                f"- **Skill Proficiency**: {data['skills']['proficiency']}",
+                f"- **Missing Skills**: {', '.join(data['skills']['missing'])}"
+            ])),
+            ("Experience Analysis", data["experience_analysis"]),
+            ("Education Analysis", data["education_analysis"]),
+            ("Key Strengths", bullets(data["strengths"])),
+            ("Areas for Improvement", bullets(data["improvements"])),
+            ("ATS Optimization Assessment",
+             f"ATS Score: {data['ats']['score']}/100\n" + bullets(data["ats"]["recommendations"])),
+            ("Recommended Courses/Certifications", bullets(data["recommended_courses"])),
+            ("Resume Score", f"Resume Score: {data['resume_score']}/100"),
+            ("Role Alignment Analysis", data["role_alignment"]),
+            ("Job Match Analysis", data["job_match"]),
+            ("Key Job Requirements Not Met", bullets(data["unmet_requirements"])),
+        ]
+        return "\n\n".join(f"## {title}\n{body.strip()}" for title, body in parts if body.strip())
+
+    def _sections_to_lists(self, analysis_text):
+        """Strengths, weaknesses and suggestions from a markdown report (single parse)"""
+        sections = parse_markdown_sections(analysis_text)
+        return {
+            "strengths": bullet_items(find_section(sections, "Key Strengths")),
+            "weaknesses": bullet_items(find_section(sections, "Areas for Improvement")),
+            "suggestions": bullet_items(find_section(sections, "Recommended Courses"))
+        }
             
     def analyze_resume(self, resume_text, job_role=None, role_info=None, model="Google Gemini"):
         """
@@ -1195,7 +1644,8 @@ class AIResumeAnalyzer:
         - resume_text: The text content of the resume
         - job_role: The target job role
         - role_info: Additional information about the job role
-        - model: The AI model to use ("Google Gemini" or "Anthropic Claude")
+        - model: The AI model to use, one of the MODEL_CHOICES display names
+          ("Google Gemini", "OpenAI GPT", "OpenRouter", "Anthropic Claude", "Local Stub")
         
         Returns:
         - Dictionary containing analysis results
@@ -1203,61 +1653,22 @@ class AIResumeAnalyzer:
         import traceback
         
         try:
-            job_description = None
-            if role_info:
-                job_description = f"""
-                Role: {job_role}
-                Description: {role_info.get('description', '')}
-                Required Skills: {', '.join(role_info.get('required_skills', []))}
-                """
-            
-            # Choose the appropriate model for analysis
-            if model == "Google Gemini":
-                result = self.analyze_resume_with_gemini(resume_text, job_description, job_role)
-                model_used = "Google Gemini"
-            elif model == "Anthropic Claude":
-                result = self.analyze_resume_with_anthropic(resume_text, job_description, job_role)
-                # Get the actual model used from the result
-                model_used = result.get("model_used", "Anthropic Claude")
-            else:
-                # Default to Gemini if model not recognized
-                result = self.analyze_resume_with_gemini(resume_text, job_description, job_role)
-                model_used = "Google Gemini"
-            
-            # Process the result to extract structured information
+            job_description = self._role_job_description(job_role, role_info)
+            
+            # Choose the appropriate provider for analysis; unknown names fall back to Gemini
+            if model not in MODEL_CHOICES:
+                model = "Google Gemini"
+            result = self.analyze_resume_with_provider(resume_text, job_description, job_role,
+                                                       provider=model, structured=True)
+            if "error" in result:
+                raise RuntimeError(result["error"])
+            model_used = result.get("model_used", model)
             analysis_text = result.get("analysis", "")
-            
-            # Extract strengths
-            strengths = []
-            if "## Key Strengths" in analysis_text:
-                strengths_section = analysis_text.split("## Key Strengths")[1].split("##")[0].strip()
-                strengths = [clean_markdown(s.strip().replace("- ", "").replace("* ", "").replace("• ", "")) 
-                            for s in strengths_section.split("\n") 
-                            if s.strip() and (s.strip().startswith("-") or s.strip().startswith("*") or s.strip().startswith("•"))]
-            
-            # Extract weaknesses/areas for improvement
-            weaknesses = []
-            if "## Areas for Improvement" in analysis_text:
-                weaknesses_section = analysis_text.split("## Areas for Improvement")[1].split("##")[0].strip()
-                weaknesses = [clean_markdown(w.strip().replace("- ", "").replace("* ", "").replace("• ", "")) 
-                             for w in weaknesses_section.split("\n") 
-                             if w.strip() and (w.strip().startswith("-") or w.strip().startswith("*") or w.strip().startswith("•"))]
-            
-            # Extract suggestions/recommendations
-            suggestions = []
-            if "## Recommended Courses" in analysis_text:
-                suggestions_section = analysis_text.split("## Recommended Courses")[1].split("##")[0].strip()
-                suggestions = [clean_markdown(s.strip().replace("- ", "").replace("* ", "").replace("• ", "")) 
-                                 for s in suggestions_section.split("\n") 
-                                 if s.strip() and (s.strip().startswith("-") or s.strip().startswith("*") or s.strip().startswith("•"))]
-            
-            # Extract score
-            score = result.get("resume_score", 0)
-            if not score:
-                score = self._extract_score_from_text(analysis_text)
-            
-            # Extract ATS score
-            ats_score = self._extract_ats_score_from_text(analysis_text)
+            strengths = result["strengths"]
+            weaknesses = result["weaknesses"]
+            suggestions = result["suggestions"]
+            score = result["resume_score"]
+            ats_score = result["ats_score"]
             
             # Return structured analysis
             return {
@@ -1285,7 +1696,11 @@ class AIResumeAnalyzer:
             } 
 
     def simple_generate_pdf_report(self, analysis_result, candidate_name, job_role):
-        """Generate a simple PDF report without complex charts as a fallback"""
+        """Generate a simple PDF report without complex charts as a fallback, raising ReportError on failure"""
+        # Validate input data
+        if not analysis_result:
+            raise ReportError("No analysis result provided for PDF generation")
+
         try:
             # Import required libraries
             try:
@@ -1303,9 +1718,8 @@ class AIResumeAnalyzer:
                 import datetime
                 import math
             except ImportError as e:
-                st.error(f"Error importing PDF libraries: {str(e)}")
-                st.info("Please make sure reportlab is installed: pip install reportlab")
-                return None
+                raise ReportError(f"Error importing PDF libraries: {str(e)}. "
+                                  "Please make sure reportlab is installed: pip install reportlab")
             
             # Helper function to clean markdown formatting
             def clean_markdown(text):
@@ -1326,11 +1740,6 @@ class AIResumeAnalyzer:
                 
                 return text.strip()
             
-            # Validate input data
-            if not analysis_result:
-                st.error("No analysis result provided for PDF generation")
-                return None
-                
             # Create a buffer for the PDF
             buffer = io.BytesIO()
             
@@ -1804,16 +2213,17 @@ class AIResumeAnalyzer:
             buffer.seek(0)
             return buffer
         
+        except ReportError:
+            raise
         except Exception as e:
-            st.error(f"Error generating simple PDF report: {str(e)}")
             import traceback
-            st.code(traceback.format_exc())
-            return None 
+            traceback.print_exc()
+            raise ReportError(f"Error generating PDF report: {str(e)}") 
 
     def process_sections(self, analysis_text, content, normal_style, list_item_style, subheading_style, heading_style, clean_markdown):
         """Process sections of the analysis text with special handling for certain sections"""
         # Parse the markdown-like content
-        sections = analysis_text.split("##")
+        sections = parse_markdown_sections(analysis_text)
         
         # Define sections to include in detailed analysis
         detailed_sections = [
@@ -1830,14 +2240,7 @@ class AIResumeAnalyzer:
         content.append(Paragraph("Detailed Analysis", heading_style))
         content.append(Spacer(1, 0.1*inch))
         
-        for section in sections:
-            if not section.strip():
-                continue
-            
-            # Extract section title and content
-            lines = section.strip().split("\n")
-            section_title = lines[0].strip()
-            
+        for section_title, section_content in sections.items():
             # Skip sections we don't want in the detailed analysis
             if section_title not in detailed_sections and section_title != "Overall Assessment":
                 continue
@@ -1846,8 +2249,6 @@ class AIResumeAnalyzer:
             if section_title == "Overall Assessment":
                 continue
             
-            section_content = "\n".join(lines[1:]).strip()
-            
             # Add section title
             content.append(Paragraph(section_title, subheading_style))
             content.append(Spacer(1, 0.1*inch))
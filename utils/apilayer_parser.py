@@ -3,9 +3,11 @@ APILayer Resume Parser API
 Uses APILayer's Resume Parser for comprehensive resume analysis
 API: https://marketplace.apilayer.com/resume_parser-api
 """
+import os
 import requests
 import json
 from typing import Dict, List
+from .single_flight import single_flight
 
 
 class APILayerParser:
@@ -24,6 +26,10 @@ class APILayerParser:
             self.api_key = "cwU371cDOnoF1zKkyThr9fmK5oRR9iam"
 
         self.api_url = "https://api.apilayer.com/resume_parser/upload"
+        # Local stand-in server (stub_server.py) for offline benchmarks
+        stub_url = os.getenv("LLM_STUB_SERVER_URL", "").strip().rstrip("/")
+        if stub_url:
+            self.api_url = f"{stub_url}/resume_parser/upload"
         self.enabled = True if self.api_key else False
 
     def parse_resume(self, resume_text: str, job_description: str = None) -> Dict:
@@ -66,6 +72,7 @@ class APILayerParser:
             print(f"APILayer API exception: {str(e)}")
             return self._fallback_score(resume_text, job_description)
 
+    @single_flight
     def calculate_ats_score(self, resume_text: str, job_description: str = None) -> Dict:
         """
         Calculate ATS score from parsed resume data
@@ -0,0 +1,85 @@
+"""
+Bounded-Context Resume Chat
+Keeps resume coaching conversations at a constant prompt size: the resume is
+compacted once into a fixed grounding block, recent turns are kept in a sliding
+window and older turns are folded into a rolling summary
+"""
+import re
+from typing import Dict, List
+from .llm_providers import LLMProvider
+from .text_compactor import prepare_resume_text, estimate_tokens
+
+
+COACH_SYSTEM_PROMPT = ("You are an expert resume coach and career advisor. "
+                       "Provide specific, actionable advice. Be concise and practical.")
+
+
+class ResumeChatEngine:
+    def __init__(self, provider: LLMProvider, resume_text: str, max_context_tokens: int = 2500,
+                 grounding_tokens: int = 1200, window_turns: int = 6, summary_tokens: int = 250,
+                 max_response_tokens: int = 500):
+        """
+        Args:
+            provider: LLM provider used for replies
+            resume_text: Resume the conversation is grounded on
+            max_context_tokens: Ceiling for the whole prompt (grounding + summary + window + question)
+            grounding_tokens: Budget for the compacted resume block
+            window_turns: Maximum number of recent messages sent verbatim
+            summary_tokens: Budget for the rolling summary of evicted turns
+            max_response_tokens: Completion limit per reply
+        """
+        self.provider = provider
+        self.max_context_tokens = max_context_tokens
+        self.window_turns = window_turns
+        self.summary_tokens = summary_tokens
+        self.max_response_tokens = max_response_tokens
+
+        # Built once per conversation; identical across turns so provider-side prefix caching applies
+        resume_block = prepare_resume_text(resume_text, grounding_tokens, label="Resume chat")
+        self.grounding = f"The candidate's resume:\n{resume_block}"
+
+        self.window: List[Dict] = []
+        self.summary = ""
+
+    def ask(self, question: str) -> str:
+        """Answer a question and record the exchange"""
+        messages = self.build_messages(question)
+        answer = self.provider.chat(messages, temperature=0.7, max_tokens=self.max_response_tokens)
+        self._record({"role": "user", "content": question})
+        self._record({"role": "assistant", "content": answer})
+        return answer
+
+    def build_messages(self, question: str) -> List[Dict]:
+        """Assemble the bounded prompt for the next turn"""
+        system = f"{COACH_SYSTEM_PROMPT}\n\n{self.grounding}"
+        if self.summary:
+            system += f"\n\nSummary of the earlier conversation:\n{self.summary}"
+
+        question_tokens = estimate_tokens(question)
+        budget = self.max_context_tokens - estimate_tokens(system) - question_tokens
+
+        # Newest turns first until the ceiling is reached
+        window = []
+        for message in reversed(self.window):
+            cost = estimate_tokens(message["content"])
+            if cost > budget:
+                break
+            window.insert(0, message)
+            budget -= cost
+
+        return [{"role": "system", "content": system}, *window, {"role": "user", "content": question}]
+
+    def _record(self, message: Dict):
+        self.window.append(message)
+        while len(self.window) > self.window_turns:
+            self._fold_into_summary(self.window.pop(0))
+
+    def _fold_into_summary(self, message: Dict):
+        """Extractive rolling summary: first sentence of each evicted message, oldest dropped first"""
+        first_sentence = re.split(r'(?<=[.!?])\s+', message["content"].strip(), maxsplit=1)[0]
+        speaker = "User asked" if message["role"] == "user" else "Coach advised"
+        lines = [line for line in self.summary.split("\n") if line]
+        lines.append(f"- {speaker}: {first_sentence[:200]}")
+        while lines and estimate_tokens("\n".join(lines)) > self.summary_tokens:
+            lines.pop(0)
+        self.summary = "\n".join(lines)
@@ -0,0 +1,171 @@
+"""
+Streaming Data Export
+Writes resume data to CSV, JSON Lines, Parquet or Excel chunk by chunk, so memory use
+stays flat however many rows are exported. Files are written to EXPORT_DIR and are
+meant to be produced by the "export_resumes" background job.
+"""
+import os
+import csv
+import json
+import uuid
+from datetime import datetime
+from typing import Dict
+
+from config.database import EXPORT_COLUMNS, iter_resume_export
+
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+EXPORT_CHUNK_ROWS = 1000
+# Finished export files older than this are removed when a new export starts
+EXPORT_RETENTION_SECONDS = 24 * 3600
+
+# Rows per worksheet: Excel's 1,048,576-row limit minus the header row
+XLSX_SHEET_ROWS = 1048575
+
+EXPORT_FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "jsonl": ("jsonl", "application/x-ndjson"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def _write_csv(path, chunks):
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            rows += len(chunk)
+    return rows
+
+
+def _write_jsonl(path, chunks):
+    rows = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.writelines(json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + "\n" for row in chunk)
+            rows += len(chunk)
+    return rows
+
+
+def _write_parquet(path, chunks):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    score_columns = {"ats_score", "keyword_match_score", "format_score", "section_score"}
+    schema = pa.schema([(name, pa.float64() if name in score_columns else pa.string()) for name in EXPORT_COLUMNS])
+    rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            columns = list(zip(*chunk))
+            arrays = [
+                pa.array([None if v is None else float(v) for v in values], pa.float64()) if name in score_columns
+                else pa.array([None if v is None else str(v) for v in values], pa.string())
+                for name, values in zip(EXPORT_COLUMNS, columns)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+def _xlsx_rows(chunks):
+    """Yield (sheet number, row) pairs, starting a new sheet every XLSX_SHEET_ROWS rows"""
+    rows = 0
+    for chunk in chunks:
+        for row in chunk:
+            yield rows // XLSX_SHEET_ROWS, row
+            rows += 1
+
+
+def _xlsx_sheet_name(sheet):
+    return "Resume Data" if sheet == 0 else f"Resume Data {sheet + 1}"
+
+
+def _write_xlsx(path, chunks):
+    rows = 0
+    try:
+        import xlsxwriter
+    except ImportError:
+        xlsxwriter = None
+
+    if xlsxwriter is not None:
+        # constant_memory flushes each row to disk as soon as the next one starts
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        header_format = workbook.add_format({"bold": True, "fg_color": "#D7E4BC", "border": 1})
+        worksheet, current = None, None
+        for sheet, row in _xlsx_rows(chunks):
+            if sheet != current:
+                worksheet, current = workbook.add_worksheet(_xlsx_sheet_name(sheet)), sheet
+                worksheet.write_row(0, 0, EXPORT_COLUMNS, header_format)
+            worksheet.write_row(rows - sheet * XLSX_SHEET_ROWS + 1, 0, row)
+            rows += 1
+        if worksheet is None:
+            workbook.add_worksheet(_xlsx_sheet_name(0)).write_row(0, 0, EXPORT_COLUMNS, header_format)
+        workbook.close()
+        return rows
+
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    worksheet, current = None, None
+    for sheet, row in _xlsx_rows(chunks):
+        if sheet != current:
+            worksheet, current = workbook.create_sheet(_xlsx_sheet_name(sheet)), sheet
+            worksheet.append(EXPORT_COLUMNS)
+        worksheet.append(row)
+        rows += 1
+    if worksheet is None:
+        workbook.create_sheet(_xlsx_sheet_name(0)).append(EXPORT_COLUMNS)
+    workbook.save(path)
+    return rows
+
+
+WRITERS = {
+    "csv": _write_csv,
+    "jsonl": _write_jsonl,
+    "parquet": _write_parquet,
+    "xlsx": _write_xlsx,
+}
+
+
+def cleanup_exports(max_age_seconds: int = EXPORT_RETENTION_SECONDS):
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    cutoff = datetime.now().timestamp() - max_age_seconds
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def export_resumes(fmt: str = "csv", filters: Dict = None, chunk_size: int = EXPORT_CHUNK_ROWS) -> Dict:
+    """
+    Stream resume data matching the admin browser filters into an export file
+
+    Returns {'path', 'file_name', 'mime', 'rows', 'format'} or {'error': ...}.
+    """
+    if fmt not in WRITERS:
+        return {"error": f"Unsupported export format: {fmt}"}
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    cleanup_exports()
+    extension, mime = EXPORT_FORMATS[fmt]
+    file_name = f"resume_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    path = os.path.join(EXPORT_DIR, f"{uuid.uuid4().hex[:8]}_{file_name}")
+    partial = path + ".part"
+
+    try:
+        rows = WRITERS[fmt](partial, iter_resume_export(filters, chunk_size))
+        # Only complete files ever appear under their final name
+        os.replace(partial, path)
+    except Exception as e:
+        print(f"Error exporting resume data: {e}")
+        if os.path.exists(partial):
+            os.remove(partial)
+        return {"error": f"Export failed: {str(e)}"}
+
+    return {"path": path, "file_name": file_name, "mime": mime, "rows": rows, "format": fmt}
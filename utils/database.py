@@ -1,58 +1,119 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, func
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import datetime
+"""
+ORM Access to the Resume Database
+SQLAlchemy models mapped onto the same tables config/database.py reads and writes.
+The schema itself is owned by config/migrations.py; this module only maps it, through
+one cached engine per database file.
+"""
+from sqlalchemy import create_engine, event, Column, Integer, String, Text, Float, DateTime, func
+from sqlalchemy.orm import declarative_base, sessionmaker
+import threading
+import hashlib
 import json
 
+from config.database import DB_PATH, BUSY_TIMEOUT_MS, SYNCHRONOUS, init_database, insert_resume
+
 # Create the base class for declarative models
 Base = declarative_base()
 
 # Define the Resume model
 class Resume(Base):
-    __tablename__ = 'resumes'
+    __tablename__ = 'resume_data'
     
     id = Column(Integer, primary_key=True)
+    name = Column(Text, nullable=False, default='')
+    email = Column(Text, nullable=False, default='')
+    phone = Column(Text, nullable=False, default='')
     user_id = Column(String(100))
-    job_role = Column(String(100))
+    job_role = Column('target_role', String(100))
+    target_category = Column(String(100))
+    skills = Column(Text)
     content = Column(Text)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.current_timestamp())
 
 # Define the Analysis model
 class Analysis(Base):
-    __tablename__ = 'analyses'
+    __tablename__ = 'resume_analysis'
     
     id = Column(Integer, primary_key=True)
     resume_id = Column(Integer)
+    ats_score = Column(Float)
+    keyword_match_score = Column(Float)
+    format_score = Column(Float)
+    section_score = Column(Float)
     analysis_data = Column(Text)  # Store JSON data
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.current_timestamp())
 
 class AIAnalysis(Base):
-    __tablename__ = 'ai_analyses'
+    __tablename__ = 'ai_analysis'
     
     id = Column(Integer, primary_key=True)
     resume_id = Column(Integer)
     model_used = Column(String(100))
     resume_score = Column(Integer)
     job_role = Column(String(100))
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.current_timestamp())
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(db_path=DB_PATH):
+    """Return the process-wide engine for db_path, creating it (and migrating the schema) once"""
+    if db_path in _engines:
+        return _engines[db_path][0]
+    with _engines_lock:
+        if db_path not in _engines:
+            if db_path == DB_PATH:
+                init_database()
+            engine = create_engine(f'sqlite:///{db_path}', connect_args={'timeout': BUSY_TIMEOUT_MS / 1000})
+
+            @event.listens_for(engine, 'connect')
+            def _set_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+                cursor.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+                cursor.close()
+
+            _engines[db_path] = (engine, sessionmaker(bind=engine))
+        return _engines[db_path][0]
+
+
+def _session_factory(db_path=DB_PATH):
+    get_engine(db_path)
+    return _engines[db_path][1]
+
 
 class DatabaseManager:
-    def __init__(self, db_path='resume_data.db'):
-        self.engine = create_engine(f'sqlite:///{db_path}')
-        Base.metadata.create_all(self.engine)
-        Session = sessionmaker(bind=self.engine)
-        self.session = Session()
+    def __init__(self, db_path=DB_PATH):
+        self.engine = get_engine(db_path)
+        self.session = _session_factory(db_path)()
     
     def save_resume(self, user_id, job_role, content):
-        resume = Resume(
-            user_id=user_id,
-            job_role=job_role,
-            content=content
-        )
-        self.session.add(resume)
-        self.session.commit()
-        return resume.id
+        # Saved through the same insert as the app's uploads, so the row gets its skills,
+        # similarity signature and content_hash too
+        content = content if isinstance(content, str) else json.dumps(content)
+        try:
+            data = json.loads(content)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            data = {'resume_text': content}
+        data['target_role'] = job_role
+        data['content_hash'] = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            resume_id = insert_resume(cursor, data)
+            cursor.execute('UPDATE resume_data SET user_id = ?, content = ? WHERE id = ?',
+                           (user_id, content, resume_id))
+            connection.commit()
+            return resume_id
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
     
     def get_resume(self, resume_id):
         return self.session.query(Resume).filter(Resume.id == resume_id).first()
@@ -61,9 +122,20 @@ class DatabaseManager:
         return self.session.query(Resume).filter(Resume.user_id == user_id).all()
     
     def save_analysis(self, resume_id, analysis_data):
+        # The score columns feed the dashboard rollups, so they are filled like the app's saves
+        try:
+            data = json.loads(analysis_data) if isinstance(analysis_data, str) else analysis_data
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            data = {}
         analysis = Analysis(
             resume_id=resume_id,
-            analysis_data=analysis_data
+            ats_score=float(data.get('ats_score', 0)),
+            keyword_match_score=float(data.get('keyword_match_score', 0)),
+            format_score=float(data.get('format_score', 0)),
+            section_score=float(data.get('section_score', 0)),
+            analysis_data=analysis_data if isinstance(analysis_data, str) else json.dumps(analysis_data)
         )
         self.session.add(analysis)
         self.session.commit()
@@ -79,55 +151,8 @@ class DatabaseManager:
         self.session.close()
 
 def get_database_connection():
-    """Get a connection to the database"""
-    engine = create_engine('sqlite:///resume_data.db')
-    Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    return Session()
-
-def save_resume_data(resume_data):
-    """Save resume data to the database"""
-    session = get_database_connection()
-    try:
-        # Convert resume_data to JSON string
-        resume_json = json.dumps(resume_data)
-        
-        # Create a new Resume object
-        resume = Resume(
-            user_id="anonymous",  # We don't have user authentication yet
-            job_role=resume_data.get('target_role', 'Unknown'),
-            content=resume_json
-        )
-        
-        session.add(resume)
-        session.commit()
-        return resume.id
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
-
-def save_ai_analysis_data(resume_id, analysis_data):
-    """Save AI analysis data to the database"""
-    session = get_database_connection()
-    try:
-        # Create a new AIAnalysis object
-        ai_analysis = AIAnalysis(
-            resume_id=resume_id,
-            model_used=analysis_data.get('model_used', 'Unknown'),
-            resume_score=analysis_data.get('resume_score', 0),
-            job_role=analysis_data.get('job_role', 'Unknown')
-        )
-        
-        session.add(ai_analysis)
-        session.commit()
-        return ai_analysis.id
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
+    """Get a session on the shared engine"""
+    return _session_factory()()
 
 def get_ai_analysis_statistics():
     """Get statistics about AI analyses"""
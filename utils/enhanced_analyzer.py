@@ -2,6 +2,7 @@
 Enhanced Resume Analyzer
 Integrates ATS Scoring, Dual-AI Enhancement, and Comparison Features
 """
+import hashlib
 import streamlit as st
 import plotly.graph_objects as go
 from typing import Dict, Tuple
@@ -9,6 +10,8 @@ from .ats_scorer import ATSScorer
 from .apilayer_parser import APILayerParser
 from .openai_enhancer import OpenAIEnhancer
 from .ai_resume_analyzer import AIResumeAnalyzer
+from .chat_engine import ResumeChatEngine
+from .rate_limiter import RateLimitExceeded, admit_session
 
 
 class EnhancedResumeAnalyzer:
@@ -71,17 +74,22 @@ class EnhancedResumeAnalyzer:
         openai_enhanced = False
         if self.openai_enhancer.enabled:
             with st.spinner("Enhancing with OpenAI..."):
-                openai_result = self.openai_enhancer.enhance_resume_content(resume_text, job_description)
-                if openai_result.get('error') == 'quota_exceeded':
-                    st.warning("⚠️ OpenAI API quota exceeded. Using Gemini AI for enhancement.")
-                    all_suggestions.extend(openai_result.get('suggestions', []))
-                elif 'enhanced_text' in openai_result and openai_result['enhanced_text'] != resume_text:
-                    enhanced_text = openai_result['enhanced_text']
-                    all_suggestions.extend(openai_result.get('suggestions', []))
-                    openai_enhanced = True
-                    st.success("✅ OpenAI enhancement complete")
-                else:
-                    st.info("ℹ️ OpenAI enhancement unavailable. Using Gemini AI.")
+                try:
+                    admit_session(self.openai_enhancer.provider.rate_key)
+                    # Sections are enhanced concurrently and cached individually
+                    openai_result = self.openai_enhancer.enhance_resume_sections(resume_text, job_description)
+                    if openai_result.get('error') == 'quota_exceeded':
+                        st.warning("⚠️ OpenAI API quota exceeded. Using Gemini AI for enhancement.")
+                        all_suggestions.extend(openai_result.get('suggestions', []))
+                    elif 'enhanced_text' in openai_result and openai_result['enhanced_text'] != resume_text:
+                        enhanced_text = openai_result['enhanced_text']
+                        all_suggestions.extend(openai_result.get('suggestions', []))
+                        openai_enhanced = True
+                        st.success("✅ OpenAI enhancement complete")
+                    else:
+                        st.info("ℹ️ OpenAI enhancement unavailable. Using Gemini AI.")
+                except RateLimitExceeded as e:
+                    st.warning(f"⏳ {str(e)}")
 
         # If OpenAI didn't enhance, use rule-based enhancement
         if not openai_enhanced:
@@ -312,14 +320,24 @@ class EnhancedResumeAnalyzer:
             'version': len(st.session_state[session_state_key]) + 1
         })
 
-    def create_ai_chat(self, resume_text: str):
+    def create_ai_chat(self, resume_text: str, max_context_tokens: int = 2500):
         """Create AI feedback chat interface"""
         st.subheader("💬 AI Resume Coach")
 
-        # Initialize chat history
+        # Initialize chat history (display only; the engine bounds what is sent to the model)
         if 'chat_history' not in st.session_state:
             st.session_state.chat_history = []
 
+        # One engine per resume so the grounding block is compacted once per conversation
+        resume_key = hashlib.sha256(resume_text.encode('utf-8')).hexdigest()
+        engine = st.session_state.get('chat_engine')
+        if engine is None or st.session_state.get('chat_engine_key') != resume_key:
+            engine = ResumeChatEngine(self.openai_enhancer.provider, resume_text,
+                                      max_context_tokens=max_context_tokens)
+            st.session_state.chat_engine = engine
+            st.session_state.chat_engine_key = resume_key
+            st.session_state.chat_history = []
+
         # Display chat history
         for message in st.session_state.chat_history:
             with st.chat_message(message["role"]):
@@ -342,25 +360,8 @@ class EnhancedResumeAnalyzer:
                 with st.spinner("Thinking..."):
                     if self.openai_enhancer.enabled:
                         try:
-                            chat_prompt = f"""Based on this resume:
-
-{resume_text[:1000]}... (truncated)
-
-User question: {prompt}
-
-Provide specific, actionable advice for improving the resume. Be concise and practical."""
-
-                            response = self.openai_enhancer.client.chat.completions.create(
-                                model="gpt-3.5-turbo",
-                                messages=[
-                                    {"role": "system", "content": "You are an expert resume coach and career advisor. Provide specific, actionable advice."},
-                                    {"role": "user", "content": chat_prompt}
-                                ],
-                                temperature=0.7,
-                                max_tokens=500
-                            )
-
-                            ai_response = response.choices[0].message.content
+                            admit_session(engine.provider.rate_key)
+                            ai_response = engine.ask(prompt)
                         except Exception as e:
                             ai_response = f"I encountered an error: {str(e)}. Please try rephrasing your question."
                     else:
@@ -1,43 +1,188 @@
+"""
+Excel Resume Store
+Saves append rows to a CSV segment under a lock file, so each save costs the same no
+matter how many rows exist and concurrent writers never lose rows. Reads combine the
+workbook with the segments not yet merged into it, and compact them into
+resume_data.xlsx once EXCEL_COMPACT_ROWS rows are pending so replaying them stays cheap.
+Segments can also be compacted on a schedule with:
+    python -m utils.excel_manager --compact
+"""
+import os
+import csv
+import sys
+import time
+import argparse
 import pandas as pd
 from datetime import datetime
 
+COLUMNS = ['user_id', 'job_role', 'content', 'analysis_data', 'created_at']
+# Sheet listing the segments already merged, so a crash mid-compaction never duplicates rows
+COMPACTED_SHEET = '_compacted'
+# Rows left in segments before a read merges them into the workbook
+COMPACT_ROWS = int(os.getenv("EXCEL_COMPACT_ROWS", "1000"))
+
+
+class FileLock:
+    """Exclusive advisory lock on a lock file (fcntl on POSIX, msvcrt on Windows)"""
+
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a+')
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                if sys.platform == 'win32':
+                    import msvcrt
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    import fcntl
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return self
+            except OSError:
+                if time.time() > deadline:
+                    self._file.close()
+                    raise TimeoutError(f"Timed out waiting for lock {self.path}")
+                time.sleep(0.01)
+
+    def __exit__(self, *exc):
+        try:
+            if sys.platform == 'win32':
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+
+
 class ExcelManager:
-    def __init__(self):
-        self.excel_file = "resume_data.xlsx"
-    
+    def __init__(self, excel_file="resume_data.xlsx"):
+        self.excel_file = excel_file
+        self.segment_dir = os.path.splitext(excel_file)[0] + "_segments"
+        self.active_segment = os.path.join(self.segment_dir, "active.csv")
+        os.makedirs(self.segment_dir, exist_ok=True)
+        self._append_lock = os.path.join(self.segment_dir, "append.lock")
+        self._compact_lock = os.path.join(self.segment_dir, "compact.lock")
+
     def save_resume_data(self, user_id, job_role, content, analysis_data=None):
         try:
-            # Try to read existing Excel file
-            try:
-                df = pd.read_excel(self.excel_file)
-            except FileNotFoundError:
-                df = pd.DataFrame()
-            
             # Create new data entry
-            new_data = {
-                'user_id': user_id,
-                'job_role': job_role,
-                'content': content,
-                'analysis_data': str(analysis_data) if analysis_data else None,
-                'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            # Append new data
-            df = pd.concat([df, pd.DataFrame([new_data])], ignore_index=True)
-            
-            # Save to Excel
-            df.to_excel(self.excel_file, index=False)
+            row = [
+                user_id,
+                job_role,
+                content,
+                str(analysis_data) if analysis_data else None,
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            ]
+
+            # Append one row to the active segment
+            with FileLock(self._append_lock):
+                new_segment = not os.path.exists(self.active_segment) or os.path.getsize(self.active_segment) == 0
+                with open(self.active_segment, 'a', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    if new_segment:
+                        writer.writerow(COLUMNS)
+                    writer.writerow(row)
             return True
         except Exception as e:
             print(f"Error saving to Excel: {str(e)}")
             return False
-    
-    def get_all_resumes(self):
+
+    def _seal_active_segment(self):
+        """Move the active segment aside so compaction can read it while saves continue"""
+        with FileLock(self._append_lock):
+            if os.path.exists(self.active_segment) and os.path.getsize(self.active_segment) > 0:
+                sealed = os.path.join(self.segment_dir, f"segment-{time.time_ns()}.csv")
+                os.replace(self.active_segment, sealed)
+
+    def _read_workbook(self):
+        """Workbook rows and the names of the segments already merged into it"""
         try:
-            return pd.read_excel(self.excel_file)
+            # Every column is read as text, like the CSV segments, so concatenated frames agree
+            sheets = pd.read_excel(self.excel_file, sheet_name=None, dtype=str)
         except FileNotFoundError:
+            return pd.DataFrame(columns=COLUMNS), set()
+        df = next(iter(sheets.values()))
+        merged = set(sheets[COMPACTED_SHEET]['segment']) if COMPACTED_SHEET in sheets else set()
+        return df, merged
+
+    def _read_segment(self, name):
+        return pd.read_csv(os.path.join(self.segment_dir, name), dtype=str, encoding='utf-8')
+
+    def _sealed_segments(self):
+        return sorted(
+            name for name in os.listdir(self.segment_dir)
+            if name.startswith("segment-") and name.endswith(".csv")
+        )
+
+    def compact(self):
+        """Merge sealed segments into the workbook and return all rows as a DataFrame"""
+        self._seal_active_segment()
+        with FileLock(self._compact_lock, timeout=300):
+            segments = self._sealed_segments()
+            df, merged = self._read_workbook()
+
+            pending = [name for name in segments if name not in merged]
+            if pending:
+                df = pd.concat([df] + [self._read_segment(name) for name in pending], ignore_index=True)
+                tmp_file = self.excel_file + ".tmp.xlsx"
+                with pd.ExcelWriter(tmp_file) as writer:
+                    df.to_excel(writer, index=False)
+                    pd.DataFrame({'segment': pending}).to_excel(writer, sheet_name=COMPACTED_SHEET, index=False)
+                os.replace(tmp_file, self.excel_file)
+
+            for name in segments:
+                os.remove(os.path.join(self.segment_dir, name))
+            return df
+
+    def _read_rows(self):
+        """All rows, and how many of them are in segments not merged into the workbook yet"""
+        # Holding the compaction lock keeps a concurrent compaction from moving rows mid-read
+        with FileLock(self._compact_lock, timeout=300):
+            df, merged = self._read_workbook()
+            frames = [df] + [self._read_segment(name) for name in self._sealed_segments() if name not in merged]
+            with FileLock(self._append_lock):
+                if os.path.exists(self.active_segment) and os.path.getsize(self.active_segment) > 0:
+                    frames.append(self._read_segment(os.path.basename(self.active_segment)))
+        return pd.concat(frames, ignore_index=True), sum(len(frame) for frame in frames[1:])
+
+    def read_all(self):
+        """All rows: the workbook plus sealed and active segments not merged into it yet"""
+        return self._read_rows()[0]
+
+    def get_all_resumes(self):
+        try:
+            df, pending = self._read_rows()
+        except Exception as e:
+            print(f"Error reading Excel data: {str(e)}")
             return pd.DataFrame()
-    
+        if pending >= COMPACT_ROWS:
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Error compacting Excel data: {str(e)}")
+        return df
+
     def get_user_resumes(self, user_id):
         df = self.get_all_resumes()
-        return df[df['user_id'] == user_id]
\ No newline at end of file
+        if df.empty:
+            return df
+        return df[df['user_id'] == str(user_id)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact the Excel resume store")
+    parser.add_argument("--compact", action="store_true", help="merge pending segments into the workbook")
+    parser.add_argument("--file", default="resume_data.xlsx")
+    args = parser.parse_args()
+
+    if args.compact:
+        rows = len(ExcelManager(args.file).compact())
+        print(f"Compacted {args.file}: {rows} rows")
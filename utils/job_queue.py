@@ -0,0 +1,429 @@
+"""
+Background Job Queue
+Persistent SQLite-backed queue for heavy work (AI analysis, OCR, PDF reports, data exports)
+executed by a bounded pool of worker processes. Jobs survive Streamlit reruns
+and browser refreshes; the UI submits a job and polls for its result.
+
+Run dedicated workers on a node with:
+    python -m utils.job_queue --workers 4
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import base64
+import hashlib
+import sqlite3
+import argparse
+import threading
+import traceback
+import multiprocessing
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "jobs.db")
+# Running jobs older than this are assumed orphaned by a dead worker and re-queued
+STALE_JOB_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "900"))
+MAX_ATTEMPTS = 3
+# How often workers sweep for orphaned jobs
+REQUEUE_INTERVAL_SECONDS = 60
+
+TASKS: Dict[str, Callable] = {}
+
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def register_task(kind: str):
+    """Decorator registering a function as the handler for a job kind"""
+    def decorator(func):
+        TASKS[kind] = func
+        return func
+    return decorator
+
+
+def _encode(value):
+    """JSON-encode a job payload/result, preserving bytes"""
+    def default(obj):
+        if isinstance(obj, (bytes, bytearray)):
+            return {"__bytes__": base64.b64encode(bytes(obj)).decode("ascii")}
+        if hasattr(obj, "getvalue"):
+            return default(obj.getvalue())
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return json.dumps(value, default=default)
+
+
+def _decode(text):
+    if text is None:
+        return None
+
+    def hook(obj):
+        if set(obj) == {"__bytes__"}:
+            return base64.b64decode(obj["__bytes__"])
+        return obj
+    return json.loads(text, object_hook=hook)
+
+
+class JobQueue:
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or JOBS_DB_PATH
+        self.setup_database()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def setup_database(self):
+        """Create the jobs table if it doesn't exist"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker_pid INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    started_at TIMESTAMP,
+                    finished_at TIMESTAMP,
+                    dedupe_key TEXT
+                )
+            ''')
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "dedupe_key" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN dedupe_key TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dedupe_key ON jobs (dedupe_key, status)")
+        finally:
+            conn.close()
+
+    def submit(self, kind: str, payload: Dict, dedupe: bool = False, dedupe_key: str = None) -> str:
+        """
+        Queue a job and return its ID
+
+        With dedupe=True the ID is derived from kind and payload, so submitting identical
+        work again returns the existing job (and its result once finished) instead of a new one.
+        With a dedupe_key (see make_dedupe_key), a job with the same key that is still queued
+        or running is returned instead, so identical requests share one execution.
+        """
+        if kind not in TASKS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        # Orphaned jobs are recovered here too, so they do not wait for a worker restart
+        self.requeue_stale()
+        encoded = _encode(payload)
+        if dedupe_key:
+            return self._submit_keyed(kind, encoded, dedupe_key)
+        if dedupe:
+            job_id = hashlib.sha256(f"{kind}:{encoded}".encode("utf-8")).hexdigest()[:32]
+        else:
+            job_id = uuid.uuid4().hex
+
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs (id, kind, payload) VALUES (?, ?, ?)",
+                (job_id, kind, encoded)
+            )
+            # A failed deduplicated job is retried on resubmission
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', error = NULL, attempts = 0 WHERE id = ? AND status = 'failed'",
+                (job_id,)
+            )
+        finally:
+            conn.close()
+        return job_id
+
+    def _submit_keyed(self, kind: str, encoded: str, dedupe_key: str) -> str:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running') LIMIT 1",
+                (dedupe_key,)
+            ).fetchone()
+            job_id = row["id"] if row else uuid.uuid4().hex
+            if not row:
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, payload, dedupe_key) VALUES (?, ?, ?, ?)",
+                    (job_id, kind, encoded, dedupe_key)
+                )
+            conn.execute("COMMIT")
+            return job_id
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return job status and decoded result, or None if the job does not exist"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT id, kind, status, result, error, created_at, started_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        job = dict(row)
+        job["result"] = _decode(job["result"])
+        return job
+
+    def claim(self) -> Optional[Dict]:
+        """Atomically take the oldest queued job for this process"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, kind, payload FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if not row:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, worker_pid = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), os.getpid(), row["id"])
+            )
+            conn.execute("COMMIT")
+            return {"id": row["id"], "kind": row["kind"], "payload": _decode(row["payload"])}
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def finish(self, job_id: str, result=None, error: str = None):
+        """Record the outcome of a job"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                ('failed' if error else 'done', None if error else _encode(result), error,
+                 datetime.now().strftime('%Y-%m-%d %H:%M:%S'), job_id)
+            )
+        finally:
+            conn.close()
+
+    def requeue_stale(self, max_age_seconds: int = STALE_JOB_SECONDS) -> int:
+        """Return jobs orphaned by crashed workers to the queue (or fail them after MAX_ATTEMPTS)"""
+        conn = self._connect()
+        try:
+            cutoff = f"-{int(max_age_seconds)} seconds"
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Worker did not finish the job' "
+                "WHERE status = 'running' AND started_at < datetime('now', 'localtime', ?) AND attempts >= ?",
+                (cutoff, MAX_ATTEMPTS)
+            )
+            return conn.execute(
+                "UPDATE jobs SET status = 'queued' "
+                "WHERE status = 'running' AND started_at < datetime('now', 'localtime', ?)",
+                (cutoff,)
+            ).rowcount
+        finally:
+            conn.close()
+
+    def run_one(self) -> bool:
+        """Claim and execute one job in this process; returns False when the queue is empty"""
+        job = self.claim()
+        if not job:
+            return False
+        try:
+            result = TASKS[job["kind"]](**job["payload"])
+            self.finish(job["id"], result=result)
+        except Exception as e:
+            print(f"Job {job['id']} ({job['kind']}) failed: {e}")
+            traceback.print_exc()
+            self.finish(job["id"], error=str(e))
+        return True
+
+
+def worker_loop(db_path: str = None, poll_interval: float = 0.5):
+    """Worker process entry point: execute queued jobs until terminated"""
+    queue = JobQueue(db_path)
+    last_requeue = 0
+    while True:
+        try:
+            if time.time() - last_requeue >= REQUEUE_INTERVAL_SECONDS:
+                queue.requeue_stale()
+                last_requeue = time.time()
+            if not queue.run_one():
+                time.sleep(poll_interval)
+        except sqlite3.OperationalError as e:
+            print(f"Job worker database error: {e}")
+            time.sleep(poll_interval * 4)
+
+
+def worker_count() -> int:
+    """Worker pool size for this node (JOB_WORKERS, 0 runs jobs inline)"""
+    return int(os.getenv("JOB_WORKERS", "2"))
+
+
+def start_workers(count: int = None, db_path: str = None):
+    """Start the worker pool once per server process"""
+    count = worker_count() if count is None else count
+    with _workers_lock:
+        alive = [p for p in _workers if p.is_alive()]
+        _workers[:] = alive
+        for _ in range(count - len(alive)):
+            # spawn gives workers a clean interpreter instead of forking the threaded server
+            process = multiprocessing.get_context("spawn").Process(target=worker_loop, args=(db_path,), daemon=True)
+            process.start()
+            _workers.append(process)
+    return len(_workers)
+
+
+def run_job(kind: str, payload: Dict, dedupe: bool = True, timeout: float = 300,
+            poll_interval: float = 0.5, on_poll: Callable = None):
+    """
+    Submit a job and wait for its result
+
+    Returns (job_id, result). See wait_for_job for failure behaviour.
+    """
+    job_id = JobQueue().submit(kind, payload, dedupe=dedupe)
+    return job_id, wait_for_job(job_id, timeout, poll_interval, on_poll)
+
+
+def make_dedupe_key(kind: str, *parts) -> str:
+    """Key identifying a request by its inputs (bytes, text or JSON-serializable values)"""
+    digest = hashlib.sha256(kind.encode("utf-8"))
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        elif not isinstance(part, (bytes, bytearray)):
+            part = json.dumps(part, sort_keys=True, default=str).encode("utf-8")
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+
+def submit_job(kind: str, payload: Dict, dedupe: bool = False, dedupe_key: str = None) -> str:
+    """
+    Queue a job without waiting for it and return its ID; poll with JobQueue().get()
+
+    Workers are started if needed; with JOB_WORKERS=0 the job runs inline before returning.
+    """
+    queue = JobQueue()
+    job_id = queue.submit(kind, payload, dedupe=dedupe, dedupe_key=dedupe_key)
+    if worker_count() == 0:
+        while queue.get(job_id)["status"] == "queued" and queue.run_one():
+            pass
+    else:
+        start_workers()
+    return job_id
+
+
+def wait_for_job(job_id: str, timeout: float = 300, poll_interval: float = 0.5, on_poll: Callable = None):
+    """
+    Poll a job until it finishes and return its result
+
+    When JOB_WORKERS=0 queued jobs are executed inline. Raises RuntimeError if the job
+    fails and TimeoutError if it does not finish in time; the job keeps running in the
+    background either way and can be polled again later with its ID.
+    """
+    queue = JobQueue()
+    if worker_count() == 0:
+        while queue.get(job_id)["status"] == "queued" and queue.run_one():
+            pass
+    else:
+        start_workers()
+
+    deadline = time.time() + timeout
+    while True:
+        job = queue.get(job_id)
+        if job is None:
+            raise RuntimeError(f"Job {job_id} does not exist")
+        if job["status"] == "done":
+            return job["result"]
+        if job["status"] == "failed":
+            raise RuntimeError(job["error"])
+        if on_poll:
+            on_poll(job)
+        if time.time() > deadline:
+            raise TimeoutError(f"Job {job_id} is still {job['status']}")
+        time.sleep(poll_interval)
+
+
+@register_task("ai_analysis")
+def _ai_analysis_task(resume_text=None, job_description=None, job_role=None, provider="gemini", structured=True,
+                      file_bytes=None, file_type="pdf", save=False):
+    """Analyze a resume, extracting its text from file_bytes first when no text is given"""
+    from .ai_resume_analyzer import AIResumeAnalyzer
+    if not resume_text and file_bytes is not None:
+        resume_text = _extract_text_task(file_bytes, file_type)
+    result = AIResumeAnalyzer().analyze_resume_with_provider(
+        resume_text, job_description, job_role, provider=provider, structured=structured)
+    if result and "error" not in result:
+        # Returned with the result so a page that only knows the job ID can render the report
+        result["job_role"] = job_role
+        result["job_description"] = job_description
+        if save:
+            from config.database import save_ai_analysis_data
+            from config.write_behind import get_write_queue
+            save_ai_analysis_data(None, {
+                "model_used": result.get("model_used", provider),
+                "resume_score": result.get("resume_score", 0),
+                "job_role": job_role
+            })
+            get_write_queue().flush()
+    return result
+
+
+@register_task("multi_role_analysis")
+def _multi_role_analysis_task(resume_text=None, roles=None, provider="gemini", file_bytes=None, file_type="pdf"):
+    """Compare a resume across roles, extracting its text from file_bytes first when no text is given"""
+    from .ai_resume_analyzer import AIResumeAnalyzer
+    if not resume_text and file_bytes is not None:
+        resume_text = _extract_text_task(file_bytes, file_type)
+    return AIResumeAnalyzer().analyze_multiple_roles(resume_text, roles or {}, provider=provider)
+
+
+@register_task("extract_text")
+def _extract_text_task(file_bytes, file_type="pdf"):
+    """Extract resume text; an ExtractionError fails the job with its message"""
+    from .ai_resume_analyzer import AIResumeAnalyzer
+    analyzer = AIResumeAnalyzer()
+    if file_type == "docx":
+        import io
+        return analyzer.extract_text_from_docx(io.BytesIO(file_bytes))
+    return analyzer.extract_text_from_pdf(file_bytes)
+
+
+@register_task("pdf_report")
+def _pdf_report_task(analysis_result, candidate_name, job_role):
+    """Render the PDF report bytes; a ReportError fails the job with its message"""
+    from .ai_resume_analyzer import AIResumeAnalyzer
+    return AIResumeAnalyzer().generate_pdf_report(analysis_result, candidate_name, job_role).getvalue()
+
+
+
+@register_task("export_resumes")
+def _export_resumes_task(fmt="csv", filters=None):
+    from .data_export import export_resumes
+    return export_resumes(fmt, filters)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--workers", type=int, default=worker_count())
+    parser.add_argument("--db", default=JOBS_DB_PATH)
+    args = parser.parse_args()
+
+    print(f"Starting {args.workers} job workers on {args.db}")
+    start_workers(args.workers, args.db)
+    try:
+        for process in _workers:
+            process.join()
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,495 @@
+"""
+LLM Provider Abstraction
+Common interface over Google Gemini, OpenAI, OpenRouter and a local stub,
+with an optional hedged mode that races a secondary provider against a slow primary
+"""
+import os
+import re
+import json
+import time
+import logging
+import requests
+import threading
+import concurrent.futures
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from .rate_limiter import admit, RateLimitExceeded
+from .telemetry import record_llm_call
+from .text_compactor import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+ANALYST_SYSTEM_PROMPT = "You are an expert resume analyst and career advisor."
+WRITER_SYSTEM_PROMPT = "You are an expert resume writer and ATS optimization specialist."
+
+# Shared pool for hedged requests; the losing call is left to finish in the background
+_HEDGE_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+
+
+class ProviderError(Exception):
+    """Raised when a provider is not configured or returns no usable content"""
+
+
+# Retries for rate-limit, overload and timeout errors (quota errors are never retried)
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+# Token usage reported by the provider for the call running on this thread
+_call_usage = threading.local()
+
+
+def _report_usage(prompt_tokens, completion_tokens):
+    _call_usage.tokens = (prompt_tokens or 0, completion_tokens or 0)
+
+
+def is_transient_error(error: Exception) -> bool:
+    message = str(error).lower()
+    if "insufficient_quota" in message:
+        return False
+    return any(marker in message for marker in
+               ("429", "rate limit", "500", "502", "503", "504", "timeout", "timed out", "overloaded"))
+
+
+def stub_server_url() -> Optional[str]:
+    """Base URL of the local stand-in API server (stub_server.py) when LLM_STUB_SERVER_URL is set"""
+    url = os.getenv("LLM_STUB_SERVER_URL", "").strip()
+    return url.rstrip("/") or None
+
+
+class LLMProvider:
+    """Base class for chat-completion style language model providers"""
+
+    name = "base"
+    display_name = "Base Provider"
+    default_model = None
+    # Maximum estimated tokens of resume text sent in a single prompt
+    token_budget = 4000
+
+    def __init__(self, model: str = None):
+        load_dotenv()
+        self.model = model or self.default_model
+        self.enabled = False
+
+    def __repr__(self):
+        return f"{self.name}:{self.model}"
+
+    @property
+    def rate_key(self) -> str:
+        """Name of the admission-control bucket this provider draws from"""
+        return self.name
+
+    def analyze(self, prompt: str, system: str = ANALYST_SYSTEM_PROMPT,
+                temperature: float = 0.7, max_tokens: int = None, json_mode: bool = False,
+                admitted: bool = False) -> str:
+        """Run a resume analysis prompt and return the raw model text"""
+        return self.generate([
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ], temperature=temperature, max_tokens=max_tokens, json_mode=json_mode, operation="analyze",
+            admitted=admitted)
+
+    def enhance(self, prompt: str, system: str = WRITER_SYSTEM_PROMPT,
+                temperature: float = 0.7, max_tokens: int = 2000, admitted: bool = False) -> str:
+        """Run a resume enhancement prompt and return the raw model text"""
+        return self.generate([
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ], temperature=temperature, max_tokens=max_tokens, operation="enhance", admitted=admitted)
+
+    def chat(self, messages: List[Dict], temperature: float = 0.7, max_tokens: int = 500) -> str:
+        """Continue a conversation given OpenAI-style role/content messages"""
+        return self.generate(messages, temperature=temperature, max_tokens=max_tokens, operation="chat")
+
+    def generate(self, messages: List[Dict], temperature: float = 0.7, max_tokens: int = None,
+                 json_mode: bool = False, operation: str = "complete", admitted: bool = False) -> str:
+        """
+        complete() behind admission control, with retries and telemetry
+
+        admitted=True skips admission for a call the caller already admitted as part of a fan-out.
+        """
+        if not admitted:
+            admit(self.rate_key)
+        return self._tracked_complete(messages, temperature, max_tokens, json_mode, operation)
+
+    def _tracked_complete(self, messages: List[Dict], temperature: float, max_tokens: Optional[int],
+                          json_mode: bool, operation: str, fallback: str = None) -> str:
+        """Call complete(), retrying transient errors, and record latency, tokens and outcome"""
+        started = time.perf_counter()
+        estimated_prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        retries = 0
+        while True:
+            _call_usage.tokens = None
+            try:
+                text = self.complete(messages, temperature=temperature, max_tokens=max_tokens, json_mode=json_mode)
+                break
+            except Exception as e:
+                if retries < MAX_RETRIES and is_transient_error(e):
+                    retries += 1
+                    time.sleep(min(8.0, 0.5 * 2 ** (retries - 1)))
+                    continue
+                record_llm_call(self.name, self.model, operation, (time.perf_counter() - started) * 1000,
+                                prompt_tokens=estimated_prompt_tokens, retries=retries, fallback=fallback,
+                                success=False, error=str(e))
+                raise
+
+        prompt_tokens, completion_tokens = _call_usage.tokens or (estimated_prompt_tokens, estimate_tokens(text))
+        record_llm_call(self.name, self.model, operation, (time.perf_counter() - started) * 1000,
+                        prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                        retries=retries, fallback=fallback)
+        return text
+
+    def complete(self, messages: List[Dict], temperature: float = 0.7, max_tokens: int = None,
+                 json_mode: bool = False) -> str:
+        """Provider-specific completion call; json_mode asks the model for a bare JSON object"""
+        raise NotImplementedError
+
+    def served_by(self) -> str:
+        """Display name of the provider that answered this thread's most recent call"""
+        return self.display_name
+
+    def _require_enabled(self):
+        if not self.enabled:
+            raise ProviderError(f"{self.display_name} is not configured")
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+    display_name = "Google Gemini"
+    default_model = "gemini-2.5-flash"
+    token_budget = 12000
+
+    def __init__(self, model: str = None):
+        super().__init__(model)
+        self.api_key = os.getenv("GOOGLE_API_KEY")
+        # The stand-in server speaks the generateContent REST API, so the SDK is bypassed
+        self.rest_url = None
+        if stub_server_url():
+            self.api_key = self.api_key or "stub-key"
+            self.rest_url = f"{stub_server_url()}/v1beta"
+            self.enabled = True
+        elif self.api_key:
+            try:
+                import google.generativeai as genai
+                genai.configure(api_key=self.api_key)
+                self.genai = genai
+                self.enabled = True
+            except ImportError:
+                print("Warning: google-generativeai package not installed. Run: pip install google-generativeai")
+
+    def complete(self, messages: List[Dict], temperature: float = 0.7, max_tokens: int = None,
+                 json_mode: bool = False) -> str:
+        self._require_enabled()
+
+        system_parts = [m["content"] for m in messages if m["role"] == "system"]
+        contents = [
+            {"role": "model" if m["role"] == "assistant" else "user", "parts": [m["content"]]}
+            for m in messages if m["role"] != "system"
+        ]
+
+        generation_config = {"temperature": temperature}
+        if max_tokens:
+            generation_config["max_output_tokens"] = max_tokens
+        if json_mode:
+            generation_config["response_mime_type"] = "application/json"
+
+        if self.rest_url:
+            return self._complete_rest(system_parts, contents, generation_config)
+
+        model = self.genai.GenerativeModel(
+            self.model,
+            system_instruction="\n".join(system_parts) if system_parts else None
+        )
+        response = model.generate_content(contents, generation_config=generation_config)
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            _report_usage(usage.prompt_token_count, usage.candidates_token_count)
+        text = (response.text or "").strip()
+        if not text:
+            raise ProviderError(f"{self.display_name} returned an empty response")
+        return text
+
+
+    def _complete_rest(self, system_parts: List[str], contents: List[Dict], generation_config: Dict) -> str:
+        """generateContent over plain HTTP (used for the local stand-in server)"""
+        body = {
+            "contents": [{"role": c["role"], "parts": [{"text": p} for p in c["parts"]]} for c in contents],
+            "generationConfig": {
+                "temperature": generation_config["temperature"],
+                "maxOutputTokens": generation_config.get("max_output_tokens"),
+                "responseMimeType": generation_config.get("response_mime_type")
+            }
+        }
+        if system_parts:
+            body["systemInstruction"] = {"parts": [{"text": "\n".join(system_parts)}]}
+        response = requests.post(f"{self.rest_url}/models/{self.model}:generateContent",
+                                 params={"key": self.api_key}, json=body, timeout=120)
+        if response.status_code != 200:
+            raise ProviderError(f"{self.display_name} error {response.status_code}: {response.text[:200]}")
+        data = response.json()
+        usage = data.get("usageMetadata")
+        if usage:
+            _report_usage(usage.get("promptTokenCount"), usage.get("candidatesTokenCount"))
+        candidates = data.get("candidates") or [{}]
+        parts = candidates[0].get("content", {}).get("parts", [])
+        text = "".join(part.get("text", "") for part in parts).strip()
+        if not text:
+            raise ProviderError(f"{self.display_name} returned an empty response")
+        return text
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+    display_name = "OpenAI"
+    default_model = "gpt-3.5-turbo"
+    token_budget = 3000
+    api_key_env = "OPENAI_API_KEY"
+    base_url = None
+
+    def __init__(self, model: str = None):
+        super().__init__(model)
+        self.api_key = os.getenv(self.api_key_env)
+        self.client = None
+        if stub_server_url():
+            self.api_key = self.api_key or "stub-key"
+            self.base_url = f"{stub_server_url()}/v1"
+        if self.api_key:
+            try:
+                import openai
+                # Retries happen in _tracked_complete so they are counted in telemetry
+                if self.base_url:
+                    self.client = openai.OpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+                else:
+                    self.client = openai.OpenAI(api_key=self.api_key, max_retries=0)
+                self.enabled = True
+            except ImportError:
+                print("Warning: openai package not installed. Run: pip install openai")
+
+    def complete(self, messages: List[Dict], temperature: float = 0.7, max_tokens: int = None,
+                 json_mode: bool = False) -> str:
+        self._require_enabled()
+
+        kwargs = {"model": self.model, "messages": messages, "temperature": temperature}
+        if max_tokens:
+            kwargs["max_tokens"] = max_tokens
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+
+        response = self.client.chat.completions.create(**kwargs)
+        if getattr(response, "usage", None):
+            _report_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
+        text = (response.choices[0].message.content or "").strip()
+        if not text:
+            raise ProviderError(f"{self.display_name} returned an empty response")
+        return text
+
+
+class OpenRouterProvider(OpenAIProvider):
+    """OpenRouter exposes an OpenAI-compatible API in front of many vendors"""
+
+    name = "openrouter"
+    display_name = "OpenRouter"
+    api_key_env = "OPENROUTER_API_KEY"
+    base_url = "https://openrouter.ai/api/v1"
+    token_budget = 6000
+
+    def __init__(self, model: str = None):
+        load_dotenv()
+        self.default_model = os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
+        super().__init__(model)
+
+
+class LocalStubProvider(LLMProvider):
+    """Deterministic offline provider for development and demos without API keys"""
+
+    name = "local"
+    display_name = "Local Stub"
+    default_model = "local-stub"
+
+    def __init__(self, model: str = None):
+        super().__init__(model)
+        self.enabled = True
+
+    def complete(self, messages: List[Dict], temperature: float = 0.7, max_tokens: int = None,
+                 json_mode: bool = False) -> str:
+        prompt = messages[-1]["content"] if messages else ""
+        if json_mode and '"resume_score"' in prompt:
+            return self._canned_structured_analysis(prompt)
+        if json_mode and '"part_summary"' in prompt:
+            return self._canned_chunk_analysis(prompt)
+        if "## Resume Score" in prompt:
+            return self._canned_analysis(prompt)
+        if '"enhanced_text"' in prompt:
+            return '{"enhanced_text": "", "suggestions": ["Local stub: no enhancement applied"], ' \
+                   '"keywords_added": [], "improvements_made": []}'
+        return "Local stub response: focus on quantifiable achievements and role-specific keywords."
+
+    def _canned_analysis(self, prompt: str) -> str:
+        """Produce a well-formed analysis whose scores scale with the resume length"""
+        words = len(re.findall(r"\w+", prompt))
+        score = max(40, min(90, 40 + words // 40))
+        return f"""## Overall Assessment
+Local stub analysis generated without contacting an AI provider.
+
+## Skills Analysis
+- **Current Skills**: Communication, Problem Solving
+- **Missing Skills**: Role-specific tooling
+
+## Key Strengths
+- Clear structure
+
+## Areas for Improvement
+- Add quantifiable achievements
+
+## ATS Optimization Assessment
+ATS Score: {max(0, score - 5)}/100
+
+## Recommended Courses/Certifications
+- A certification relevant to the target role
+
+## Resume Score
+Resume Score: {score}/100
+"""
+
+    def _canned_structured_analysis(self, prompt: str) -> str:
+        words = len(re.findall(r"\w+", prompt))
+        score = max(40, min(90, 40 + words // 40))
+        return json.dumps({
+            "overall_assessment": "Local stub analysis generated without contacting an AI provider.",
+            "professional_profile": "",
+            "skills": {"current": ["Communication", "Problem Solving"], "proficiency": "",
+                       "missing": ["Role-specific tooling"]},
+            "experience_analysis": "",
+            "education_analysis": "",
+            "strengths": ["Clear structure"],
+            "improvements": ["Add quantifiable achievements"],
+            "ats": {"score": max(0, score - 5), "recommendations": []},
+            "recommended_courses": ["A certification relevant to the target role"],
+            "resume_score": score
+        })
+
+
+    def _canned_chunk_analysis(self, prompt: str) -> str:
+        words = len(re.findall(r"\w+", prompt))
+        score = max(40, min(90, 40 + words // 20))
+        return json.dumps({
+            "part_summary": "Local stub summary of this part of the resume.",
+            "skills": ["Communication"], "missing_skills": ["Role-specific tooling"],
+            "strengths": ["Detailed content"], "improvements": ["Add quantifiable achievements"],
+            "ats_recommendations": [], "recommended_courses": [], "role_fit": "",
+            "score": score, "ats_score": max(0, score - 5)
+        })
+
+
+class HedgedProvider(LLMProvider):
+    """
+    Send the request to the primary provider and, if it has not answered within
+    hedge_after seconds, also send it to the secondary and keep whichever answers first
+    """
+
+    name = "hedged"
+
+    def __init__(self, primary: LLMProvider, secondary: LLMProvider, hedge_after: float = 8.0):
+        super().__init__(primary.model)
+        self.primary = primary
+        self.secondary = secondary
+        self.hedge_after = hedge_after
+        self.display_name = primary.display_name
+        self.enabled = primary.enabled or secondary.enabled
+        # Either provider may end up serving the prompt
+        self.token_budget = min(primary.token_budget, secondary.token_budget)
+        # The instance is shared by concurrent callers, so the winner is tracked per thread
+        self._served = threading.local()
+
+    @property
+    def rate_key(self) -> str:
+        return self.primary.rate_key if self.primary.enabled else self.secondary.rate_key
+
+    def generate(self, messages: List[Dict], temperature: float = 0.7, max_tokens: int = None,
+                 json_mode: bool = False, operation: str = "complete", admitted: bool = False) -> str:
+        if not admitted:
+            admit(self.rate_key)
+        text, self._served.name = self._race((messages, temperature, max_tokens, json_mode, operation))
+        return text
+
+    def complete(self, messages: List[Dict], temperature: float = 0.7, max_tokens: int = None,
+                 json_mode: bool = False) -> str:
+        text, self._served.name = self._race((messages, temperature, max_tokens, json_mode, "complete"))
+        return text
+
+    def served_by(self) -> str:
+        return getattr(self._served, "name", None) or self.display_name
+
+    def _race(self, args):
+        """
+        Return (text, display name of the provider that produced it). Each underlying call
+        is tracked on its own; the secondary is recorded as a fallback.
+        """
+        if not self.primary.enabled:
+            return self.secondary._tracked_complete(*args, fallback=self.primary.name), self.secondary.display_name
+        if not self.secondary.enabled:
+            return self.primary._tracked_complete(*args), self.primary.display_name
+
+        futures = {_HEDGE_EXECUTOR.submit(self.primary._tracked_complete, *args): self.primary}
+        done, _ = concurrent.futures.wait(futures, timeout=self.hedge_after)
+        if not done or next(iter(done)).exception() is not None:
+            try:
+                # The hedge draws on the secondary's own bucket, but never waits for it
+                admit(self.secondary.rate_key, max_wait=0)
+                futures[_HEDGE_EXECUTOR.submit(self.secondary._tracked_complete, *args,
+                                               fallback=self.primary.name)] = self.secondary
+            except RateLimitExceeded as e:
+                logger.warning("Hedge to %s skipped: %s", self.secondary.display_name, e)
+
+        last_error = None
+        pending = set(futures)
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result(), futures[future].display_name
+                last_error = future.exception()
+
+        raise last_error
+
+
+PROVIDERS = {
+    GeminiProvider.name: GeminiProvider,
+    OpenAIProvider.name: OpenAIProvider,
+    OpenRouterProvider.name: OpenRouterProvider,
+    LocalStubProvider.name: LocalStubProvider,
+}
+
+# Names shown in the UI mapped to (provider, model override)
+MODEL_CHOICES = {
+    "Google Gemini": ("gemini", None),
+    "OpenAI GPT": ("openai", None),
+    "OpenRouter": ("openrouter", None),
+    "Anthropic Claude": ("openrouter", "anthropic/claude-3.5-haiku"),
+    "Local Stub": ("local", None),
+}
+
+
+def get_provider(name: str, model: str = None, hedge_with: Optional[str] = None,
+                 hedge_after: Optional[float] = None) -> LLMProvider:
+    """
+    Build a provider by registry name or UI display name
+
+    Hedging is enabled when hedge_with is given, or via the LLM_HEDGE_PROVIDER and
+    LLM_HEDGE_AFTER_SECONDS environment variables.
+    """
+    load_dotenv()
+    if name in MODEL_CHOICES:
+        name, default_model = MODEL_CHOICES[name]
+        model = model or default_model
+    if name not in PROVIDERS:
+        raise ProviderError(f"Unknown LLM provider: {name}")
+
+    provider = PROVIDERS[name](model)
+
+    hedge_with = hedge_with or os.getenv("LLM_HEDGE_PROVIDER")
+    if hedge_with and hedge_with != name and hedge_with in PROVIDERS:
+        if hedge_after is None:
+            hedge_after = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "8"))
+        provider = HedgedProvider(provider, PROVIDERS[hedge_with](), hedge_after)
+
+    return provider
@@ -4,8 +4,27 @@ Provides AI-powered resume content enhancement using OpenAI GPT models
 """
 import os
 import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 from dotenv import load_dotenv
+from .llm_providers import OpenAIProvider, get_provider
+from .text_compactor import prepare_resume_text, compact_resume_text, split_sections, chunk_text, estimate_tokens
+from .single_flight import single_flight
+from .rate_limiter import admit
+from .telemetry import record_llm_call
+
+# Sections rewritten by the section-level enhancement mode; others are passed through
+ENHANCEABLE_SECTIONS = ('summary', 'experience', 'projects', 'skills')
+# Longer sections are rewritten in pieces so no single completion is truncated
+SECTION_CHUNK_TOKENS = 600
+
+# Enhanced section text keyed by model, section and content, shared across sessions
+_SECTION_CACHE = OrderedDict()
+_SECTION_CACHE_SIZE = 512
+_SECTION_CACHE_LOCK = threading.Lock()
 
 class OpenAIEnhancer:
     def __init__(self):
@@ -19,18 +38,15 @@ class OpenAIEnhancer:
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.model = "gpt-3.5-turbo"  # Using GPT-3.5-turbo for cost-effectiveness
 
+        # All completions go through the shared provider layer (hedged if LLM_HEDGE_PROVIDER is set)
+        self.provider = get_provider(OpenAIProvider.name, model=self.model)
+        self.client = getattr(self.provider, "client", None)
+        self.enabled = self.provider.enabled
+
         if not self.api_key:
             print("Warning: OpenAI API key not found. OpenAI features will be limited.")
-            self.enabled = False
-        else:
-            self.enabled = True
-            try:
-                import openai
-                self.client = openai.OpenAI(api_key=self.api_key)
-            except ImportError:
-                print("Warning: openai package not installed. Run: pip install openai")
-                self.enabled = False
 
+    @single_flight
     def enhance_resume_content(self, resume_text: str, job_description: str = None) -> Dict:
         """
         Enhance resume content using OpenAI
@@ -54,18 +70,7 @@ class OpenAIEnhancer:
             prompt = self._create_enhancement_prompt(resume_text, job_description)
 
             # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert resume writer and ATS optimization specialist."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
-
-            # Extract response
-            enhanced_content = response.choices[0].message.content
+            enhanced_content = self.provider.enhance(prompt, max_tokens=2000)
 
             # Parse the response
             result = self._parse_enhancement_response(enhanced_content)
@@ -89,6 +94,10 @@ class OpenAIEnhancer:
 
     def _create_enhancement_prompt(self, resume_text: str, job_description: str = None) -> str:
         """Create enhancement prompt for OpenAI"""
+        resume_text = prepare_resume_text(resume_text, self.provider.token_budget, label="OpenAI enhancement")
+        if job_description:
+            job_description = compact_resume_text(job_description)
+
         base_prompt = f"""Analyze and enhance the following resume for ATS (Applicant Tracking System) optimization.
 
 Original Resume:
@@ -137,6 +146,132 @@ Format your response as JSON:
                 'improvements_made': []
             }
 
+    @single_flight
+    def enhance_resume_sections(self, resume_text: str, job_description: str = None, max_workers: int = 4) -> Dict:
+        """
+        Enhance the summary, experience, projects and skills sections concurrently
+
+        Each section is cached independently, so editing one section only re-runs that
+        section. Results are stitched back in the original order.
+
+        Args:
+            resume_text: Original resume content
+            job_description: Optional job description for targeted enhancement
+            max_workers: Maximum number of concurrent section requests
+
+        Returns:
+            Dictionary in the same shape as enhance_resume_content
+        """
+        if not self.enabled:
+            return {
+                'enhanced_text': resume_text,
+                'suggestions': ['OpenAI API not configured'],
+                'error': 'OpenAI API key not found or package not installed'
+            }
+
+        sections = split_sections(compact_resume_text(resume_text))
+        # A heading with nothing under it would cost a call (and an admission token) for nothing
+        targets = [i for i, (name, body) in enumerate(sections)
+                   if name in ENHANCEABLE_SECTIONS and body.partition('\n')[2].strip()]
+        if not targets:
+            return self.enhance_resume_content(resume_text, job_description)
+
+        if job_description:
+            job_description = compact_resume_text(job_description)
+
+        enhanced = [body for _, body in sections]
+        errors = []
+        cache_hits = 0
+        failed_sections = set()
+        pending = {}
+        misses = []
+        for index in targets:
+            name, body = sections[index]
+            heading, _, content = body.partition('\n')
+            pieces = chunk_text(content, SECTION_CHUNK_TOKENS) or [content]
+            results = []
+            for piece in pieces:
+                if not piece.strip():
+                    results.append(piece)
+                    continue
+                cached = self._get_cached_section(name, piece, job_description)
+                if cached is not None:
+                    results.append(cached)
+                    cache_hits += 1
+                    record_llm_call(self.provider.name, self.model, "enhance", 0.0, cache_hit=True)
+                else:
+                    misses.append((results, len(results), name, piece))
+                    results.append(None)
+            pending[index] = (heading, pieces, results)
+
+        submitted = len(misses)
+        if misses:
+            # The whole fan-out is admitted at once, so it cannot be shed halfway through
+            admit(self.provider.rate_key, cost=submitted)
+        # Threads are started lazily, so sizing by max_workers alone costs nothing for short resumes
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for results, slot, name, piece in misses:
+                results[slot] = executor.submit(
+                    self._request_section_enhancement, name.title(), piece, job_description, True)
+
+            for index, (heading, pieces, results) in pending.items():
+                name = sections[index][0]
+                parts = []
+                for piece, result in zip(pieces, results):
+                    if isinstance(result, str):
+                        parts.append(result)
+                        continue
+                    try:
+                        text = result.result()
+                        self._store_cached_section(name, piece, job_description, text)
+                        parts.append(text)
+                    except Exception as e:
+                        errors.append(str(e))
+                        failed_sections.add(index)
+                        print(f"Error enhancing {name}: {str(e)}")
+                        parts.append(piece)
+                enhanced[index] = heading + '\n' + '\n'.join(parts)
+
+        if errors and len(errors) == submitted and not cache_hits:
+            quota = any('insufficient_quota' in e or '429' in e for e in errors)
+            return {
+                'enhanced_text': resume_text,
+                'suggestions': ['OpenAI API quota exceeded. Using Gemini AI for enhancement instead.' if quota
+                                else f'OpenAI enhancement unavailable: {errors[0]}'],
+                'error': 'quota_exceeded' if quota else errors[0]
+            }
+
+        enhanced_names = [sections[i][0] for i in targets]
+        return {
+            'enhanced_text': '\n\n'.join(part for part in enhanced if part),
+            'suggestions': [f"Rewrote the {name} section with stronger action verbs and ATS keywords"
+                            for name in enhanced_names],
+            'keywords_added': [],
+            'improvements_made': [f"{name.title()} section enhanced" for name in enhanced_names],
+            'sections_enhanced': len(targets) - len(failed_sections),
+            'cache_hits': cache_hits
+        }
+
+    def _section_cache_key(self, section_name: str, content: str, job_description: str = None) -> str:
+        raw = '\x1f'.join([self.model, section_name, content, job_description or ''])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _get_cached_section(self, section_name: str, content: str, job_description: str = None):
+        key = self._section_cache_key(section_name, content, job_description)
+        with _SECTION_CACHE_LOCK:
+            if key in _SECTION_CACHE:
+                _SECTION_CACHE.move_to_end(key)
+                return _SECTION_CACHE[key]
+        return None
+
+    def _store_cached_section(self, section_name: str, content: str, job_description: str, result: str):
+        key = self._section_cache_key(section_name, content, job_description)
+        with _SECTION_CACHE_LOCK:
+            _SECTION_CACHE[key] = result
+            _SECTION_CACHE.move_to_end(key)
+            while len(_SECTION_CACHE) > _SECTION_CACHE_SIZE:
+                _SECTION_CACHE.popitem(last=False)
+
     def enhance_section(self, section_name: str, section_content: str, job_description: str = None) -> str:
         """
         Enhance a specific resume section
@@ -153,15 +288,23 @@ Format your response as JSON:
             return section_content
 
         try:
-            prompt = f"""Enhance this {section_name} section of a resume for ATS optimization:
+            return self._request_section_enhancement(section_name, section_content, job_description)
+        except Exception as e:
+            print(f"Error enhancing {section_name}: {str(e)}")
+            return section_content
+
+    def _request_section_enhancement(self, section_name: str, section_content: str,
+                                     job_description: str = None, admitted: bool = False) -> str:
+        """Call the model for one section; raises on provider errors"""
+        prompt = f"""Enhance this {section_name} section of a resume for ATS optimization:
 
 {section_content}
 """
 
-            if job_description:
-                prompt += f"\nJob Description: {job_description}\n"
+        if job_description:
+            prompt += f"\nJob Description: {job_description}\n"
 
-            prompt += f"""
+        prompt += f"""
 Provide an improved version that:
 1. Uses strong action verbs
 2. Includes quantifiable achievements
@@ -172,21 +315,10 @@ Provide an improved version that:
 Return only the enhanced {section_name} section text, no explanations.
 """
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert resume writer."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
-
-            return response.choices[0].message.content.strip()
-
-        except Exception as e:
-            print(f"Error enhancing {section_name}: {str(e)}")
-            return section_content
+        # Leave room for the rewrite to be somewhat longer than the original
+        max_tokens = min(1500, max(500, estimate_tokens(section_content) * 3 // 2))
+        return self.provider.enhance(prompt, system="You are an expert resume writer.", max_tokens=max_tokens,
+                                     admitted=admitted)
 
     def generate_professional_summary(self, resume_text: str, job_description: str = None) -> str:
         """Generate a professional summary from resume content"""
@@ -213,17 +345,7 @@ Create a summary that:
 Return only the summary text.
 """
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert resume writer."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=200
-            )
-
-            return response.choices[0].message.content.strip()
+            return self.provider.enhance(prompt, system="You are an expert resume writer.", max_tokens=200)
 
         except Exception as e:
             print(f"Error generating summary: {str(e)}")
@@ -247,17 +369,8 @@ Return a JSON array of keywords that are missing or underrepresented in the resu
 ["keyword1", "keyword2", ...]
 """
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an ATS optimization expert."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                max_tokens=300
-            )
-
-            result = response.choices[0].message.content.strip()
+            result = self.provider.analyze(prompt, system="You are an ATS optimization expert.",
+                                           temperature=0.5, max_tokens=300)
 
             # Parse keywords
             try:
@@ -0,0 +1,237 @@
+"""
+LLM Admission Control
+Token buckets per provider (shared by all users) and per browser session. A provider
+call waits for capacity when the expected wait is short and is shed with a retry estimate
+otherwise, so heavy use degrades into queueing instead of provider quota errors. Session
+admission runs on the UI thread and never waits: it is rejected with the retry estimate.
+A fan-out of several provider calls is admitted once for its full width, so it cannot be
+shed halfway through. A fan-out wider than the burst only waits for a full bucket and
+leaves it in debt, which later requests pay off by waiting.
+
+Bucket state lives in SQLite so limits hold across Streamlit sessions and job workers.
+"""
+import os
+import math
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+
+RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", os.getenv("JOBS_DB_PATH", "jobs.db"))
+
+# Requests per minute and burst size; 0 requests per minute disables a bucket
+DEFAULT_LIMITS = {
+    "global": (60, 10),
+    "session": (10, 3),
+}
+# The offline stub costs nothing and is never limited
+UNLIMITED_PROVIDERS = {"local"}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait longer than the admission limit allows"""
+
+    def __init__(self, provider: str, scope: str, retry_after: float):
+        self.provider = provider
+        self.scope = scope
+        self.retry_after = retry_after
+        who = "this session" if scope == "session" else "all users"
+        super().__init__(f"Too many {provider} requests for {who}. "
+                         f"Please try again in about {max(1, math.ceil(retry_after))} seconds.")
+
+
+def bucket_limits(provider: str, scope: str):
+    """
+    Return (tokens per second, capacity) for a bucket, or None when it is unlimited
+
+    Configured with LLM_GLOBAL_RPM / LLM_GLOBAL_BURST and LLM_SESSION_RPM / LLM_SESSION_BURST,
+    overridable per provider, e.g. LLM_GLOBAL_RPM_GEMINI.
+    """
+    if provider in UNLIMITED_PROVIDERS or os.getenv("LLM_RATE_LIMIT", "1") == "0":
+        return None
+    default_rpm, default_burst = DEFAULT_LIMITS[scope]
+    prefix = f"LLM_{scope.upper()}"
+    suffix = f"_{provider.upper()}"
+    rpm = float(os.getenv(prefix + "_RPM" + suffix, os.getenv(prefix + "_RPM", default_rpm)))
+    burst = float(os.getenv(prefix + "_BURST" + suffix, os.getenv(prefix + "_BURST", default_burst)))
+    if rpm <= 0:
+        return None
+    return rpm / 60.0, max(1.0, burst)
+
+
+def current_session_id() -> Optional[str]:
+    """ID of the Streamlit session running this thread, if any"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+
+class TokenBucketLimiter:
+    def __init__(self, db_path: str = None, max_wait: float = None):
+        self.db_path = db_path or RATE_LIMIT_DB_PATH
+        # Longest a request may queue before it is shed instead
+        self.max_wait = max_wait if max_wait is not None else float(os.getenv("LLM_RATE_MAX_WAIT_SECONDS", "15"))
+        self.setup_database()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def setup_database(self):
+        """Create the bucket and counter tables if they don't exist"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rate_buckets (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rate_limit_stats (
+                    provider TEXT PRIMARY KEY,
+                    admitted INTEGER NOT NULL DEFAULT 0,
+                    queued INTEGER NOT NULL DEFAULT 0,
+                    shed INTEGER NOT NULL DEFAULT 0,
+                    wait_seconds REAL NOT NULL DEFAULT 0,
+                    last_shed_at TIMESTAMP
+                )
+            ''')
+            # Session buckets of long-gone visitors
+            conn.execute("DELETE FROM rate_buckets WHERE key LIKE 'session:%' AND updated_at < ?",
+                         (time.time() - 86400,))
+        finally:
+            conn.close()
+
+    def acquire(self, provider: str, session_id: str = None, cost: float = 1.0,
+                include_global: bool = True, max_wait: float = None) -> float:
+        """
+        Admit one request costing cost tokens, sleeping until they are available
+
+        Returns the seconds waited. Raises RateLimitExceeded without consuming tokens
+        when the wait would exceed max_wait (with max_wait=0, whenever it would wait).
+        A cost above a bucket's capacity waits only for a full bucket, then charges the
+        whole cost, so oversized requests are not shed on an idle bucket.
+        """
+        buckets = []
+        if include_global:
+            buckets.append(("global", f"global:{provider}", bucket_limits(provider, "global")))
+        if session_id:
+            buckets.append(("session", f"session:{provider}:{session_id}", bucket_limits(provider, "session")))
+        buckets = [b for b in buckets if b[2]]
+        if not buckets:
+            return 0.0
+
+        max_wait = self.max_wait if max_wait is None else max_wait
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            wait, blocking_scope, levels = 0.0, None, {}
+            for scope, key, (rate, capacity) in buckets:
+                row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+                tokens = capacity if row is None else min(capacity, row["tokens"] + (now - row["updated_at"]) * rate)
+                levels[key] = tokens
+                # Tokens may go negative: queued requests hold reservations in arrival order
+                bucket_wait = max(0.0, (min(cost, capacity) - tokens) / rate)
+                if bucket_wait > wait:
+                    wait, blocking_scope = bucket_wait, scope
+
+            if wait > max_wait:
+                conn.execute("INSERT OR IGNORE INTO rate_limit_stats (provider) VALUES (?)", (provider,))
+                conn.execute(
+                    "UPDATE rate_limit_stats SET shed = shed + 1, last_shed_at = datetime('now', 'localtime') "
+                    "WHERE provider = ?", (provider,))
+                conn.execute("COMMIT")
+                print(f"Rate limit: shed {provider} request ({blocking_scope}), retry in {wait:.1f}s")
+                raise RateLimitExceeded(provider, blocking_scope, wait)
+
+            for key, tokens in levels.items():
+                conn.execute("INSERT OR REPLACE INTO rate_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                             (key, tokens - cost, now))
+            conn.execute("INSERT OR IGNORE INTO rate_limit_stats (provider) VALUES (?)", (provider,))
+            conn.execute(
+                "UPDATE rate_limit_stats SET admitted = admitted + 1, queued = queued + ?, "
+                "wait_seconds = wait_seconds + ? WHERE provider = ?",
+                (1 if wait > 0 else 0, wait, provider))
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def get_stats(self) -> List[Dict]:
+        """Admission counters per provider for the admin dashboard"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT provider, admitted, queued, shed, wait_seconds, last_shed_at "
+                "FROM rate_limit_stats ORDER BY provider"
+            ).fetchall()
+        finally:
+            conn.close()
+        stats = []
+        for row in rows:
+            entry = dict(row)
+            entry["avg_wait"] = entry["wait_seconds"] / entry["queued"] if entry["queued"] else 0.0
+            stats.append(entry)
+        return stats
+
+    def reset_stats(self):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM rate_limit_stats")
+        finally:
+            conn.close()
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> TokenBucketLimiter:
+    """Process-wide limiter instance"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = TokenBucketLimiter()
+        return _limiter
+
+
+def admit(provider: str, cost: float = 1.0, max_wait: float = None) -> float:
+    """
+    Admit provider calls against the provider's global bucket
+
+    A fan-out admits all of its calls at once with cost set to their number and then
+    makes each call with admitted=True.
+    """
+    if bucket_limits(provider, "global") is None:
+        return 0.0
+    return get_rate_limiter().acquire(provider, cost=cost, max_wait=max_wait)
+
+
+def admit_session(provider: str, session_id: str = None) -> float:
+    """
+    Admit a user-triggered request against the current session's bucket
+
+    Called on the Streamlit thread, so it never sleeps: without capacity it raises
+    RateLimitExceeded with the retry estimate.
+    """
+    session_id = session_id or current_session_id()
+    if not session_id or bucket_limits(provider, "session") is None:
+        return 0.0
+    return get_rate_limiter().acquire(provider, session_id, include_global=False, max_wait=0)
@@ -1,6 +1,10 @@
 import re
 
 class ResumeAnalyzer:
+    # Bump when extraction or scoring changes, so stored results for repeat uploads are recomputed
+    EXTRACTION_VERSION = 1
+    ANALYSIS_VERSION = 1
+
     def __init__(self):
         # Document type indicators
         self.document_types = {
@@ -0,0 +1,101 @@
+"""
+Single-Flight Request Coalescing
+Concurrent identical calls (same function and arguments) share one in-flight
+execution and its result instead of each hitting the AI/parsing APIs
+"""
+import copy
+import json
+import hashlib
+import inspect
+import threading
+import functools
+from typing import Callable
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable, *args, **kwargs):
+        """
+        Run fn unless a call with the same key is already in flight, in which case wait
+        for it and return a copy of its result (or re-raise its exception)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        result = None
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                waiters = call.waiters
+            # Snapshot before the leader's caller can mutate the result
+            if waiters and call.error is None:
+                call.result = copy.deepcopy(result)
+            call.done.set()
+
+
+_GROUP = SingleFlight()
+
+
+def _default_key(func: Callable, args, kwargs, method: bool = False) -> str:
+    # Skip self for methods: identical requests from different sessions' instances coalesce
+    if method:
+        args = args[1:]
+    raw = json.dumps([func.__qualname__, args, sorted(kwargs.items())], default=repr)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _is_method(fn: Callable) -> bool:
+    parameters = list(inspect.signature(fn).parameters)
+    return bool(parameters) and parameters[0] == 'self'
+
+
+def single_flight(func: Callable = None, *, group: SingleFlight = None, method: bool = None):
+    """
+    Decorator coalescing concurrent calls with identical arguments
+
+    method=True leaves the first positional argument (the instance) out of the key; by
+    default it is set for functions whose first parameter is named self.
+    """
+    def decorator(fn):
+        flight = group or _GROUP
+        skip_self = _is_method(fn) if method is None else method
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return flight.do(_default_key(fn, args, kwargs, skip_self), fn, *args, **kwargs)
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
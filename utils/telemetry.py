@@ -0,0 +1,115 @@
+"""
+LLM Call Telemetry
+Records latency, token usage, retries, cache hits, fallbacks and estimated cost for
+every provider call. Records are buffered in memory and written to the llm_calls
+table in batches by a background thread (and at interpreter exit).
+"""
+import os
+import atexit
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+
+# Approximate list prices in USD per million (prompt, completion) tokens; unknown models cost 0
+MODEL_PRICING = {
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4o-mini": (0.15, 0.60),
+    "openai/gpt-4o-mini": (0.15, 0.60),
+    "anthropic/claude-3.5-haiku": (0.80, 4.00),
+}
+
+FLUSH_INTERVAL_SECONDS = float(os.getenv("LLM_TELEMETRY_FLUSH_SECONDS", "5"))
+FLUSH_BATCH_SIZE = 50
+# Oldest records are dropped if the database is unavailable for a long time
+MAX_BUFFERED_RECORDS = 5000
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = MODEL_PRICING.get(model or "", (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class TelemetryRecorder:
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL_SECONDS, batch_size: int = FLUSH_BATCH_SIZE):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.enabled = os.getenv("LLM_TELEMETRY", "1") != "0"
+        self._buffer: List[Dict] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def record(self, provider: str, model: str, operation: str, latency_ms: float,
+               prompt_tokens: int = 0, completion_tokens: int = 0, retries: int = 0,
+               cache_hit: bool = False, fallback: str = None, success: bool = True, error: str = None):
+        """Queue one call record; never blocks on the database"""
+        if not self.enabled:
+            return
+        entry = {
+            "provider": provider,
+            "model": model,
+            "operation": operation,
+            "latency_ms": round(latency_ms, 1),
+            "prompt_tokens": int(prompt_tokens),
+            "completion_tokens": int(completion_tokens),
+            "cost_usd": estimate_cost(model, prompt_tokens, completion_tokens),
+            "retries": retries,
+            "cache_hit": 1 if cache_hit else 0,
+            "fallback": fallback,
+            "success": 1 if success else 0,
+            "error": (error or "")[:300] or None,
+            "created_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        with self._lock:
+            self._buffer.append(entry)
+            if len(self._buffer) > MAX_BUFFERED_RECORDS:
+                del self._buffer[:len(self._buffer) - MAX_BUFFERED_RECORDS]
+            full = len(self._buffer) >= self.batch_size
+            self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write all buffered records in one transaction; returns the number written"""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        from config.database import save_llm_calls
+        if save_llm_calls(batch):
+            return len(batch)
+        # Keep the records for the next attempt
+        with self._lock:
+            self._buffer[:0] = batch
+        return 0
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="llm-telemetry", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error writing LLM telemetry: {e}")
+
+
+_recorder = TelemetryRecorder()
+atexit.register(_recorder.flush)
+
+
+def record_llm_call(provider: str, model: str, operation: str, latency_ms: float, **fields):
+    """Record a provider call (see TelemetryRecorder.record for the fields)"""
+    _recorder.record(provider, model, operation, latency_ms, **fields)
+
+
+def flush_telemetry() -> int:
+    return _recorder.flush()
+
@@ -0,0 +1,227 @@
+"""
+Resume Text Compaction
+Normalizes extracted resume text, removes extraction noise and fits it to a
+per-provider token budget before it is sent to an LLM
+"""
+import re
+import logging
+import unicodedata
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Canonical section name -> heading aliases (matched against a whole line)
+SECTION_HEADINGS = {
+    'summary': ['summary', 'professional summary', 'profile', 'objective', 'career objective', 'about me'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment history',
+                   'work history', 'internships', 'internship'],
+    'projects': ['projects', 'personal projects', 'academic projects', 'key projects'],
+    'skills': ['skills', 'technical skills', 'core competencies', 'key skills', 'technologies', 'tools'],
+    'education': ['education', 'academic background', 'qualifications', 'academic qualifications'],
+    'certifications': ['certifications', 'certificates', 'licenses', 'courses'],
+    'achievements': ['achievements', 'awards', 'honors', 'accomplishments'],
+    'publications': ['publications', 'research', 'papers', 'conferences', 'presentations'],
+    'languages': ['languages'],
+    'interests': ['interests', 'hobbies', 'activities', 'extracurricular activities', 'volunteering'],
+    'references': ['references', 'referees'],
+}
+
+# Sections dropped first when a resume does not fit its budget (lowest value first)
+TRIM_ORDER = [
+    'references', 'interests', 'languages', 'publications', 'achievements',
+    'certifications', 'other', 'education', 'projects', 'skills', 'experience',
+    'summary', 'header'
+]
+
+_HEADING_LOOKUP = {alias: name for name, aliases in SECTION_HEADINGS.items() for alias in aliases}
+_PAGE_MARKER = re.compile(r'^\s*(page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s*(of|/)\s*\d+|-?\s*\d{1,2}\s*-?)\s*$', re.IGNORECASE)
+_CONTACT = re.compile(r'@|https?://|www\.|linkedin|github|\+?\d[\d\s().-]{7,}\d', re.IGNORECASE)
+_BULLETS = re.compile(r'^[•●▪■◦‣⁃∙·➢➔→*>]+\s*')
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
+
+
+def compact_resume_text(text: str) -> str:
+    """
+    Normalize and de-duplicate extracted resume text
+
+    Removes control characters, page-break artifacts, OCR garbage lines and
+    repeated header/footer lines, joins hyphenated line breaks and collapses whitespace.
+    """
+    if not text:
+        return ""
+
+    text = unicodedata.normalize('NFKC', text)
+    text = text.replace('\r\n', '\n').replace('\r', '\n').replace('\f', '\n')
+    text = re.sub(r'[\u200b-\u200f\ufeff\x00-\x08\x0b\x0e-\x1f]', '', text)
+    # "develop-\nment" -> "development"
+    text = re.sub(r'(\w)-\n(\w)', r'\1\2', text)
+
+    lines = []
+    seen = set()
+    first_lines, header_keys = [], set()
+    for raw_line in text.split('\n'):
+        line = re.sub(r'[ \t]+', ' ', raw_line).strip()
+        if not line:
+            if lines and lines[-1] != '':
+                lines.append('')
+            continue
+        if _PAGE_MARKER.match(line):
+            continue
+        # OCR noise: lines that are mostly punctuation or stray symbols
+        alnum = sum(ch.isalnum() for ch in line)
+        if alnum == 0 or (len(line) > 3 and alnum / len(line) < 0.35):
+            continue
+        line = _BULLETS.sub('- ', line)
+
+        # Page headers/footers repeat the document's first lines or contact details
+        key = re.sub(r'\W+', '', line.lower())
+        if key in header_keys or (key in seen and _CONTACT.search(line)):
+            continue
+        if lines and key == re.sub(r'\W+', '', lines[-1].lower()):
+            continue
+        seen.add(key)
+        if len(seen) <= 3:
+            first_lines.append(key)
+        elif not header_keys:
+            header_keys = set(first_lines)
+        lines.append(line)
+
+    return '\n'.join(lines).strip()
+
+
+def detect_heading(line: str):
+    """Return the canonical section name if the line is a section heading"""
+    candidate = re.sub(r'[^a-z ]', '', line.lower()).strip()
+    if not candidate or len(candidate) > 40:
+        return None
+    return _HEADING_LOOKUP.get(candidate)
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """
+    Split resume text into (section_name, section_text) pairs in document order
+
+    Text before the first recognized heading is returned as the 'header' section.
+    Section text includes its heading line so sections can be joined back losslessly.
+    """
+    sections = []
+    current_name, current_lines = 'header', []
+    for line in text.split('\n'):
+        name = detect_heading(line)
+        if name:
+            if current_lines and any(l.strip() for l in current_lines):
+                sections.append((current_name, '\n'.join(current_lines).strip()))
+            current_name, current_lines = name, [line]
+        else:
+            current_lines.append(line)
+    if current_lines and any(l.strip() for l in current_lines):
+        sections.append((current_name, '\n'.join(current_lines).strip()))
+    return sections
+
+
+def fit_to_budget(text: str, max_tokens: int) -> str:
+    """Drop or truncate the lowest-value sections until the text fits max_tokens"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    sections = split_sections(text)
+    rank = {name: i for i, name in enumerate(TRIM_ORDER)}
+    # Indices ordered from least to most valuable; later duplicates of a section go first
+    trim_queue = sorted(range(len(sections)),
+                        key=lambda i: (rank.get(sections[i][0], rank['other']), -i))
+
+    kept = list(sections)
+    total = sum(estimate_tokens(body) for _, body in kept)
+    for index in trim_queue:
+        if total <= max_tokens:
+            break
+        name, body = kept[index]
+        excess = total - max_tokens
+        body_tokens = estimate_tokens(body)
+        if body_tokens <= excess or name not in ('experience', 'summary', 'header', 'skills'):
+            kept[index] = (name, '')
+            total -= body_tokens
+        else:
+            # Keep the head of high-value sections, cut from the end line by line
+            lines = body.split('\n')
+            while lines and estimate_tokens('\n'.join(lines)) > body_tokens - excess:
+                lines.pop()
+            kept[index] = (name, '\n'.join(lines))
+            total -= body_tokens - estimate_tokens(kept[index][1])
+
+    result = '\n\n'.join(body for _, body in kept if body)
+    # Last resort for a single enormous section
+    return result[:max_tokens * 4]
+
+
+def prepare_resume_text(text: str, max_tokens: int = None, label: str = "") -> str:
+    """Compact resume text, enforce an optional token budget and log the tokens saved"""
+    if not text:
+        return ""
+
+    original_tokens = estimate_tokens(text)
+    compacted = compact_resume_text(text)
+    if max_tokens:
+        compacted = fit_to_budget(compacted, max_tokens)
+
+    final_tokens = estimate_tokens(compacted)
+    saved = original_tokens - final_tokens
+    if saved > 0:
+        prefix = f"[{label}] " if label else ""
+        logger.info("%sResume compaction: %d -> %d tokens (saved %d, %.0f%%)",
+                    prefix, original_tokens, final_tokens, saved, saved / original_tokens * 100)
+    return compacted
+
+
+def compact_prompt(prompt: str) -> str:
+    """Strip template indentation and blank-line runs from a prompt"""
+    lines = [line.strip() for line in prompt.split('\n')]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    """Split text on line boundaries into pieces of at most max_tokens (overlong lines are cut)"""
+    chunks, current, size = [], [], 0
+    for line in text.split('\n'):
+        line = line[:max_tokens * 4]
+        cost = estimate_tokens(line) + 1
+        if current and size + cost > max_tokens:
+            chunks.append('\n'.join(current).strip())
+            current, size = [], 0
+        current.append(line)
+        size += cost
+    if any(l.strip() for l in current):
+        chunks.append('\n'.join(current).strip())
+    return [chunk for chunk in chunks if chunk]
+
+
+def chunk_sections(text: str, max_tokens: int) -> List[Tuple[List[str], str]]:
+    """
+    Group consecutive sections into chunks of at most max_tokens
+
+    Returns (section_names, chunk_text) pairs in document order. A section larger than
+    max_tokens is split across several chunks.
+    """
+    chunks = []
+    names, parts, size = [], [], 0
+    for name, body in split_sections(text):
+        pieces = chunk_text(body, max_tokens) if estimate_tokens(body) > max_tokens else [body]
+        for piece in pieces:
+            cost = estimate_tokens(piece) + 1
+            if parts and size + cost > max_tokens:
+                chunks.append((names, '\n\n'.join(parts)))
+                names, parts, size = [], [], 0
+            if name not in names:
+                names.append(name)
+            parts.append(piece)
+            size += cost
+    if parts:
+        chunks.append((names, '\n\n'.join(parts)))
+    return chunks